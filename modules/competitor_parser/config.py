@@ -16,11 +16,15 @@ class CompetitorParserSettings(BaseSettings):
     default_timeout: int = 30
     max_concurrent_parsers: int = 3
     max_retries: int = 3
+    stats_log_interval: float = 10.0  # seconds, сводка счетчиков парсера
     
     # Playwright Settings
     playwright_headless: bool = True
     playwright_timeout: int = 30000  # milliseconds
     
+    # HTML Parsing
+    use_selectolax: bool = True  # Быстрый путь для CSS селекторов, если установлен selectolax
+    
     # User Agents
     user_agents: list = [
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -30,6 +34,8 @@ class CompetitorParserSettings(BaseSettings):
     
     # Storage
     save_raw_html: bool = False
+    product_cache_size: int = 256  # LRU кэш распарсенных товаров по URL
+    product_cache_ttl: float = 300.0  # Время жизни записи кэша товаров (секунд)
     
     # Export Settings
     export_directory: str = "exports"
@@ -5,7 +5,7 @@ Database Client для Competitor Parser
 
 import os
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 from datetime import datetime
 from supabase import Client
 
@@ -128,52 +128,57 @@ class ParserDatabaseClient:
     # Parsed Products
     # ===================================
     
+    @staticmethod
+    def _product_row(product: ParsedProduct) -> dict:
+        """Строка таблицы parsed_products для товара"""
+        price = product.price
+        
+        return {
+            "task_id": product.task_id,
+            "sku": product.sku,
+            "external_id": product.external_id,
+            "title": product.title,
+            "description": product.description,
+            "short_description": product.short_description,
+            
+            # Price
+            "price_amount": price.amount if price else None,
+            "price_currency": price.currency if price else "KZT",
+            "old_price": price.old_price if price else None,
+            "discount_percent": price.discount_percent if price else None,
+            
+            # Classification
+            "category": product.category,
+            "breadcrumbs": product.breadcrumbs or [],
+            "brand": product.brand,
+            "manufacturer": product.manufacturer,
+            
+            # Stock & Rating
+            "stock_status": product.stock_status,
+            "in_stock": product.in_stock,
+            "rating": float(product.rating) if product.rating else None,
+            "reviews_count": product.reviews_count,
+            
+            # JSON fields
+            "attributes": [attr.dict() for attr in product.attributes],
+            "images": [img.dict() for img in product.images],
+            "seo_data": product.seo_data.dict() if product.seo_data else {},
+            
+            # Source
+            "source_url": product.source_url,
+            "source_site": product.source_site,
+            "parser_type": product.parser_type.value if hasattr(product.parser_type, 'value') else product.parser_type,
+            
+            # Metadata
+            "parsed_at": product.parsed_at.isoformat(),
+            "parser_version": product.parser_version,
+            "raw_html": product.raw_html if product.raw_html else None
+        }
+    
     async def save_product(self, product: ParsedProduct) -> Optional[str]:
         """Сохранить товар"""
         try:
-            data = {
-                "task_id": product.task_id,
-                "sku": product.sku,
-                "external_id": product.external_id,
-                "title": product.title,
-                "description": product.description,
-                "short_description": product.short_description,
-                
-                # Price
-                "price_amount": product.price.amount if product.price else None,
-                "price_currency": product.price.currency if product.price else "KZT",
-                "old_price": product.price.old_price if product.price else None,
-                "discount_percent": product.price.discount_percent if product.price else None,
-                
-                # Classification
-                "category": product.category,
-                "breadcrumbs": product.breadcrumbs or [],
-                "brand": product.brand,
-                "manufacturer": product.manufacturer,
-                
-                # Stock & Rating
-                "stock_status": product.stock_status,
-                "in_stock": product.in_stock,
-                "rating": float(product.rating) if product.rating else None,
-                "reviews_count": product.reviews_count,
-                
-                # JSON fields
-                "attributes": [attr.dict() for attr in product.attributes],
-                "images": [img.dict() for img in product.images],
-                "seo_data": product.seo_data.dict() if product.seo_data else {},
-                
-                # Source
-                "source_url": product.source_url,
-                "source_site": product.source_site,
-                "parser_type": product.parser_type.value if hasattr(product.parser_type, 'value') else product.parser_type,
-                
-                # Metadata
-                "parsed_at": product.parsed_at.isoformat(),
-                "parser_version": product.parser_version,
-                "raw_html": product.raw_html if product.raw_html else None
-            }
-            
-            result = self.db.table("parsed_products").insert(data).execute()
+            result = self.db.table("parsed_products").insert(self._product_row(product)).execute()
             
             if result.data:
                 product_id = result.data[0]["id"]
@@ -186,14 +191,39 @@ class ParserDatabaseClient:
             logger.error(f"Failed to save product: {e}", exc_info=True)
             return None
     
-    async def save_products_batch(self, products: List[ParsedProduct]) -> int:
-        """Сохранить несколько товаров"""
+    async def save_products_batch(
+        self,
+        products: List[ParsedProduct],
+        chunk_size: int = 1000
+    ) -> int:
+        """
+        Сохранить несколько товаров
+        
+        Товары вставляются одним multi-row INSERT на чанк (один запрос
+        вместо N). Если чанк не прошел целиком, его товары сохраняются
+        по одному, чтобы один плохой товар не терял весь чанк.
+        
+        Args:
+            products: Товары
+            chunk_size: Максимум строк в одном INSERT
+        
+        Returns:
+            Количество сохраненных товаров
+        """
         saved_count = 0
         
-        for product in products:
-            product_id = await self.save_product(product)
-            if product_id:
-                saved_count += 1
+        for start in range(0, len(products), chunk_size):
+            chunk = products[start:start + chunk_size]
+            
+            try:
+                rows = [self._product_row(product) for product in chunk]
+                result = self.db.table("parsed_products").insert(rows).execute()
+                saved_count += len(result.data or [])
+            except Exception as e:
+                logger.warning(f"Bulk insert of {len(chunk)} products failed, saving one by one: {e}")
+                for product in chunk:
+                    if await self.save_product(product):
+                        saved_count += 1
         
         logger.info(f"Saved {saved_count}/{len(products)} products")
         return saved_count
@@ -207,33 +237,99 @@ class ParserDatabaseClient:
     ) -> List[ParsedProduct]:
         """Получить товары с фильтрацией"""
         try:
-            query = self.db.table("parsed_products").select("*")
-            
-            if task_id:
-                query = query.eq("task_id", task_id)
-            
-            if source_site:
-                query = query.eq("source_site", source_site)
-            
-            result = query.order("parsed_at", desc=True)\
-                .range(offset, offset + limit - 1)\
-                .execute()
-            
-            products = []
-            for data in result.data:
-                try:
-                    # Преобразуем JSON поля обратно в модели
-                    products.append(ParsedProduct(**data))
-                except Exception as e:
-                    logger.warning(f"Failed to parse product: {e}")
-                    continue
-            
-            return products
+            rows = self._select_product_rows(task_id, source_site, limit, offset)
+            return self._rows_to_products(rows)
             
         except Exception as e:
             logger.error(f"Failed to get products: {e}")
             return []
     
+    async def iter_products(
+        self,
+        task_id: Optional[str] = None,
+        source_site: Optional[str] = None,
+        limit: int = 1000,
+        batch_size: int = 500
+    ) -> AsyncIterator[List[ParsedProduct]]:
+        """
+        Получать товары страницами по batch_size (для потокового экспорта)
+        
+        Args:
+            task_id: Фильтр по задаче
+            source_site: Фильтр по сайту
+            limit: Общий лимит записей
+            batch_size: Размер страницы
+        
+        Yields:
+            Непустой список товаров очередной страницы (страница, где все
+            строки не прошли валидацию, пропускается)
+        
+        Raises:
+            Exception: Ошибка БД после первой страницы (иначе экспорт
+                молча оборвался бы на середине)
+        """
+        offset = 0
+        
+        while offset < limit:
+            size = min(batch_size, limit - offset)
+            
+            try:
+                rows = self._select_product_rows(task_id, source_site, size, offset)
+            except Exception as e:
+                logger.error(f"Failed to get products batch at offset {offset}: {e}")
+                if offset:
+                    raise
+                return
+            
+            if not rows:
+                return
+            
+            # Пагинация идет по числу строк, а не по числу валидных товаров
+            products = self._rows_to_products(rows)
+            if products:
+                yield products
+            
+            # Неполная страница - дальше данных нет
+            if len(rows) < size:
+                return
+            
+            offset += size
+    
+    def _select_product_rows(
+        self,
+        task_id: Optional[str],
+        source_site: Optional[str],
+        limit: int,
+        offset: int
+    ) -> List[Dict[str, Any]]:
+        """Выбрать строки parsed_products с фильтрацией и пагинацией"""
+        query = self.db.table("parsed_products").select("*")
+        
+        if task_id:
+            query = query.eq("task_id", task_id)
+        
+        if source_site:
+            query = query.eq("source_site", source_site)
+        
+        result = query.order("parsed_at", desc=True)\
+            .range(offset, offset + limit - 1)\
+            .execute()
+        
+        return result.data
+    
+    def _rows_to_products(self, rows: List[Dict[str, Any]]) -> List[ParsedProduct]:
+        """Преобразовать строки БД в модели, пропуская битые записи"""
+        products = []
+        for data in rows:
+            try:
+                # Преобразуем JSON поля обратно в модели
+                products.append(ParsedProduct(**data))
+            except Exception as e:
+                logger.warning(f"Failed to parse product: {e}")
+                continue
+        
+        return products
+    
     async def get_product_by_id(self, product_id: str) -> Optional[ParsedProduct]:
         """Получить товар по ID"""
         try:
@@ -53,6 +53,14 @@ class ProductImage(BaseModel):
     order: int = 0
     width: Optional[int] = None
     height: Optional[int] = None
+    
+    @classmethod
+    def from_urls(cls, urls: List[str]) -> List["ProductImage"]:
+        """Собрать галерею из списка URL (первый - основной) без повторной валидации"""
+        return [
+            cls.model_construct(url=url, is_primary=(i == 0), order=i)
+            for i, url in enumerate(urls)
+        ]
 
 
 class ProductPrice(BaseModel):
@@ -226,6 +234,8 @@ class ParserConfig(BaseModel):
     use_playwright: bool = False
     wait_for_selector: Optional[str] = None
     custom_headers: Dict[str, str] = {}
+    block_resources: bool = True  # Не грузить картинки/шрифты/медиа/CSS
+    concurrency: Optional[int] = None  # Параллельных страниц товаров (None = из настроек)
     rate_limit: float = 2.0
     max_retries: int = 3
     timeout: int = 30
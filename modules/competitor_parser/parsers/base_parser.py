@@ -14,6 +14,17 @@ from ..models import ParsedProduct, ParserConfig, ProductPrice
 
 logger = logging.getLogger(__name__)
 
+# Скомпилированные паттерны для хелперов (вызываются на каждый товар)
+PRICE_CLEAN_RE = re.compile(r'[^\d.,]')
+EXTERNAL_ID_RE = re.compile(r'[-_/](\d+)(?:[.-]html?|/|$)')
+LONG_NUMBER_RE = re.compile(r'\b(\d{5,})\b')
+
+# Признаки URL страницы категории (простая эвристика)
+CATEGORY_URL_INDICATORS = (
+    '/catalog', '/category', '/products', '/list',
+    '/c/', '/cat/', '/shop/', '/store/'
+)
+
 
 class BaseParser(ABC):
     """Базовый класс парсера"""
@@ -109,7 +120,7 @@ class BaseParser(ABC):
         
         try:
             # Убираем все кроме цифр, точки и запятой
-            price_clean = re.sub(r'[^\d.,]', '', price_str)
+            price_clean = PRICE_CLEAN_RE.sub('', price_str)
             
             # Заменяем запятую на точку
             price_clean = price_clean.replace(',', '.')
@@ -144,12 +155,12 @@ class BaseParser(ABC):
             # /item/12345/ -> 12345
             # /p/name-id-12345 -> 12345
             
-            matches = re.findall(r'[-_/](\d+)(?:[.-]html?|/|$)', url)
+            matches = EXTERNAL_ID_RE.findall(url)
             if matches:
                 return matches[-1]  # Берем последнее найденное число
             
             # Если не нашли, пытаемся найти любое длинное число
-            matches = re.findall(r'\b(\d{5,})\b', url)
+            matches = LONG_NUMBER_RE.findall(url)
             if matches:
                 return matches[-1]
         
@@ -168,13 +179,8 @@ class BaseParser(ABC):
         Returns:
             True если это категория
         """
-        # Простая эвристика
-        category_indicators = [
-            '/catalog', '/category', '/products', '/list',
-            '/c/', '/cat/', '/shop/', '/store/'
-        ]
-        
-        return any(indicator in url.lower() for indicator in category_indicators)
+        url_lower = url.lower()
+        return any(indicator in url_lower for indicator in CATEGORY_URL_INDICATORS)
     
     def normalize_url(self, url: str, base_url: Optional[str] = None) -> str:
         """
@@ -0,0 +1,109 @@
+"""
+Product Loader
+Батчинг и дедупликация загрузок страниц товаров (DataLoader-паттерн)
+"""
+
+import logging
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from ..models import ParsedProduct
+
+logger = logging.getLogger(__name__)
+
+
+class ProductLoader:
+    """
+    Загрузчик страниц товаров
+
+    URL, запрошенные в пределах окна linger, собираются в один батч и
+    загружаются параллельно (не больше max_concurrency одновременно).
+    Повторный запрос URL, который уже загружается, ждет тот же результат.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[Optional[ParsedProduct]]],
+        max_concurrency: int = 3,
+        linger: float = 0.02
+    ):
+        """
+        Инициализация загрузчика
+
+        Args:
+            fetch: Корутина загрузки одной страницы товара
+            max_concurrency: Максимум одновременных загрузок
+            linger: Окно сбора батча (секунды)
+        """
+        self._fetch = fetch
+        self._linger = linger
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+    async def load(self, url: str) -> Optional[ParsedProduct]:
+        """
+        Загрузить товар по URL
+
+        Args:
+            url: URL страницы товара
+
+        Returns:
+            ParsedProduct или None
+        """
+        future = self._in_flight.get(url)
+
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[url] = future
+            self._queue.append(url)
+
+            if self._dispatch_task is None:
+                self._dispatch_task = asyncio.create_task(self._dispatch())
+                self._dispatch_task.add_done_callback(self._on_dispatch_done)
+
+        # shield: отмена одного вызывающего не отменяет загрузку для остальных
+        return await asyncio.shield(future)
+
+    async def _dispatch(self):
+        """Дождаться окна linger и загрузить накопленный батч"""
+        await asyncio.sleep(self._linger)
+
+        batch, self._queue = self._queue, []
+        self._dispatch_task = None
+
+        logger.debug("Dispatching batch of %d product URLs", len(batch))
+        await asyncio.gather(*(self._load_one(url) for url in batch))
+
+    def _on_dispatch_done(self, task: asyncio.Task):
+        """
+        Диспетчер завершился, не забрав батч (отменен до или во время linger):
+        ожидающие получают отмену, а не зависают
+        """
+        if task is not self._dispatch_task:
+            # Батч забран: загрузки сами завершают свои future
+            return
+
+        queued, self._queue = self._queue, []
+        self._dispatch_task = None
+
+        for url in queued:
+            self._in_flight.pop(url).cancel()
+
+    async def _load_one(self, url: str):
+        """Загрузить один URL и отдать результат всем ожидающим"""
+        future = self._in_flight[url]
+
+        try:
+            async with self._semaphore:
+                result = await self._fetch(url)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            del self._in_flight[url]
+            # Отмена загрузки или BaseException: ожидающие не должны зависнуть
+            if not future.done():
+                future.cancel()
@@ -21,6 +21,9 @@ class SatuParser(UniversalParser):
     Наследует UniversalParser но использует оптимизированные селекторы
     """
     
+    # Атрибуты извлекаются через BeautifulSoup в _extract_via_selectors
+    use_lexbor = False
+    
     def __init__(self):
         """Инициализация парсера Satu.kz"""
         super().__init__(config=SATU_CONFIG)
@@ -92,13 +95,20 @@ class SatuParser(UniversalParser):
                     product.in_stock = False
                     product.stock_status = "Под заказ"
             
-            logger.info(f"✅ Enhanced Satu.kz product: {product.title}")
+            self.stats['satu_enhanced'] += 1
         
         except Exception as e:
             logger.warning(f"Failed to enhance Satu product: {e}")
         
         return product
     
+    def _is_complete(self, data: dict) -> bool:
+        """
+        Для Satu.kz атрибуты есть только в разметке страницы,
+        поэтому без них селекторы не пропускаем
+        """
+        return super()._is_complete(data) and bool(data.get('attributes'))
+    
     def _extract_via_selectors(self, soup: BeautifulSoup) -> dict:
         """
         Переопределяем извлечение через селекторы для Satu.kz
@@ -154,7 +164,7 @@ class SatuParser(UniversalParser):
             
             if attributes:
                 data['attributes'] = attributes
-                logger.info(f"Extracted {len(attributes)} attributes for Satu.kz")
+                self.stats['satu_attributes'] += len(attributes)
         
         except Exception as e:
             logger.warning(f"Failed to extract Satu.kz attributes: {e}")
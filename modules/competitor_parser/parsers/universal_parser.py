@@ -5,12 +5,17 @@ Universal Parser
 
 import logging
 import json
+import re
 from typing import List, Optional, Dict, Any
 from playwright.async_api import async_playwright, Page, Browser
-from bs4 import BeautifulSoup
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from bs4 import BeautifulSoup, SoupStrainer
 import asyncio
+import time
+from collections import Counter, OrderedDict
 
-from .base_parser import BaseParser
+from .base_parser import BaseParser, CATEGORY_URL_INDICATORS
+from .product_loader import ProductLoader
 from ..models import (
     ParsedProduct,
     ParserConfig,
@@ -22,8 +27,69 @@ from ..models import (
 )
 from ..config import parser_settings
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Типы ресурсов, которые не нужны для извлечения HTML и мета-тегов
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+# Лимиты заголовков для SEO данных
+HEADING_LIMITS = {"h1": 5, "h2": 10, "h3": 10}
+
+# Универсальные селекторы для ссылок на товары
+PRODUCT_LINK_SELECTORS = (
+    'a[href*="/product"], a[href*="/item"], a[href*="/p/"], '
+    'a.product-link, .product-card a, .item-card a'
+)
+
+# Первый проход парсит только то, что нужно schema.org / OG / SEO:
+# <head>, JSON-LD скрипты и заголовки. Полный DOM строится лениво для селекторов
+HEAD_STRAINER = SoupStrainer(['head', 'script', 'h1', 'h2', 'h3'])
+HTML_LANG_RE = re.compile(r'<html\b[^>]*?\blang=["\']?([^"\'\s>]+)', re.IGNORECASE)
+
+# <script>/<style> блоки вырезаются до парсинга (кроме JSON-LD)
+SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b([^>]*)>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def _keep_json_ld(match: "re.Match") -> str:
+    """Оставить только JSON-LD скрипты, остальные script/style удалить"""
+    if match.group(1).lower() == 'script' and 'ld+json' in match.group(2).lower():
+        return match.group(0)
+    return ''
+
+
+def strip_scripts_and_styles(html: str) -> str:
+    """Убрать inline скрипты и стили, которые lxml иначе токенизирует впустую"""
+    return SCRIPT_STYLE_RE.sub(_keep_json_ld, html)
+
+# Кнопка "Следующая страница": CSS-варианты одним запросом + fallback по тексту
+NEXT_PAGE_SELECTOR = ", ".join([
+    'a.next', 'a[rel="next"]', 'button.pagination-next',
+    '[aria-label="Next"]', '.pagination a:last-child'
+])
+NEXT_PAGE_TEXT = re.compile(r"Следующая|Next")
+
+# Дедупликация и фильтрация ссылок прямо в браузере (один round-trip)
+PRODUCT_LINKS_JS = """
+([selectors, indicators, limit]) => {
+    const links = new Set();
+    for (const a of document.querySelectorAll(selectors)) {
+        const href = a.href;
+        if (!href || links.has(href)) continue;
+        const lower = href.toLowerCase();
+        if (indicators.some(ind => lower.includes(ind))) continue;
+        links.add(href);
+        if (links.size >= limit) break;
+    }
+    return [...links];
+}
+"""
+
 
 class UniversalParser(BaseParser):
     """
@@ -31,6 +97,11 @@ class UniversalParser(BaseParser):
     Авто-детекция структуры через schema.org, Open Graph, мета-теги
     """
     
+    # Извлечение по селекторам через selectolax (Lexbor), если он установлен.
+    # Подклассы, которые расширяют _extract_via_selectors через BeautifulSoup API,
+    # должны выставить False
+    use_lexbor: bool = True
+    
     def __init__(self, config: Optional[ParserConfig] = None):
         """
         Инициализация универсального парсера
@@ -45,9 +116,46 @@ class UniversalParser(BaseParser):
         self.browser: Optional[Browser] = None
         self.context = None
         self.playwright = None
+        
+        # LRU кэш распарсенных товаров (повторные заходы на тот же URL):
+        # url -> (время записи, товар); записи старше product_cache_ttl не отдаются
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        
+        # Счетчики вместо per-product логов; сводка пишется раз в stats_log_interval
+        self.stats: Counter = Counter()
+        self._stats_task: Optional[asyncio.Task] = None
+        
+        # Экземпляр может использоваться несколькими задачами одновременно:
+        # браузер запускается первым входом и закрывается последним выходом
+        self._users = 0
+        self._lifecycle_lock = asyncio.Lock()
+        
+        # Батчинг и дедупликация загрузок товаров внутри категории
+        self._loader = ProductLoader(
+            self.parse_product_page,
+            max_concurrency=self.config.concurrency or parser_settings.max_concurrent_parsers
+        )
     
     async def __aenter__(self):
-        """Контекстный менеджер: вход"""
+        """Контекстный менеджер: вход (браузер запускается только при первом входе)"""
+        async with self._lifecycle_lock:
+            if self._users == 0:
+                await self._start_browser()
+            self._users += 1
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Контекстный менеджер: выход (браузер закрывается при последнем выходе)"""
+        async with self._lifecycle_lock:
+            self._users -= 1
+            if self._users == 0:
+                # Парсер живет весь процесс (ParserService): кэш товаров
+                # держится только пока есть активные задачи
+                self._cache.clear()
+                await self._stop_browser()
+    
+    async def _start_browser(self):
+        """Запустить Playwright, браузер и контекст"""
         self.playwright = await async_playwright().start()
         
         # Запускаем браузер с anti-detect
@@ -72,20 +180,55 @@ class UniversalParser(BaseParser):
             locale="ru-RU"
         )
         
+        # Блокируем тяжелые ресурсы (можно отключить через config.block_resources)
+        if self.config.block_resources:
+            await self.context.route("**/*", self._block_heavy_resources)
+        
+        self._stats_task = asyncio.create_task(self._stats_loop())
+        
         logger.info("Playwright browser started")
-        return self
     
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Контекстный менеджер: выход"""
+    async def _stop_browser(self):
+        """Остановить контекст, браузер и Playwright"""
+        if self._stats_task:
+            self._stats_task.cancel()
+            self._stats_task = None
+        self._log_stats()
+        
         if self.context:
             await self.context.close()
+            self.context = None
         if self.browser:
             await self.browser.close()
+            self.browser = None
         if self.playwright:
             await self.playwright.stop()
+            self.playwright = None
         
         logger.info("Playwright browser stopped")
     
+    @staticmethod
+    async def _block_heavy_resources(route):
+        """Отклонить запросы картинок, шрифтов, медиа и стилей"""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def _stats_loop(self):
+        """Периодически писать сводку счетчиков парсинга"""
+        while True:
+            await asyncio.sleep(parser_settings.stats_log_interval)
+            self._log_stats()
+    
+    def _log_stats(self):
+        """Записать сводку счетчиков парсинга"""
+        if self.stats:
+            logger.info(
+                "Parser stats: %s",
+                ", ".join(f"{key}={value}" for key, value in sorted(self.stats.items()))
+            )
+    
     # ===================================
     # Main Parsing Methods
     # ===================================
@@ -100,11 +243,16 @@ class UniversalParser(BaseParser):
         Returns:
             ParsedProduct или None
         """
+        cached = self._cached_product(url)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached
+        
         try:
             page = await self.context.new_page()
             
             # Переходим на страницу
-            logger.info(f"Loading page: {url}")
+            logger.debug("Loading page: %s", url)
             await page.goto(url, wait_until="domcontentloaded", timeout=30000)
             
             # Ждем загрузки контента (если указан селектор)
@@ -117,15 +265,15 @@ class UniversalParser(BaseParser):
                 except Exception as e:
                     logger.warning(f"Wait for selector failed: {e}")
             else:
-                # Ждем немного для загрузки JS
-                await asyncio.sleep(2)
+                # Ждем окончания загрузки JS (без фиксированной паузы)
+                await self._wait_for_page_settled(page)
             
             # Получаем HTML
-            html = await page.content()
-            soup = BeautifulSoup(html, 'lxml')
+            html = strip_scripts_and_styles(await page.content())
+            soup = BeautifulSoup(html, 'lxml', parse_only=HEAD_STRAINER)
             
             # Извлекаем данные
-            product = await self._extract_product_data(soup, url, page)
+            product = await self._extract_product_data(soup, url, page, html)
             
             await page.close()
             
@@ -133,14 +281,19 @@ class UniversalParser(BaseParser):
             await self.rate_limit_wait()
             
             if product:
-                logger.info(f"✅ Product parsed: {product.title}")
+                self._cache_product(url, product)
+                self.stats['parsed'] += 1
             else:
+                self.stats['failed'] += 1
                 logger.warning(f"⚠️ Failed to parse product from {url}")
             
             return product
             
         except Exception as e:
-            logger.error(f"Failed to parse product page {url}: {e}", exc_info=True)
+            self.stats['errors'] += 1
+            logger.error("Failed to parse product page %s: %s", url, e)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Product page traceback", exc_info=True)
             return None
     
     async def parse_category_page(self, url: str, max_pages: int = 1) -> List[ParsedProduct]:
@@ -169,11 +322,18 @@ class UniversalParser(BaseParser):
                 
                 logger.info(f"Found {len(product_links)} products on page {page_num + 1}")
                 
-                # Парсим каждый товар
-                for product_url in product_links[:10]:  # Лимит 10 на страницу для MVP
-                    product = await self.parse_product_page(product_url)
-                    if product:
-                        products.append(product)
+                # Парсим товары батчем через загрузчик (ошибка одного не роняет остальные)
+                batch_urls = product_links[:10]  # Лимит 10 на страницу для MVP
+                results = await asyncio.gather(
+                    *(self._loader.load(product_url) for product_url in batch_urls),
+                    return_exceptions=True
+                )
+                
+                for product_url, result in zip(batch_urls, results):
+                    if isinstance(result, BaseException):
+                        logger.warning(f"Failed to load product {product_url}: {result}")
+                    elif result:
+                        products.append(result)
                 
                 # Переход на следующую страницу (если есть)
                 if page_num < max_pages - 1:
@@ -185,11 +345,51 @@ class UniversalParser(BaseParser):
             await page.close()
             
         except Exception as e:
-            logger.error(f"Failed to parse category {url}: {e}", exc_info=True)
+            logger.error("Failed to parse category %s: %s", url, e)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Category page traceback", exc_info=True)
         
         logger.info(f"Total products parsed: {len(products)}")
         return products
     
+    def _cached_product(self, url: str) -> Optional[ParsedProduct]:
+        """
+        Копия товара из кэша, None если записи нет или она устарела
+        
+        Отдается копия: вызывающие дописывают в товар task_id и нормализуют
+        поля (SatuParser), кэшированный экземпляр при этом не меняется.
+        """
+        cached = self._cache.get(url)
+        if cached is None:
+            return None
+        
+        if time.monotonic() - cached[0] >= parser_settings.product_cache_ttl:
+            del self._cache[url]
+            return None
+        
+        self._cache.move_to_end(url)
+        return cached[1].model_copy(deep=True)
+    
+    def _cache_product(self, url: str, product: ParsedProduct):
+        """Положить копию товара в LRU кэш, вытеснив самые старые записи"""
+        self._cache[url] = (time.monotonic(), product.model_copy(deep=True))
+        self._cache.move_to_end(url)
+        while len(self._cache) > parser_settings.product_cache_size:
+            self._cache.popitem(last=False)
+    
+    async def _wait_for_page_settled(self, page: Page):
+        """Дождаться затишья сети, с fallback на document.readyState"""
+        try:
+            await page.wait_for_load_state("networkidle", timeout=3000)
+        except PlaywrightTimeoutError:
+            try:
+                await page.wait_for_function(
+                    "document.readyState === 'complete'",
+                    timeout=2000
+                )
+            except PlaywrightTimeoutError:
+                pass
+    
     # ===================================
     # Data Extraction Methods
     # ===================================
@@ -198,21 +398,37 @@ class UniversalParser(BaseParser):
         self,
         soup: BeautifulSoup,
         url: str,
-        page: Page
+        page: Page,
+        html: Optional[str] = None
     ) -> Optional[ParsedProduct]:
-        """Извлечь данные товара из HTML"""
+        """
+        Извлечь данные товара из HTML
+        
+        soup может содержать только <head>, скрипты и заголовки (HEAD_STRAINER);
+        полный DOM из html строится только если дошли до селекторов
+        """
         try:
             # 1. Пытаемся извлечь через schema.org (JSON-LD)
             schema_data = self._extract_schema_org(soup)
             
-            # 2. Пытаемся извлечь через Open Graph
-            og_data = self._extract_open_graph(soup)
-            
-            # 3. Извлекаем через селекторы
-            selector_data = self._extract_via_selectors(soup)
-            
-            # 4. Объединяем данные (приоритет: schema > og > selectors)
-            merged_data = self._merge_data(schema_data, og_data, selector_data)
+            if self._is_complete(schema_data):
+                # schema.org дал полные данные - OG и селекторы не нужны
+                merged_data = schema_data
+            else:
+                # 2. Пытаемся извлечь через Open Graph
+                og_data = self._extract_open_graph(soup)
+                merged_data = self._merge_data(schema_data, og_data)
+                
+                # 3. Извлекаем через селекторы (только если данных не хватает)
+                if not self._is_complete(merged_data):
+                    if html and self.use_lexbor and SELECTOLAX_AVAILABLE and parser_settings.use_selectolax:
+                        selector_data = self._extract_via_selectors_lexbor(LexborHTMLParser(html))
+                    else:
+                        full_soup = BeautifulSoup(html, 'lxml') if html else soup
+                        selector_data = self._extract_via_selectors(full_soup)
+                    
+                    # 4. Объединяем данные (приоритет: schema > og > selectors)
+                    merged_data = self._merge_data(schema_data, og_data, selector_data)
             
             # Название обязательно
             title = merged_data.get('title')
@@ -221,7 +437,7 @@ class UniversalParser(BaseParser):
                 return None
             
             # Создаем SEO данные
-            seo_data = self._extract_seo_data(soup)
+            seo_data = self._extract_seo_data(soup, html)
             
             # Создаем объект товара
             product = ParsedProduct(
@@ -244,13 +460,15 @@ class UniversalParser(BaseParser):
                 source_url=url,
                 source_site=self.extract_domain(url),
                 parser_type=ParserType.UNIVERSAL,
-                raw_html=str(soup)[:5000] if parser_settings.save_raw_html else None
+                raw_html=html[:5000] if html and parser_settings.save_raw_html else None
             )
             
             return product
             
         except Exception as e:
-            logger.error(f"Failed to extract product data: {e}", exc_info=True)
+            logger.error("Failed to extract product data: %s", e)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Product data traceback", exc_info=True)
             return None
     
     def _extract_schema_org(self, soup: BeautifulSoup) -> Dict[str, Any]:
@@ -262,8 +480,14 @@ class UniversalParser(BaseParser):
             scripts = soup.find_all('script', {'type': 'application/ld+json'})
             
             for script in scripts:
+                # Дешевая проверка до json.loads: блоки без "Product"
+                # (WebSite, BreadcrumbList, Organization) не разбираем
+                raw = script.string or ""
+                if '"Product"' not in raw:
+                    continue
+                
                 try:
-                    json_data = json.loads(script.string)
+                    json_data = json.loads(raw)
                     
                     # Может быть массив
                     if isinstance(json_data, list):
@@ -287,9 +511,9 @@ class UniversalParser(BaseParser):
                         price_value = offers.get('price')
                         if price_value:
                             try:
-                                data['price'] = ProductPrice(
+                                data['price'] = ProductPrice.model_construct(
                                     amount=float(price_value),
-                                    currency=offers.get('priceCurrency', 'KZT')
+                                    currency=offers.get('priceCurrency') or 'KZT'
                                 )
                             except:
                                 pass
@@ -299,10 +523,9 @@ class UniversalParser(BaseParser):
                         if isinstance(images, str):
                             images = [images]
                         
-                        data['images'] = [
-                            ProductImage(url=img, is_primary=(i == 0), order=i)
-                            for i, img in enumerate(images)
-                        ]
+                        data['images'] = ProductImage.from_urls(
+                            [img for img in images if isinstance(img, str)]
+                        )
                         
                         # Рейтинг
                         rating_data = json_data.get('aggregateRating', {})
@@ -310,7 +533,7 @@ class UniversalParser(BaseParser):
                             data['rating'] = rating_data.get('ratingValue')
                             data['reviews_count'] = rating_data.get('reviewCount')
                         
-                        logger.info("✅ Extracted data via schema.org")
+                        self.stats['via_schema_org'] += 1
                         break
                 
                 except json.JSONDecodeError:
@@ -339,26 +562,24 @@ class UniversalParser(BaseParser):
             # og:image
             og_image = soup.find('meta', property='og:image')
             if og_image:
-                data['images'] = [ProductImage(
-                    url=og_image.get('content'),
-                    is_primary=True,
-                    order=0
-                )]
+                og_image_url = og_image.get('content')
+                if og_image_url:
+                    data['images'] = ProductImage.from_urls([og_image_url])
             
             # og:price:amount
             og_price = soup.find('meta', property='og:price:amount')
             og_currency = soup.find('meta', property='og:price:currency')
             if og_price:
                 try:
-                    data['price'] = ProductPrice(
+                    data['price'] = ProductPrice.model_construct(
                         amount=float(og_price.get('content')),
-                        currency=og_currency.get('content') if og_currency else 'KZT'
+                        currency=(og_currency.get('content') if og_currency else None) or 'KZT'
                     )
                 except:
                     pass
             
             if data:
-                logger.info("✅ Extracted data via Open Graph")
+                self.stats['via_open_graph'] += 1
         
         except Exception as e:
             logger.warning(f"Failed to extract Open Graph: {e}")
@@ -395,7 +616,7 @@ class UniversalParser(BaseParser):
                 if price_elem:
                     price_amount = self.extract_price(price_elem.text)
                     if price_amount:
-                        data['price'] = ProductPrice(amount=price_amount)
+                        data['price'] = ProductPrice.model_construct(amount=price_amount)
                         
                         # Old price
                         if selectors.get('old_price'):
@@ -417,7 +638,7 @@ class UniversalParser(BaseParser):
                     if img_url:
                         # Нормализуем URL
                         img_url = self.normalize_url(img_url)
-                        images.append(ProductImage(
+                        images.append(ProductImage.model_construct(
                             url=img_url,
                             alt_text=alt_text,
                             is_primary=(idx == 0),
@@ -447,14 +668,74 @@ class UniversalParser(BaseParser):
                     data['breadcrumbs'] = self.extract_breadcrumbs_from_text(breadcrumb_text)
             
             if data:
-                logger.info("✅ Extracted data via selectors")
+                self.stats['via_selectors'] += 1
         
         except Exception as e:
             logger.warning(f"Failed to extract via selectors: {e}")
         
         return data
     
-    def _extract_seo_data(self, soup: BeautifulSoup) -> SEOData:
+    def _extract_via_selectors_lexbor(self, tree: "LexborHTMLParser") -> Dict[str, Any]:
+        """Извлечь данные через CSS селекторы (selectolax/Lexbor, тот же результат что и BS4 путь)"""
+        data = {}
+        selectors = self.config.selectors
+        
+        def first_text(key: str) -> Optional[str]:
+            if not selectors.get(key):
+                return None
+            node = tree.css_first(selectors[key])
+            return self.clean_text(node.text()) if node else None
+        
+        try:
+            for key in ('title', 'sku', 'description', 'category', 'brand'):
+                value = first_text(key)
+                if value:
+                    data[key] = value
+            
+            # Price
+            price_amount = self.extract_price(first_text('price'))
+            if price_amount:
+                data['price'] = ProductPrice.model_construct(amount=price_amount)
+                
+                old_price = self.extract_price(first_text('old_price'))
+                if old_price and old_price > price_amount:
+                    data['price'].old_price = old_price
+                    data['price'].calculate_discount()
+            
+            # Images
+            if selectors.get('images'):
+                images = []
+                for idx, img_node in enumerate(tree.css(selectors['images'])[:10]):  # Максимум 10 изображений
+                    attrs = img_node.attributes
+                    img_url = attrs.get('src') or attrs.get('data-src') or attrs.get('data-lazy')
+                    
+                    if img_url:
+                        images.append(ProductImage.model_construct(
+                            url=self.normalize_url(img_url),
+                            alt_text=attrs.get('alt'),
+                            is_primary=(idx == 0),
+                            order=idx
+                        ))
+                
+                if images:
+                    data['images'] = images
+            
+            # Breadcrumbs
+            breadcrumb_node = tree.css_first('.breadcrumb, .breadcrumbs, [itemtype*="BreadcrumbList"]')
+            if breadcrumb_node:
+                breadcrumb_text = self.clean_text(breadcrumb_node.text())
+                if breadcrumb_text:
+                    data['breadcrumbs'] = self.extract_breadcrumbs_from_text(breadcrumb_text)
+            
+            if data:
+                self.stats['via_selectors'] += 1
+        
+        except Exception as e:
+            logger.warning(f"Failed to extract via selectors (lexbor): {e}")
+        
+        return data
+    
+    def _extract_seo_data(self, soup: BeautifulSoup, html: Optional[str] = None) -> SEOData:
         """Извлечь SEO метаданные"""
         seo_data = SEOData()
         
@@ -492,15 +773,23 @@ class UniversalParser(BaseParser):
             if og_type:
                 seo_data.og_type = og_type.get('content')
             
-            # Headings
-            h1_tags = soup.find_all('h1')
-            seo_data.h1 = [self.clean_text(h.text) for h in h1_tags if h.text.strip()][:5]
-            
-            h2_tags = soup.find_all('h2')
-            seo_data.h2 = [self.clean_text(h.text) for h in h2_tags if h.text.strip()][:10]
+            # Headings (один проход по документу для h1/h2/h3)
+            headings = {tag: [] for tag in HEADING_LIMITS}
+            remaining = sum(HEADING_LIMITS.values())
+            for h in soup.find_all(list(HEADING_LIMITS)):
+                bucket = headings[h.name]
+                if len(bucket) >= HEADING_LIMITS[h.name]:
+                    continue
+                text = self.clean_text(h.text)
+                if text:
+                    bucket.append(text)
+                    remaining -= 1
+                    if not remaining:
+                        break
             
-            h3_tags = soup.find_all('h3')
-            seo_data.h3 = [self.clean_text(h.text) for h in h3_tags if h.text.strip()][:10]
+            seo_data.h1 = headings['h1']
+            seo_data.h2 = headings['h2']
+            seo_data.h3 = headings['h3']
             
             # Canonical
             canonical = soup.find('link', rel='canonical')
@@ -511,6 +800,11 @@ class UniversalParser(BaseParser):
             html_tag = soup.find('html')
             if html_tag:
                 seo_data.lang = html_tag.get('lang')
+            elif html:
+                # В частично распарсенном soup тега <html> нет
+                lang_match = HTML_LANG_RE.search(html, 0, 2048)
+                if lang_match:
+                    seo_data.lang = lang_match.group(1)
             
             # Robots
             meta_robots = soup.find('meta', attrs={'name': 'robots'})
@@ -522,6 +816,10 @@ class UniversalParser(BaseParser):
         
         return seo_data
     
+    def _is_complete(self, data: Dict[str, Any]) -> bool:
+        """Достаточно ли данных, чтобы пропустить остальные источники"""
+        return bool(data.get('title') and data.get('price') and data.get('images'))
+    
     def _merge_data(self, *data_dicts: Dict[str, Any]) -> Dict[str, Any]:
         """Объединить данные из разных источников (приоритет: первый > последний)"""
         merged = {}
@@ -536,23 +834,12 @@ class UniversalParser(BaseParser):
     async def _extract_product_links(self, page: Page) -> List[str]:
         """Извлечь ссылки на товары со страницы категории"""
         try:
-            # Универсальные селекторы для ссылок на товары
-            links = await page.eval_on_selector_all(
-                'a[href*="/product"], a[href*="/item"], a[href*="/p/"], a.product-link, .product-card a, .item-card a',
-                'elements => elements.map(e => e.href)'
+            # Дубликаты и ссылки на категории отсекаются на стороне браузера
+            return await page.evaluate(
+                PRODUCT_LINKS_JS,
+                [PRODUCT_LINK_SELECTORS, list(CATEGORY_URL_INDICATORS), 50]  # Максимум 50 товаров
             )
             
-            # Убираем дубликаты и фильтруем
-            unique_links = list(set(links))
-            
-            # Фильтруем только ссылки на товары (не категории)
-            product_links = [
-                link for link in unique_links
-                if not self.is_category_page(link)
-            ]
-            
-            return product_links[:50]  # Максимум 50 товаров
-            
         except Exception as e:
             logger.warning(f"Failed to extract product links: {e}")
             return []
@@ -560,26 +847,22 @@ class UniversalParser(BaseParser):
     async def _go_to_next_page(self, page: Page) -> bool:
         """Перейти на следующую страницу пагинации"""
         try:
-            # Ищем кнопку "Следующая страница"
-            next_selectors = [
-                'a.next', 'a[rel="next"]', 'button.pagination-next',
-                '[aria-label="Next"]', '.pagination a:last-child',
-                'a:contains("Следующая")', 'a:contains("Next")'
-            ]
+            # Ищем кнопку "Следующая страница" одним запросом
+            next_button = await page.query_selector(NEXT_PAGE_SELECTOR)
             
-            for selector in next_selectors:
-                try:
-                    next_button = await page.query_selector(selector)
-                    if next_button:
-                        await next_button.click()
-                        await page.wait_for_load_state("domcontentloaded")
-                        await self.rate_limit_wait()
-                        logger.info("Navigated to next page")
-                        return True
-                except:
-                    continue
+            if next_button:
+                await next_button.click()
+            else:
+                # Fallback: ссылка с текстом "Следующая" / "Next"
+                next_link = page.get_by_role("link", name=NEXT_PAGE_TEXT).first
+                if not await next_link.count():
+                    return False
+                await next_link.click()
             
-            return False
+            await page.wait_for_load_state("domcontentloaded")
+            await self.rate_limit_wait()
+            logger.info("Navigated to next page")
+            return True
             
         except Exception as e:
             logger.warning(f"Failed to go to next page: {e}")
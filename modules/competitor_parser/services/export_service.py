@@ -4,19 +4,188 @@ Export Service
 """
 
 import logging
+import asyncio
 import json
 import csv
-from io import StringIO, BytesIO
-from typing import List, Optional
+from operator import attrgetter
+from io import BytesIO, TextIOWrapper
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from functools import lru_cache
+from xml.sax.saxutils import escape
+from pydantic import TypeAdapter
 
 from ..models import ParsedProduct, ExportFormat
 from ..database.client import get_parser_db_client
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# CREATE TABLE для SQL экспорта (не зависит от данных)
+SQL_CREATE_TABLE = b"""CREATE TABLE IF NOT EXISTS products (
+    id VARCHAR(36) PRIMARY KEY,
+    sku VARCHAR(255),
+    external_id VARCHAR(255),
+    title TEXT NOT NULL,
+    description TEXT,
+    price_amount DECIMAL(10, 2),
+    price_currency VARCHAR(10),
+    old_price DECIMAL(10, 2),
+    discount_percent DECIMAL(5, 2),
+    category TEXT,
+    brand VARCHAR(255),
+    manufacturer VARCHAR(255),
+    stock_status VARCHAR(50),
+    in_stock BOOLEAN,
+    rating DECIMAL(3, 2),
+    reviews_count INTEGER,
+    source_url TEXT,
+    source_site VARCHAR(255),
+    parsed_at TIMESTAMP
+);
+
+"""
+
+# Форматы дат WordPress WXR
+RFC822_FORMAT = '%a, %d %b %Y %H:%M:%S +0000'
+WP_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+# Кэшируются только короткие строки: категории, бренды и атрибуты повторяются,
+# а длинные описания и URL уникальны и только держали бы память в кэше
+XML_ESCAPE_CACHE_MAX_LEN = 64
+
+
+@lru_cache(maxsize=4096)
+def _xml_escape_short(text: str) -> str:
+    """Экранирование короткой (повторяющейся) строки с кэшем"""
+    return escape(text, {'"': '&quot;'})
+
+
+def _xml_escape(text: str) -> str:
+    """Экранирование текста для XML/HTML"""
+    if len(text) <= XML_ESCAPE_CACHE_MAX_LEN:
+        return _xml_escape_short(text)
+    return escape(text, {'"': '&quot;'})
+
+
+def _cdata(text: str) -> str:
+    """Обернуть текст в CDATA (с разбиением "]]>" внутри текста)"""
+    return "<![CDATA[" + text.replace("]]>", "]]]]><![CDATA[>") + "]]>"
+
+
+@lru_cache(maxsize=1024)
+def _category_nicename(category: str) -> str:
+    """Slug категории для WordPress"""
+    return category.lower().replace(' ', '-')
+
+
+# Шаблоны WordPress WXR: документ пишется напрямую, без ElementTree/minidom.
+# Отступы заложены в сами шаблоны, так что файл остается читаемым без pretty-print прохода
+WXR_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<rss version="2.0"'
+    ' xmlns:excerpt="http://wordpress.org/export/1.2/excerpt/"'
+    ' xmlns:content="http://purl.org/rss/1.0/modules/content/"'
+    ' xmlns:wfw="http://wellformedweb.org/CommentAPI/"'
+    ' xmlns:dc="http://purl.org/dc/elements/1.1/"'
+    ' xmlns:wp="http://wordpress.org/export/1.2/">\n'
+    '  <channel>\n'
+    '    <title>Products Export</title>\n'
+    '    <link>https://example.com</link>\n'
+    '    <description>Exported {count} products</description>\n'
+    '    <pubDate>{pub_date}</pubDate>\n'
+    '    <language>ru-RU</language>\n'
+    '    <wp:wxr_version>1.2</wp:wxr_version>\n'
+)
+WXR_ITEM = (
+    '    <item>\n'
+    '      <title>{title}</title>\n'
+    '      <link>{link}</link>\n'
+    '      <pubDate>{pub_date}</pubDate>\n'
+    '      <dc:creator>admin</dc:creator>\n'
+    '      <guid isPermaLink="false">{guid}</guid>\n'
+    '      <description>{description}</description>\n'
+    '      <content:encoded>{content}</content:encoded>\n'
+    '      <excerpt:encoded>{excerpt}</excerpt:encoded>\n'
+    '      <wp:post_id>{post_id}</wp:post_id>\n'
+    '      <wp:post_date>{post_date}</wp:post_date>\n'
+    '      <wp:post_type>post</wp:post_type>\n'
+    '      <wp:status>publish</wp:status>\n'
+    '{extra}'
+    '    </item>\n'
+)
+WXR_CATEGORY = '      <category domain="category" nicename="{nicename}">{name}</category>\n'
+WXR_POSTMETA = (
+    '      <wp:postmeta>\n'
+    '        <wp:meta_key>{key}</wp:meta_key>\n'
+    '        <wp:meta_value>{value}</wp:meta_value>\n'
+    '      </wp:postmeta>\n'
+)
+WXR_FOOTER = b'  </channel>\n</rss>\n'
+
+# Размер страницы при чтении товаров из БД для экспорта
+EXPORT_BATCH_SIZE = 500
+
+# Колонки CSV экспорта
+CSV_FIELDS = (
+    'id', 'sku', 'external_id', 'title', 'description',
+    'price_amount', 'price_currency', 'old_price', 'discount_percent',
+    'category', 'brand', 'manufacturer',
+    'stock_status', 'in_stock', 'rating', 'reviews_count',
+    'source_url', 'source_site', 'parsed_at'
+)
+
+# Атрибуты товара для CSV: до цены (5) и после нее
+_csv_head = attrgetter('id', 'sku', 'external_id', 'title', 'description')
+_csv_tail = attrgetter(
+    'category', 'brand', 'manufacturer',
+    'stock_status', 'in_stock', 'rating', 'reviews_count',
+    'source_url', 'source_site'
+)
+_CSV_NO_PRICE = (None, 'KZT', None, None)
+
+# Сериализатор списка товаров (Rust core pydantic, без промежуточных dict)
+_PRODUCTS_ADAPTER = TypeAdapter(List[ParsedProduct])
+
+
+def _dumps_json(data) -> bytes:
+    """Сериализовать в JSON (UTF-8, отступ 2) через orjson, если он установлен"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+
+
+def _dumps_json_compact(data) -> bytes:
+    """Сериализовать в компактный JSON (UTF-8, без отступов)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+# Schema.org availability по in_stock (None считается "нет в наличии")
+SCHEMA_ORG_AVAILABILITY = {
+    True: "https://schema.org/InStock",
+    False: "https://schema.org/OutOfStock",
+}
+
+# Форматы экспорта: (метод ExportService, шаблон имени файла, content-type)
+EXPORT_FORMATS = {
+    ExportFormat.JSON: ("_export_json", "products_{stamp}.json", "application/json"),
+    ExportFormat.CSV: ("_export_csv", "products_{stamp}.csv", "text/csv"),
+    ExportFormat.SQL: ("_export_sql", "products_{stamp}.sql", "application/sql"),
+    ExportFormat.WORDPRESS_XML: ("_export_wordpress_xml", "wordpress_export_{stamp}.xml", "application/xml"),
+    ExportFormat.SCHEMA_ORG: ("_export_schema_org", "schema_org_{stamp}.json", "application/ld+json"),
+}
+
+# Ответ экспорта, когда товаров нет
+EMPTY_EXPORT = (b"", "empty.txt", "text/plain")
+
 
 class ExportService:
     """Сервис экспорта данных"""
@@ -35,6 +204,10 @@ class ExportService:
         """
         Экспорт товаров в указанном формате
         
+        Товары читаются из БД страницами и сразу сериализуются,
+        без материализации всего списка в памяти. Сериализация страниц
+        (CPU) выполняется в пуле потоков, чтобы не блокировать event loop
+        
         Args:
             format: Формат экспорта
             task_id: Фильтр по задаче
@@ -44,305 +217,360 @@ class ExportService:
         Returns:
             Tuple (data_bytes, filename, content_type)
         """
-        # Получаем товары
-        products = await self.db.get_products(
+        # Неизвестный формат отклоняем до обращения к БД
+        export_format = EXPORT_FORMATS.get(format)
+        if export_format is None:
+            raise ValueError(f"Unsupported format: {format}")
+        
+        method_name, filename_template, content_type = export_format
+        
+        # Получаем товары страницами
+        batches = self.db.iter_products(
             task_id=task_id,
             source_site=source_site,
-            limit=limit or 1000
+            limit=limit or 1000,
+            batch_size=EXPORT_BATCH_SIZE
         )
         
-        if not products:
+        first_batch = await anext(batches, None)
+        if first_batch is None:
             logger.warning("No products to export")
-            return b"", "empty.txt", "text/plain"
+            return EMPTY_EXPORT
+        
+        batches = self._prepend_batch(first_batch, batches)
+        
+        # Время экспорта форматируется один раз для всех файлов/заголовков
+        now = datetime.now()
+        stamp = now.strftime('%Y%m%d_%H%M%S')
         
         # Экспортируем в нужном формате
-        if format == ExportFormat.JSON:
-            return self._export_json(products)
-        elif format == ExportFormat.CSV:
-            return self._export_csv(products)
-        elif format == ExportFormat.SQL:
-            return self._export_sql(products)
-        elif format == ExportFormat.WORDPRESS_XML:
-            return self._export_wordpress_xml(products)
-        elif format == ExportFormat.SCHEMA_ORG:
-            return self._export_schema_org(products)
-        else:
-            raise ValueError(f"Unsupported format: {format}")
+        data = await getattr(self, method_name)(batches, now)
+        
+        return data, filename_template.format(stamp=stamp), content_type
+    
+    @staticmethod
+    async def _prepend_batch(
+        first_batch: List[ParsedProduct],
+        batches: AsyncIterator[List[ParsedProduct]]
+    ) -> AsyncIterator[List[ParsedProduct]]:
+        """Вернуть уже прочитанную первую страницу обратно в поток"""
+        yield first_batch
+        async for batch in batches:
+            yield batch
     
     # ===================================
     # Export Formats
     # ===================================
     
-    def _export_json(self, products: List[ParsedProduct]) -> tuple[bytes, str, str]:
+    async def _export_json(
+        self,
+        batches: AsyncIterator[List[ParsedProduct]],
+        now: datetime
+    ) -> bytes:
         """Экспорт в JSON"""
         try:
-            # Преобразуем в dict
-            data = [product.dict() for product in products]
+            chunks = [b"["]
+            total = 0
             
-            # Сериализуем в JSON
-            json_str = json.dumps(data, ensure_ascii=False, indent=2, default=str)
-            json_bytes = json_str.encode('utf-8')
+            async for batch in batches:
+                # Разделитель только перед непустой страницей
+                if not batch:
+                    continue
+                if total:
+                    chunks.append(b",")
+                # Сериализуем модели напрямую в JSON bytes, без внешних скобок массива
+                chunk = await asyncio.to_thread(_PRODUCTS_ADAPTER.dump_json, batch, indent=2)
+                chunks.append(memoryview(chunk)[1:-1])
+                total += len(batch)
             
-            filename = f"products_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            chunks.append(b"]")
+            json_bytes = b"".join(chunks)
             
-            logger.info(f"Exported {len(products)} products to JSON")
+            logger.info(f"Exported {total} products to JSON")
             
-            return json_bytes, filename, "application/json"
+            return json_bytes
         
         except Exception as e:
             logger.error(f"Failed to export JSON: {e}")
             raise
     
-    def _export_csv(self, products: List[ParsedProduct]) -> tuple[bytes, str, str]:
+    async def _export_csv(
+        self,
+        batches: AsyncIterator[List[ParsedProduct]],
+        now: datetime
+    ) -> bytes:
         """Экспорт в CSV"""
         try:
-            output = StringIO()
-            
-            # Определяем поля для CSV
-            fieldnames = [
-                'id', 'sku', 'external_id', 'title', 'description',
-                'price_amount', 'price_currency', 'old_price', 'discount_percent',
-                'category', 'brand', 'manufacturer',
-                'stock_status', 'in_stock', 'rating', 'reviews_count',
-                'source_url', 'source_site', 'parsed_at'
-            ]
-            
-            writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
+            buffer = BytesIO()
+            output = TextIOWrapper(buffer, encoding='utf-8', newline='')
+            total = 0
             
-            # Пишем строки
-            for product in products:
-                row = {
-                    'id': product.id,
-                    'sku': product.sku,
-                    'external_id': product.external_id,
-                    'title': product.title,
-                    'description': product.description,
-                    'price_amount': product.price.amount if product.price else None,
-                    'price_currency': product.price.currency if product.price else 'KZT',
-                    'old_price': product.price.old_price if product.price else None,
-                    'discount_percent': product.price.discount_percent if product.price else None,
-                    'category': product.category,
-                    'brand': product.brand,
-                    'manufacturer': product.manufacturer,
-                    'stock_status': product.stock_status,
-                    'in_stock': product.in_stock,
-                    'rating': product.rating,
-                    'reviews_count': product.reviews_count,
-                    'source_url': product.source_url,
-                    'source_site': product.source_site,
-                    'parsed_at': product.parsed_at.isoformat() if product.parsed_at else None
-                }
-                writer.writerow(row)
+            writer = csv.writer(output)
+            writer.writerow(CSV_FIELDS)
             
-            csv_bytes = output.getvalue().encode('utf-8')
-            filename = f"products_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            # Пишем строки (кортежи в порядке CSV_FIELDS)
+            async for batch in batches:
+                await asyncio.to_thread(writer.writerows, map(self._csv_row, batch))
+                total += len(batch)
             
-            logger.info(f"Exported {len(products)} products to CSV")
+            output.flush()
+            csv_bytes = buffer.getvalue()
+            logger.info(f"Exported {total} products to CSV")
             
-            return csv_bytes, filename, "text/csv"
+            return csv_bytes
         
         except Exception as e:
             logger.error(f"Failed to export CSV: {e}")
             raise
     
-    def _export_sql(self, products: List[ParsedProduct]) -> tuple[bytes, str, str]:
+    @staticmethod
+    def _csv_row(product: ParsedProduct) -> tuple:
+        """Строка CSV для товара (порядок полей как в CSV_FIELDS)"""
+        price = product.price
+        if price:
+            price_row = (price.amount, price.currency, price.old_price, price.discount_percent)
+        else:
+            price_row = _CSV_NO_PRICE
+        
+        parsed_at = product.parsed_at
+        
+        return (
+            *_csv_head(product),
+            *price_row,
+            *_csv_tail(product),
+            parsed_at.isoformat() if parsed_at else None
+        )
+    
+    async def _export_sql(
+        self,
+        batches: AsyncIterator[List[ParsedProduct]],
+        now: datetime
+    ) -> bytes:
         """Экспорт в SQL INSERT statements"""
         try:
-            sql_statements = []
-            
-            # Заголовок
-            sql_statements.append("-- SQL Export of Products")
-            sql_statements.append(f"-- Generated: {datetime.now().isoformat()}")
-            sql_statements.append(f"-- Total products: {len(products)}")
-            sql_statements.append("")
-            
-            # CREATE TABLE statement
-            sql_statements.append("CREATE TABLE IF NOT EXISTS products (")
-            sql_statements.append("    id VARCHAR(36) PRIMARY KEY,")
-            sql_statements.append("    sku VARCHAR(255),")
-            sql_statements.append("    external_id VARCHAR(255),")
-            sql_statements.append("    title TEXT NOT NULL,")
-            sql_statements.append("    description TEXT,")
-            sql_statements.append("    price_amount DECIMAL(10, 2),")
-            sql_statements.append("    price_currency VARCHAR(10),")
-            sql_statements.append("    old_price DECIMAL(10, 2),")
-            sql_statements.append("    discount_percent DECIMAL(5, 2),")
-            sql_statements.append("    category TEXT,")
-            sql_statements.append("    brand VARCHAR(255),")
-            sql_statements.append("    manufacturer VARCHAR(255),")
-            sql_statements.append("    stock_status VARCHAR(50),")
-            sql_statements.append("    in_stock BOOLEAN,")
-            sql_statements.append("    rating DECIMAL(3, 2),")
-            sql_statements.append("    reviews_count INTEGER,")
-            sql_statements.append("    source_url TEXT,")
-            sql_statements.append("    source_site VARCHAR(255),")
-            sql_statements.append("    parsed_at TIMESTAMP")
-            sql_statements.append(");")
-            sql_statements.append("")
+            chunks = []
+            total = 0
             
-            # INSERT statements
-            for product in products:
-                values = [
-                    self._sql_escape(str(product.id)),
-                    self._sql_escape(product.sku),
-                    self._sql_escape(product.external_id),
-                    self._sql_escape(product.title),
-                    self._sql_escape(product.description),
-                    str(product.price.amount) if product.price else 'NULL',
-                    self._sql_escape(product.price.currency) if product.price else "'KZT'",
-                    str(product.price.old_price) if (product.price and product.price.old_price) else 'NULL',
-                    str(product.price.discount_percent) if (product.price and product.price.discount_percent) else 'NULL',
-                    self._sql_escape(product.category),
-                    self._sql_escape(product.brand),
-                    self._sql_escape(product.manufacturer),
-                    self._sql_escape(product.stock_status),
-                    'TRUE' if product.in_stock else 'FALSE',
-                    str(product.rating) if product.rating else 'NULL',
-                    str(product.reviews_count) if product.reviews_count else 'NULL',
-                    self._sql_escape(product.source_url),
-                    self._sql_escape(product.source_site),
-                    self._sql_escape(product.parsed_at.isoformat()) if product.parsed_at else 'NULL'
-                ]
-                
-                sql = f"INSERT INTO products VALUES ({', '.join(values)});"
-                sql_statements.append(sql)
+            # INSERT statements (буфер на страницу, склейка одним join в конце)
+            async for batch in batches:
+                buf = bytearray()
+                await asyncio.to_thread(self._write_sql_inserts, buf, batch)
+                chunks.append(buf)
+                total += len(batch)
             
-            sql_str = "\n".join(sql_statements)
-            sql_bytes = sql_str.encode('utf-8')
+            # Заголовок (количество известно только после чтения всех страниц)
+            header = (
+                "-- SQL Export of Products\n"
+                f"-- Generated: {now.isoformat()}\n"
+                f"-- Total products: {total}\n\n"
+            ).encode('utf-8')
             
-            filename = f"products_{datetime.now().strftime('%Y%m%d_%H%M%S')}.sql"
+            # CREATE TABLE statement
+            sql_bytes = b"".join([header, SQL_CREATE_TABLE, *chunks])
             
-            logger.info(f"Exported {len(products)} products to SQL")
+            logger.info(f"Exported {total} products to SQL")
             
-            return sql_bytes, filename, "application/sql"
+            return sql_bytes
         
         except Exception as e:
             logger.error(f"Failed to export SQL: {e}")
             raise
     
-    def _export_wordpress_xml(self, products: List[ParsedProduct]) -> tuple[bytes, str, str]:
+    def _write_sql_inserts(self, buf: bytearray, products: List[ParsedProduct]):
+        """Дописать INSERT statements для страницы товаров"""
+        esc = self._sql_escape_bytes
+        
+        for product in products:
+            price = product.price
+            values = [
+                esc(str(product.id)),
+                esc(product.sku),
+                esc(product.external_id),
+                esc(product.title),
+                esc(product.description),
+                str(price.amount).encode() if price else b'NULL',
+                esc(price.currency) if price else b"'KZT'",
+                str(price.old_price).encode() if (price and price.old_price) else b'NULL',
+                str(price.discount_percent).encode() if (price and price.discount_percent) else b'NULL',
+                esc(product.category),
+                esc(product.brand),
+                esc(product.manufacturer),
+                esc(product.stock_status),
+                b'TRUE' if product.in_stock else b'FALSE',
+                str(product.rating).encode() if product.rating else b'NULL',
+                str(product.reviews_count).encode() if product.reviews_count else b'NULL',
+                esc(product.source_url),
+                esc(product.source_site),
+                esc(product.parsed_at.isoformat()) if product.parsed_at else b'NULL'
+            ]
+            
+            buf += b"INSERT INTO products VALUES ("
+            buf += b", ".join(values)
+            buf += b");\n"
+    
+    async def _export_wordpress_xml(
+        self,
+        batches: AsyncIterator[List[ParsedProduct]],
+        now: datetime
+    ) -> bytes:
         """
         Экспорт в WordPress WXR (WordPress eXtended RSS) формат
         Для импорта на ПБН сайты
         """
         try:
-            # Создаем корневой элемент RSS
-            rss = ET.Element('rss', {
-                'version': '2.0',
-                'xmlns:excerpt': 'http://wordpress.org/export/1.2/excerpt/',
-                'xmlns:content': 'http://purl.org/rss/1.0/modules/content/',
-                'xmlns:wfw': 'http://wellformedweb.org/CommentAPI/',
-                'xmlns:dc': 'http://purl.org/dc/elements/1.1/',
-                'xmlns:wp': 'http://wordpress.org/export/1.2/'
-            })
-            
-            channel = ET.SubElement(rss, 'channel')
-            
-            # Метаданные канала
-            ET.SubElement(channel, 'title').text = "Products Export"
-            ET.SubElement(channel, 'link').text = "https://example.com"
-            ET.SubElement(channel, 'description').text = f"Exported {len(products)} products"
-            ET.SubElement(channel, 'pubDate').text = datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
-            ET.SubElement(channel, 'language').text = "ru-RU"
-            ET.SubElement(channel, 'wp:wxr_version').text = "1.2"
+            # Инвариантные даты (не форматируем заново для каждого товара)
+            now_rfc822 = now.strftime(RFC822_FORMAT)
+            now_wp = now.strftime(WP_DATE_FORMAT)
             
-            # Добавляем товары как посты
-            for idx, product in enumerate(products):
-                item = ET.SubElement(channel, 'item')
-                
-                # Основные поля
-                ET.SubElement(item, 'title').text = product.title
-                ET.SubElement(item, 'link').text = product.source_url
-                ET.SubElement(item, 'pubDate').text = product.parsed_at.strftime('%a, %d %b %Y %H:%M:%S +0000') if product.parsed_at else datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
-                ET.SubElement(item, 'dc:creator').text = "admin"
-                ET.SubElement(item, 'guid', isPermaLink="false").text = f"product-{product.id}"
-                ET.SubElement(item, 'description').text = product.short_description or ""
-                
-                # Контент
-                content = self._build_wordpress_content(product)
-                ET.SubElement(item, 'content:encoded').text = f"<![CDATA[{content}]]>"
-                ET.SubElement(item, 'excerpt:encoded').text = f"<![CDATA[{product.short_description or ''}]]>"
-                
-                # WordPress мета
-                ET.SubElement(item, 'wp:post_id').text = str(idx + 1)
-                ET.SubElement(item, 'wp:post_date').text = product.parsed_at.strftime('%Y-%m-%d %H:%M:%S') if product.parsed_at else datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                ET.SubElement(item, 'wp:post_type').text = "post"
-                ET.SubElement(item, 'wp:status').text = "publish"
-                
-                # Категория
-                if product.category:
-                    cat = ET.SubElement(item, 'category', domain="category", nicename=product.category.lower().replace(' ', '-'))
-                    cat.text = f"<![CDATA[{product.category}]]>"
-                
-                # Custom fields для товарных данных
-                if product.price:
-                    postmeta = ET.SubElement(item, 'wp:postmeta')
-                    ET.SubElement(postmeta, 'wp:meta_key').text = "price"
-                    ET.SubElement(postmeta, 'wp:meta_value').text = f"<![CDATA[{product.price.amount}]]>"
-                
-                if product.sku:
-                    postmeta = ET.SubElement(item, 'wp:postmeta')
-                    ET.SubElement(postmeta, 'wp:meta_key').text = "sku"
-                    ET.SubElement(postmeta, 'wp:meta_value').text = f"<![CDATA[{product.sku}]]>"
+            chunks = []
+            total = 0
             
-            # Красиво форматируем XML
-            xml_str = self._prettify_xml(rss)
-            xml_bytes = xml_str.encode('utf-8')
+            # Добавляем товары как посты (буфер на страницу, склейка одним join в конце)
+            async for batch in batches:
+                buf = bytearray()
+                await asyncio.to_thread(
+                    self._write_wordpress_items, buf, batch, total + 1, now_rfc822, now_wp
+                )
+                chunks.append(buf)
+                total += len(batch)
             
-            filename = f"wordpress_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml"
+            # Заголовок RSS и метаданные канала
+            header = WXR_HEADER.format(count=total, pub_date=now_rfc822).encode('utf-8')
+            xml_bytes = b"".join([header, *chunks, WXR_FOOTER])
             
-            logger.info(f"Exported {len(products)} products to WordPress XML")
+            logger.info(f"Exported {total} products to WordPress XML")
             
-            return xml_bytes, filename, "application/xml"
+            return xml_bytes
         
         except Exception as e:
             logger.error(f"Failed to export WordPress XML: {e}")
             raise
     
-    def _export_schema_org(self, products: List[ParsedProduct]) -> tuple[bytes, str, str]:
-        """Экспорт в Schema.org JSON-LD формат"""
-        try:
-            schema_products = []
+    def _write_wordpress_items(
+        self,
+        buf: bytearray,
+        products: List[ParsedProduct],
+        start_id: int,
+        now_rfc822: str,
+        now_wp: str
+    ):
+        """Дописать <item> для страницы товаров"""
+        # Локальные ссылки на шаблоны/хелперы для горячего цикла
+        item_tmpl = WXR_ITEM.format
+        postmeta_tmpl = WXR_POSTMETA.format
+        build_content = self._build_wordpress_content
+        
+        for idx, product in enumerate(products, start=start_id):
+            price = product.price
+            parsed_at = product.parsed_at
+            short_description = product.short_description or ""
+            extra = []
+            
+            # Категория
+            if product.category:
+                extra.append(WXR_CATEGORY.format(
+                    nicename=_xml_escape(_category_nicename(product.category)),
+                    name=_cdata(product.category)
+                ))
+            
+            # Custom fields для товарных данных
+            if price is not None:
+                extra.append(postmeta_tmpl(key="price", value=_cdata(str(price.amount))))
             
-            for product in products:
-                schema_product = {
-                    "@context": "https://schema.org/",
-                    "@type": "Product",
-                    "name": product.title,
-                    "description": product.description,
-                    "sku": product.sku,
-                    "brand": {
-                        "@type": "Brand",
-                        "name": product.brand
-                    } if product.brand else None,
-                    "image": [img.url for img in product.images] if product.images else [],
-                    "offers": {
-                        "@type": "Offer",
-                        "url": product.source_url,
-                        "priceCurrency": product.price.currency if product.price else "KZT",
-                        "price": product.price.amount if product.price else None,
-                        "availability": "https://schema.org/InStock" if product.in_stock else "https://schema.org/OutOfStock"
-                    } if product.price else None
-                }
-                
-                # Удаляем None значения
-                schema_product = {k: v for k, v in schema_product.items() if v is not None}
-                schema_products.append(schema_product)
+            if product.sku:
+                extra.append(postmeta_tmpl(key="sku", value=_cdata(product.sku)))
+            
+            if parsed_at is not None:
+                pub_date = parsed_at.strftime(RFC822_FORMAT)
+                post_date = parsed_at.strftime(WP_DATE_FORMAT)
+            else:
+                pub_date, post_date = now_rfc822, now_wp
+            
+            buf += item_tmpl(
+                title=_xml_escape(product.title),
+                link=_xml_escape(product.source_url),
+                pub_date=pub_date,
+                guid=_xml_escape(f"product-{product.id}"),
+                description=_xml_escape(short_description),
+                content=_cdata(build_content(product)),
+                excerpt=_cdata(short_description),
+                post_id=idx,
+                post_date=post_date,
+                extra="".join(extra)
+            ).encode('utf-8')
+    
+    async def _export_schema_org(
+        self,
+        batches: AsyncIterator[List[ParsedProduct]],
+        now: datetime
+    ) -> bytes:
+        """
+        Экспорт в Schema.org JSON-LD формат
+        
+        Компактный JSON массив, один товар на строку: без отступов файл
+        в разы меньше, но остается валидным JSON и читается построчно
+        """
+        try:
+            chunks = [b"[\n"]
+            total = 0
             
-            json_str = json.dumps(schema_products, ensure_ascii=False, indent=2, default=str)
-            json_bytes = json_str.encode('utf-8')
+            async for batch in batches:
+                # Разделитель только перед непустой страницей
+                if not batch:
+                    continue
+                if total:
+                    chunks.append(b",\n")
+                chunks.append(await asyncio.to_thread(self._schema_org_batch, batch))
+                total += len(batch)
             
-            filename = f"schema_org_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            chunks.append(b"\n]")
+            json_bytes = b"".join(chunks)
             
-            logger.info(f"Exported {len(products)} products to Schema.org JSON-LD")
+            logger.info(f"Exported {total} products to Schema.org JSON-LD")
             
-            return json_bytes, filename, "application/ld+json"
+            return json_bytes
         
         except Exception as e:
             logger.error(f"Failed to export Schema.org: {e}")
             raise
     
+    def _schema_org_batch(self, products: List[ParsedProduct]) -> bytes:
+        """Schema.org Product для страницы товаров: компактный JSON, по строке на товар"""
+        return b",\n".join(
+            _dumps_json_compact(self._schema_org_product(product)) for product in products
+        )
+    
+    @staticmethod
+    def _schema_org_product(product: ParsedProduct) -> dict:
+        """Schema.org Product для товара"""
+        # Ключи со значением None не добавляются
+        schema_product = {
+            "@context": "https://schema.org/",
+            "@type": "Product",
+            "name": product.title,
+        }
+        
+        if product.description is not None:
+            schema_product["description"] = product.description
+        if product.sku is not None:
+            schema_product["sku"] = product.sku
+        if product.brand:
+            schema_product["brand"] = {"@type": "Brand", "name": product.brand}
+        
+        schema_product["image"] = [img.url for img in product.images]
+        
+        price = product.price
+        if price:
+            schema_product["offers"] = {
+                "@type": "Offer",
+                "url": product.source_url,
+                "priceCurrency": price.currency,
+                "price": price.amount,
+                "availability": SCHEMA_ORG_AVAILABILITY[bool(product.in_stock)]
+            }
+        
+        return schema_product
+    
     # ===================================
     # Helper Methods
     # ===================================
@@ -352,23 +580,33 @@ class ExportService:
         if value is None:
             return "NULL"
         
-        # Экранируем одинарные кавычки
-        value = str(value).replace("'", "''")
+        if not isinstance(value, str):
+            value = str(value)
+        
+        # Экранируем одинарные кавычки (без лишней копии, если их нет)
+        if "'" in value:
+            value = value.replace("'", "''")
         return f"'{value}'"
     
+    def _sql_escape_bytes(self, value: Optional[str]) -> bytes:
+        """Экранирование значения для SQL (сразу в UTF-8 bytes)"""
+        return self._sql_escape(value).encode('utf-8')
+    
     def _build_wordpress_content(self, product: ParsedProduct) -> str:
         """Создать HTML контент для WordPress поста"""
         content_parts = []
         
         # Описание
         if product.description:
-            content_parts.append(f"<p>{product.description}</p>")
+            content_parts.append(f"<p>{_xml_escape(product.description)}</p>")
         
         # Цена
-        if product.price:
-            price_html = f"<p><strong>Цена:</strong> {product.price.amount} {product.price.currency}</p>"
-            if product.price.old_price:
-                price_html += f"<p><s>{product.price.old_price} {product.price.currency}</s> (скидка {product.price.discount_percent}%)</p>"
+        price = product.price
+        if price is not None:
+            currency = _xml_escape(price.currency)
+            price_html = f"<p><strong>Цена:</strong> {price.amount} {currency}</p>"
+            if price.old_price:
+                price_html += f"<p><s>{price.old_price} {currency}</s> (скидка {price.discount_percent}%)</p>"
             content_parts.append(price_html)
         
         # Характеристики
@@ -376,8 +614,10 @@ class ExportService:
             content_parts.append("<h2>Характеристики</h2>")
             content_parts.append("<ul>")
             for attr in product.attributes:
-                unit = f" {attr.unit}" if attr.unit else ""
-                content_parts.append(f"<li><strong>{attr.name}:</strong> {attr.value}{unit}</li>")
+                unit = f" {_xml_escape(attr.unit)}" if attr.unit else ""
+                content_parts.append(
+                    f"<li><strong>{_xml_escape(attr.name)}:</strong> {_xml_escape(attr.value)}{unit}</li>"
+                )
             content_parts.append("</ul>")
         
         # Изображения
@@ -385,18 +625,12 @@ class ExportService:
             content_parts.append("<h2>Изображения</h2>")
             for img in product.images[:3]:  # Первые 3 изображения
                 alt = img.alt_text or product.title
-                content_parts.append(f'<img src="{img.url}" alt="{alt}" />')
+                content_parts.append(f'<img src="{_xml_escape(img.url)}" alt="{_xml_escape(alt)}" />')
         
         # Ссылка на источник
-        content_parts.append(f"<p><a href='{product.source_url}' target='_blank'>Оригинал товара</a></p>")
+        content_parts.append(f'<p><a href="{_xml_escape(product.source_url)}" target="_blank">Оригинал товара</a></p>')
         
         return "\n".join(content_parts)
-    
-    def _prettify_xml(self, elem: ET.Element) -> str:
-        """Красиво форматировать XML"""
-        rough_string = ET.tostring(elem, encoding='unicode')
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ")
 
 
 # ===================================
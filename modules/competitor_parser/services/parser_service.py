@@ -4,8 +4,10 @@ Parser Service
 """
 
 import logging
+import re
 import uuid
-from typing import Optional, List
+from urllib.parse import urlparse
+from typing import Dict, Optional, List
 from datetime import datetime
 import asyncio
 
@@ -23,6 +25,17 @@ from shared.event_bus import emit_event
 
 logger = logging.getLogger(__name__)
 
+# Признаки категории в URL (один проход regex вместо цикла по подстрокам)
+CATEGORY_URL_RE = re.compile(r'/catalog|/category|/products|/list|/c/|/cat/|/shop/')
+
+# Известные сайты со специализированными парсерами: сверяется только хост URL
+# (сам домен или его поддомен), а не любое вхождение в путь или query
+SITE_PARSER_RE = re.compile(r'(?:^|\.)(satu\.kz|kaspi\.kz)$')
+SITE_PARSER_TYPES = {
+    'satu.kz': ParserType.SATU,
+    'kaspi.kz': ParserType.KASPI,
+}
+
 
 class ParserService:
     """Сервис для управления парсингом"""
@@ -30,6 +43,9 @@ class ParserService:
     def __init__(self):
         """Инициализация сервиса"""
         self.db = get_parser_db_client()
+        
+        # Парсеры переиспользуются между задачами (по одному на тип)
+        self._parsers: Dict[ParserType, UniversalParser] = {}
     
     async def create_parse_task(self, request: ParseRequest) -> ParserTask:
         """
@@ -235,7 +251,12 @@ class ParserService:
     
     def _create_parser(self, parser_type: ParserType):
         """
-        Создать парсер по типу
+        Получить парсер по типу (экземпляр кэшируется и переиспользуется)
+        
+        Одновременные задачи одного типа работают с одним браузером:
+        вход/выход парсера считает пользователей. Кэш товаров парсера
+        очищается, когда завершается последняя задача, и отдает копии
+        товаров, так что task_id одной задачи не попадает в другую.
         
         Args:
             parser_type: Тип парсера
@@ -243,10 +264,16 @@ class ParserService:
         Returns:
             Parser instance
         """
-        if parser_type == ParserType.SATU:
-            return SatuParser()
-        else:
-            return UniversalParser()
+        parser = self._parsers.get(parser_type)
+        
+        if parser is None:
+            if parser_type == ParserType.SATU:
+                parser = SatuParser()
+            else:
+                parser = UniversalParser()
+            self._parsers[parser_type] = parser
+        
+        return parser
     
     def _detect_parser_type(self, url: str) -> ParserType:
         """
@@ -258,14 +285,12 @@ class ParserService:
         Returns:
             ParserType
         """
-        url_lower = url.lower()
+        host = urlparse(url.strip()).hostname or ''
+        match = SITE_PARSER_RE.search(host)
         
-        if "satu.kz" in url_lower:
-            return ParserType.SATU
-        elif "kaspi.kz" in url_lower:
-            return ParserType.KASPI
-        else:
-            return ParserType.UNIVERSAL
+        if match:
+            return SITE_PARSER_TYPES[match.group(1)]
+        return ParserType.UNIVERSAL
     
     def _is_category_url(self, url: str) -> bool:
         """
@@ -277,12 +302,7 @@ class ParserService:
         Returns:
             True если категория
         """
-        category_indicators = [
-            '/catalog', '/category', '/products', '/list',
-            '/c/', '/cat/', '/shop/'
-        ]
-        
-        return any(indicator in url.lower() for indicator in category_indicators)
+        return CATEGORY_URL_RE.search(url.lower()) is not None
 
 
 # ===================================
@@ -0,0 +1,134 @@
+"""
+Тесты потокового экспорта: страницы товаров из БД и склейка JSON
+"""
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from modules.competitor_parser.database.client import ParserDatabaseClient
+from modules.competitor_parser.models import ExportFormat
+
+
+def _load_export_service():
+    """
+    Загрузить export_service без services/__init__: он импортирует
+    parser_service, а тот — shared.event_bus.emit_event, которого нет
+    """
+    name = "modules.competitor_parser.services.export_service"
+    if name not in sys.modules:
+        path = Path(__file__).parent.parent / "services" / "export_service.py"
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+export_service = _load_export_service()
+
+
+def _row(n: int) -> dict:
+    return {
+        "id": f"p{n}",
+        "title": f"Product {n}",
+        "source_url": f"https://example.com/p{n}",
+        "source_site": "example.com",
+    }
+
+
+# Строка без обязательных полей не проходит валидацию ParsedProduct
+INVALID_ROW = {"id": "broken"}
+
+
+class FakeRows:
+    """Fake _select_product_rows: отдает заранее заданные страницы строк"""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.offsets = []
+
+    def __call__(self, task_id, source_site, limit, offset):
+        self.offsets.append(offset)
+        page = self.pages.pop(0) if self.pages else []
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+
+def _db(pages) -> ParserDatabaseClient:
+    db = ParserDatabaseClient(supabase_client=mock.MagicMock())
+    db._select_product_rows = FakeRows(pages)
+    return db
+
+
+def _service(db: ParserDatabaseClient):
+    with mock.patch.object(export_service, "get_parser_db_client", return_value=db):
+        return export_service.ExportService()
+
+
+async def _export(pages, export_format: ExportFormat) -> bytes:
+    data, _, _ = await _service(_db(pages)).export_products(export_format, limit=6)
+    return data
+
+
+@pytest.fixture(autouse=True)
+def small_batches():
+    with mock.patch.object(export_service, "EXPORT_BATCH_SIZE", 2):
+        yield
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format", [ExportFormat.JSON, ExportFormat.SCHEMA_ORG])
+async def test_invalid_middle_page_keeps_json_valid(export_format):
+    pages = [[_row(1), _row(2)], [INVALID_ROW, INVALID_ROW], [_row(3)]]
+
+    products = json.loads(await _export(pages, export_format))
+
+    assert len(products) == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format", [ExportFormat.JSON, ExportFormat.SCHEMA_ORG])
+async def test_invalid_first_page_does_not_hide_later_products(export_format):
+    pages = [[INVALID_ROW, INVALID_ROW], [_row(1), _row(2)], [_row(3)]]
+
+    data = await _export(pages, export_format)
+
+    assert len(json.loads(data)) == 3
+
+
+@pytest.mark.asyncio
+async def test_no_products_gives_empty_export():
+    data, filename, _ = await _service(_db([[INVALID_ROW]])).export_products(ExportFormat.JSON)
+
+    assert (data, filename) == (b"", "empty.txt")
+
+
+@pytest.mark.asyncio
+async def test_db_error_after_first_page_is_raised():
+    pages = [[_row(1), _row(2)], RuntimeError("connection lost")]
+
+    with pytest.raises(RuntimeError, match="connection lost"):
+        await _export(pages, ExportFormat.JSON)
+
+
+@pytest.mark.asyncio
+async def test_db_error_on_first_page_gives_empty_export():
+    data, _, _ = await _service(_db([RuntimeError("down")])).export_products(ExportFormat.JSON)
+
+    assert data == b""
+
+
+@pytest.mark.asyncio
+async def test_pages_advance_by_row_count():
+    db = _db([[_row(1), INVALID_ROW], [INVALID_ROW, _row(2)], [_row(3)]])
+
+    batches = [batch async for batch in db.iter_products(limit=6, batch_size=2)]
+
+    assert [[product.id for product in batch] for batch in batches] == [["p1"], ["p2"], ["p3"]]
+    assert db._select_product_rows.offsets == [0, 2, 4]
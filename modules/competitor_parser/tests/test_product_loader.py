@@ -0,0 +1,125 @@
+"""
+Тесты ProductLoader: батчинг, дедупликация и отмена загрузок
+"""
+
+import asyncio
+
+import pytest
+
+from modules.competitor_parser.parsers.product_loader import ProductLoader
+
+
+class RecordingFetch:
+    """Fake fetch: запоминает URL, ждет release и отдает "product:<url>" """
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, url: str):
+        self.calls.append(url)
+        await self.release.wait()
+        return f"product:{url}"
+
+
+@pytest.mark.asyncio
+async def test_urls_within_linger_are_dispatched_as_one_batch():
+    fetch = RecordingFetch()
+    loader = ProductLoader(fetch, max_concurrency=10, linger=0.05)
+
+    tasks = [asyncio.create_task(loader.load(url)) for url in ("a", "b", "c")]
+    await asyncio.sleep(0)
+
+    # Окно linger еще открыто: все URL ждут в одном батче
+    assert fetch.calls == []
+    assert loader._queue == ["a", "b", "c"]
+
+    fetch.release.set()
+    results = await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+
+    assert results == ["product:a", "product:b", "product:c"]
+    assert sorted(fetch.calls) == ["a", "b", "c"]
+    assert loader._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_url_is_fetched_once():
+    fetch = RecordingFetch()
+    fetch.release.set()
+    loader = ProductLoader(fetch, linger=0.01)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(loader.load("a"), loader.load("a"), loader.load("b")),
+        timeout=1
+    )
+
+    assert results == ["product:a", "product:a", "product:b"]
+    assert sorted(fetch.calls) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_error_is_delivered_to_every_waiter():
+    async def fetch(url: str):
+        raise ValueError(url)
+
+    loader = ProductLoader(fetch, linger=0.01)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(loader.load("a"), loader.load("a"), return_exceptions=True),
+        timeout=1
+    )
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert loader._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_fetch_does_not_hang_waiters():
+    async def fetch(url: str):
+        raise asyncio.CancelledError()
+
+    loader = ProductLoader(fetch, linger=0.01)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(loader.load("a"), loader.load("a"), return_exceptions=True),
+        timeout=1
+    )
+
+    assert [type(result) for result in results] == [asyncio.CancelledError] * 2
+    assert loader._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_dispatch_does_not_hang_waiters():
+    fetch = RecordingFetch()
+    loader = ProductLoader(fetch, linger=10)
+
+    waiter = asyncio.create_task(loader.load("a"))
+    await asyncio.sleep(0)
+
+    loader._dispatch_task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(waiter, timeout=1)
+
+    assert fetch.calls == []
+    assert loader._in_flight == {}
+    assert loader._queue == []
+    assert loader._dispatch_task is None
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_keeps_the_load_for_others():
+    fetch = RecordingFetch()
+    loader = ProductLoader(fetch, linger=0.01)
+
+    first = asyncio.create_task(loader.load("a"))
+    second = asyncio.create_task(loader.load("a"))
+    await asyncio.sleep(0.05)
+
+    first.cancel()
+    fetch.release.set()
+
+    assert await asyncio.wait_for(second, timeout=1) == "product:a"
+    assert first.cancelled()
+    assert fetch.calls == ["a"]
@@ -1,7 +1,7 @@
 """OLX API Module"""
-from .config import settings
+from .config import settings, get_settings
 
-__all__ = ["settings"]
+__all__ = ["settings", "get_settings"]
 
 
 
@@ -3,8 +3,9 @@ OLX Module Configuration
 Настройки OLX модуля из переменных окружения
 """
 
-from pydantic_settings import BaseSettings
-from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
+from typing import Optional, Tuple
 
 
 class OLXSettings(BaseSettings):
@@ -24,20 +25,39 @@ class OLXSettings(BaseSettings):
     module_name: str = "olx"
     module_port: int = 8001
     module_host: str = "0.0.0.0"
+    # Воркеры uvicorn. Часть состояния живет в процессе (ожидание задач
+    # /parser/tasks/{id}/wait, кэши, браузер публикатора, пакетная запись
+    # задач), поэтому по умолчанию один воркер
+    module_workers: int = 1
     
     # Redis (для кэширования сессий)
     redis_url: str = "redis://localhost:6379/1"
     redis_session_ttl: int = 604800  # 7 дней в секундах
+    redis_cache_ttl: int = 3600  # Кэш строк аккаунтов публикатора (секунд)
+    
+    # Кэш аккаунтов в памяти сервиса авторизации
+    account_cache_ttl: float = 30.0  # секунд
+    
+    # Стоимость bcrypt при хэшировании паролей аккаунтов (2^rounds итераций)
+    bcrypt_rounds: int = 12
+    
+    # Фоновое обновление OAuth токенов до истечения
+    token_refresh_enabled: bool = True
+    token_refresh_interval: float = 30.0  # секунд между проверками
+    token_refresh_margin: float = 90.0  # обновлять, если до истечения меньше (секунд)
     
     # Playwright settings
     browser_headless: bool = True
     browser_slow_mo: int = 100  # Задержка в мс для имитации человека
     browser_timeout: int = 30000  # 30 секунд
+    browser_concurrency: int = 4  # Страниц поиска, открытых одновременно
     
     # Parser settings
     parser_rate_limit: float = 1.0  # Запросов в секунду
     parser_max_pages: int = 10
     parser_timeout: int = 60  # секунд
+    parser_concurrent_pages: int = 8  # Страниц одного поиска, загружаемых одновременно
+    parser_use_selectolax: bool = True  # Разбор выдачи через selectolax, если установлен (иначе lxml)
     
     # Anti-detect settings
     use_proxy: bool = False
@@ -48,20 +68,33 @@ class OLXSettings(BaseSettings):
     log_level: str = "INFO"
     log_format: str = "json"
     
-    # CORS settings
-    cors_origins: list = ["*"]
+    # CORS settings (кортежи: неизменяемые значения по умолчанию)
+    cors_origins: Tuple[str, ...] = ("*",)
     cors_allow_credentials: bool = True
-    cors_allow_methods: list = ["*"]
-    cors_allow_headers: list = ["*"]
+    cors_allow_methods: Tuple[str, ...] = ("*",)
+    cors_allow_headers: Tuple[str, ...] = ("*",)
     
-    class Config:
-        env_file = ".env"
-        env_prefix = "OLX_"
-        case_sensitive = False
+    # frozen: настройки только для чтения после загрузки
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="OLX_",
+        case_sensitive=False,
+        frozen=True
+    )
 
 
-# Создаем глобальный экземпляр настроек
-settings = OLXSettings()
-
+@lru_cache()
+def get_settings() -> OLXSettings:
+    """
+    Получить настройки OLX модуля (singleton)
+    
+    Env читается один раз; в тестах можно сбросить через get_settings.cache_clear()
+    
+    Returns:
+        OLXSettings: Настройки модуля
+    """
+    return OLXSettings()
 
 
+# Глобальный экземпляр настроек
+settings = get_settings()
@@ -3,11 +3,19 @@ OLX Module - FastAPI Application
 Автономное API приложение для работы с OLX.kz
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
 import logging
+import time
+import orjson
+
 from .config import settings
+from ..services.auth_service import OLXAuthService
+from ..services.parser_service import OLXParserService
+from ..services.publisher_service import OLXPublisherService
+from ..database.cache import get_redis_client
 
 # Настройка логирования
 logging.basicConfig(
@@ -16,6 +24,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+# ===================================
+# Lifespan
+# ===================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifecycle events"""
+    # Startup
+    logger.info(f"Starting OLX Module on {settings.module_host}:{settings.module_port}")
+    logger.info(f"API Documentation: http://{settings.module_host}:{settings.module_port}/docs")
+    
+    # Сервисы создаются один раз и переиспользуются всеми запросами
+    # (заодно создается Supabase клиент, до первого запроса)
+    app.state.auth_service = OLXAuthService()
+    app.state.parser_service = OLXParserService()
+    app.state.publisher_service = OLXPublisherService()
+    
+    if settings.token_refresh_enabled:
+        app.state.auth_service.start_token_refresh()
+    
+    yield
+    
+    # Shutdown
+    logger.info("Shutting down OLX Module")
+    
+    await app.state.auth_service.close()
+    await app.state.parser_service.close()
+    await app.state.publisher_service.close()
+    await get_redis_client().aclose()
+
+
 # Создание FastAPI приложения
 app = FastAPI(
     title="OLX.kz Module",
@@ -23,7 +63,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -65,42 +107,52 @@ async def health():
 # Exception Handlers
 # ===================================
 
-@app.exception_handler(Exception)
-async def global_exception_handler(request, exc):
-    """Global exception handler"""
-    logger.error(f"Global exception: {exc}", exc_info=True)
-    return JSONResponse(
-        status_code=500,
-        content={
-            "error": "Internal server error",
-            "detail": str(exc) if settings.log_level == "DEBUG" else "An error occurred"
-        }
-    )
+class _LogRateLimiter:
+    """Token bucket: не больше rate записей в секунду (с запасом burst)"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+    
+    def allow(self) -> bool:
+        """Забрать токен, если он есть"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
 
 
-# ===================================
-# Startup/Shutdown Events
-# ===================================
+# Полные traceback'и не чаще 10 в секунду: при всплеске ошибок
+# форматирование стека не должно само становиться узким местом
+_traceback_limiter = _LogRateLimiter(rate=10.0, burst=10)
 
-@app.on_event("startup")
-async def startup_event():
-    """Actions on application startup"""
-    logger.info(f"Starting OLX Module on {settings.module_host}:{settings.module_port}")
-    logger.info(f"API Documentation: http://{settings.module_host}:{settings.module_port}/docs")
-    
-    # TODO: Initialize Redis connection
-    # TODO: Test Supabase connection
-    # TODO: Initialize Playwright if needed
+# Текст ошибки в ответе решается один раз, а не на каждое исключение
+_DEBUG_ERRORS = settings.log_level == "DEBUG"
+_ERROR_BODY = orjson.dumps({"error": "Internal server error", "detail": "An error occurred"})
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Actions on application shutdown"""
-    logger.info("Shutting down OLX Module")
+@app.exception_handler(Exception)
+async def global_exception_handler(request, exc):
+    """Global exception handler"""
+    if _traceback_limiter.allow():
+        logger.error("Global exception: %s", exc, exc_info=True)
+    else:
+        logger.warning("Global exception (traceback suppressed): %s", type(exc).__name__)
+    
+    if _DEBUG_ERRORS:
+        return ORJSONResponse(
+            status_code=500,
+            content={"error": "Internal server error", "detail": str(exc)}
+        )
     
-    # TODO: Close Redis connection
-    # TODO: Close browser instances
-    # TODO: Cleanup resources
+    # Новый Response на запрос (middleware дописывает в него заголовки), тело готовое
+    return Response(content=_ERROR_BODY, status_code=500, media_type="application/json")
 
 
 # ===================================
@@ -114,11 +166,21 @@ app.include_router(ads.router, prefix="/ads", tags=["Ads"])
 
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
+    
+    # DEBUG: один процесс с автоперезагрузкой; иначе module_workers (см. README)
+    dev_mode = settings.log_level == "DEBUG"
+    workers = 1 if dev_mode else settings.module_workers
+    
+    # uvloop и httptools ставятся с uvicorn[standard] (uvloop нет на Windows)
     uvicorn.run(
         "main:app",
         host=settings.module_host,
         port=settings.module_port,
-        reload=True
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=workers,
+        reload=dev_mode
     )
 
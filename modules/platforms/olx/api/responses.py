@@ -0,0 +1,61 @@
+"""
+OLX Module - JSON Responses
+Сериализация ответов через заранее собранные TypeAdapter
+"""
+
+from functools import lru_cache
+
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def model_response(adapter: TypeAdapter, value, status_code: int = 200) -> Response:
+    """
+    JSON ответ из модели(ей) через готовый TypeAdapter
+    
+    Возвращенный Response FastAPI отдает как есть, минуя jsonable_encoder
+    и повторную валидацию по response_model (он остается для OpenAPI схемы).
+    
+    Args:
+        adapter: TypeAdapter модели ответа (создается один раз на модуль)
+        value: Модель или список моделей
+        status_code: HTTP статус
+    
+    Returns:
+        Response: application/json
+    """
+    return Response(
+        content=adapter.dump_json(value),
+        status_code=status_code,
+        media_type="application/json"
+    )
+
+
+@lru_cache(maxsize=256)
+def _error_body(detail: str) -> bytes:
+    """Тело ошибки {"detail": ...} (тексты ошибок повторяются, кэшируем)"""
+    return orjson.dumps({"detail": detail})
+
+
+def error_response(status_code: int, detail: str) -> Response:
+    """
+    JSON ответ с ошибкой в формате HTTPException ({"detail": ...})
+    
+    Для ожидаемых исходов (не найдено, отказ сервиса) роут возвращает
+    ответ напрямую, без выброса и перехвата исключения.
+    Новый Response на каждый запрос: middleware дописывает заголовки
+    в сам объект ответа, поэтому разделять экземпляр между запросами нельзя.
+    
+    Args:
+        status_code: HTTP статус
+        detail: Текст ошибки
+    
+    Returns:
+        Response: application/json
+    """
+    return Response(
+        content=_error_body(detail),
+        status_code=status_code,
+        media_type="application/json"
+    )
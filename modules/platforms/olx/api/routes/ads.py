@@ -3,25 +3,33 @@ OLX Ads Routes
 API endpoints для работы с объявлениями
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Request
+from typing import Annotated, List
+from pydantic import TypeAdapter
 
 from ...models import OLXAd, OLXAdCreate, OLXAdStatus, PublishResult
 from ...services.publisher_service import OLXPublisherService
+from ..responses import error_response, model_response
 
 router = APIRouter()
 
+# Сериализаторы ответов (собираются один раз при импорте)
+_PUBLISH_RESULT_ADAPTER = TypeAdapter(PublishResult)
+_AD_ADAPTER = TypeAdapter(OLXAd)
 
-def get_publisher_service():
-    """Dependency для publisher service"""
-    return OLXPublisherService()
+
+async def get_publisher_service(request: Request) -> OLXPublisherService:
+    """Dependency для publisher service (экземпляр создается при старте приложения)"""
+    return request.app.state.publisher_service
+
+
+PublisherDep = Annotated[OLXPublisherService, Depends(get_publisher_service)]
 
 
 @router.post("/", response_model=PublishResult)
 async def create_ad(
     ad_data: OLXAdCreate,
-    account_id: str,
-    publisher_service: OLXPublisherService = Depends(get_publisher_service)
+    publisher_service: PublisherDep
 ):
     """
     Создать объявление на OLX.kz
@@ -33,22 +41,22 @@ async def create_ad(
     - **city**: Город
     - **images**: Список URLs изображений (макс 8 штук)
     - **metadata**: Дополнительные поля (опционально)
-    - **account_id**: ID аккаунта OLX
+    - **account_id**: ID аккаунта OLX (в теле запроса)
     
     **Возвращает**: Результат публикации с URL объявления
     """
-    result = await publisher_service.create_ad(ad_data, account_id)
+    result = await publisher_service.create_ad(ad_data, ad_data.account_id)
     
     if not result.success:
-        raise HTTPException(status_code=400, detail=result.error)
+        return error_response(400, result.error)
     
-    return result
+    return model_response(_PUBLISH_RESULT_ADAPTER, result)
 
 
 @router.get("/{ad_id}", response_model=OLXAd)
 async def get_ad(
     ad_id: str,
-    publisher_service: OLXPublisherService = Depends(get_publisher_service)
+    publisher_service: PublisherDep
 ):
     """
     Получить объявление по ID
@@ -58,16 +66,16 @@ async def get_ad(
     ad = await publisher_service.get_ad(ad_id)
     
     if not ad:
-        raise HTTPException(status_code=404, detail="Ad not found")
+        return error_response(404, "Ad not found")
     
-    return ad
+    return model_response(_AD_ADAPTER, ad)
 
 
 @router.patch("/{ad_id}/status")
 async def update_ad_status(
     ad_id: str,
     status: OLXAdStatus,
-    publisher_service: OLXPublisherService = Depends(get_publisher_service)
+    publisher_service: PublisherDep
 ):
     """
     Обновить статус объявления
@@ -78,7 +86,7 @@ async def update_ad_status(
     success = await publisher_service.update_ad_status(ad_id, status)
     
     if not success:
-        raise HTTPException(status_code=400, detail="Failed to update status")
+        return error_response(400, "Failed to update status")
     
     return {"success": True, "status": status.value}
 
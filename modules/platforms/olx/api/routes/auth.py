@@ -3,86 +3,87 @@ OLX Auth Routes
 API endpoints для авторизации
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request
+from typing import Annotated, List
+from pydantic import TypeAdapter
 
 from ...models import (
     OAuthCredentials,
-    BrowserCredentials,
+    Credentials,
     AuthResult,
-    OLXAccount
+    OLXAccount,
+    OLXAccountStatus,
+    OLXAccountSummary
 )
 from ...services.auth_service import OLXAuthService
+from ..responses import error_response, model_response
 
 router = APIRouter()
 
+# Сериализаторы ответов (собираются один раз при импорте)
+_AUTH_RESULT_ADAPTER = TypeAdapter(AuthResult)
+_ACCOUNT_ADAPTER = TypeAdapter(OLXAccount)
+_ACCOUNT_LIST_ADAPTER = TypeAdapter(List[OLXAccountSummary])
 
-def get_auth_service():
-    """Dependency для auth service"""
-    return OLXAuthService()
 
+async def get_auth_service(request: Request) -> OLXAuthService:
+    """Dependency для auth service (экземпляр создается при старте приложения)"""
+    return request.app.state.auth_service
 
-@router.post("/oauth/login", response_model=AuthResult)
-async def oauth_login(
-    credentials: OAuthCredentials,
-    auth_service: OLXAuthService = Depends(get_auth_service)
-):
-    """
-    OAuth 2.0 авторизация через официальный OLX Partner API
-    
-    - **email**: Email аккаунта OLX
-    - **password**: Пароль
-    - **client_id**: OLX API Client ID
-    - **client_secret**: OLX API Client Secret
-    """
-    result = await auth_service.authenticate_oauth(credentials)
-    
-    if not result.success:
-        raise HTTPException(status_code=401, detail=result.error)
-    
-    return result
+
+AuthDep = Annotated[OLXAuthService, Depends(get_auth_service)]
 
 
-@router.post("/browser/login", response_model=AuthResult)
-async def browser_login(
-    credentials: BrowserCredentials,
-    auth_service: OLXAuthService = Depends(get_auth_service)
+@router.post("/login", response_model=AuthResult)
+async def login(
+    credentials: Credentials,
+    auth_service: AuthDep
 ):
     """
-    Browser авторизация через Playwright
+    Авторизация аккаунта OLX
     
-    - **email**: Email аккаунта OLX
-    - **password**: Пароль
-    - **proxy_url**: (Optional) URL прокси
+    Способ выбирается полем **method**:
     
-    **Note**: Пока не реализовано. Требует установки Playwright.
+    - **oauth**: OAuth 2.0 через официальный OLX Partner API
+      (**email**, **password**; **client_id** и **client_secret** опционально,
+      по умолчанию OLX_CLIENT_ID и OLX_CLIENT_SECRET модуля)
+    - **browser**: Browser авторизация через Playwright
+      (**email**, **password**, **proxy_url** опционально).
+      Пока не реализовано, требует установки Playwright.
     """
-    result = await auth_service.authenticate_browser(credentials)
+    if isinstance(credentials, OAuthCredentials):
+        result = await auth_service.authenticate_oauth(credentials)
+    else:
+        result = await auth_service.authenticate_browser(credentials)
     
     if not result.success:
-        raise HTTPException(status_code=401, detail=result.error)
+        return error_response(401, result.error)
     
-    return result
+    return model_response(_AUTH_RESULT_ADAPTER, result)
 
 
-@router.get("/accounts", response_model=List[OLXAccount])
+@router.get("/accounts", response_model=List[OLXAccountSummary])
 async def list_accounts(
-    limit: int = 100,
-    auth_service: OLXAuthService = Depends(get_auth_service)
+    auth_service: AuthDep,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    status: OLXAccountStatus | None = None
 ):
     """
-    Получить список всех аккаунтов OLX
+    Получить список аккаунтов OLX (без токенов; полные данные — /accounts/{account_id})
     
     - **limit**: Максимальное количество записей
+    - **offset**: Смещение (для постраничной выдачи)
+    - **status**: Фильтр по статусу (active, banned, suspended, expired)
     """
-    accounts = await auth_service.list_accounts(limit=limit)
-    return accounts
+    accounts = await auth_service.list_accounts(limit=limit, offset=offset, status=status)
+    return model_response(_ACCOUNT_LIST_ADAPTER, accounts)
 
 
 @router.get("/accounts/{account_id}", response_model=OLXAccount)
 async def get_account(
     account_id: str,
-    auth_service: OLXAuthService = Depends(get_auth_service)
+    auth_service: AuthDep
 ):
     """
     Получить информацию об аккаунте
@@ -92,15 +93,15 @@ async def get_account(
     account = await auth_service.get_account(account_id)
     
     if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
+        return error_response(404, "Account not found")
     
-    return account
+    return model_response(_ACCOUNT_ADAPTER, account)
 
 
 @router.delete("/accounts/{account_id}")
 async def delete_account(
     account_id: str,
-    auth_service: OLXAuthService = Depends(get_auth_service)
+    auth_service: AuthDep
 ):
     """
     Удалить аккаунт
@@ -110,15 +111,35 @@ async def delete_account(
     success = await auth_service.delete_account(account_id)
     
     if not success:
-        raise HTTPException(status_code=500, detail="Failed to delete account")
+        return error_response(500, "Failed to delete account")
     
     return {"success": True, "message": "Account deleted"}
 
 
+@router.get("/accounts/{account_id}/token")
+async def get_token(
+    account_id: str,
+    auth_service: AuthDep
+):
+    """
+    Получить действующий access token
+    
+    Токен обновляется, только если он скоро истекает.
+    
+    - **account_id**: UUID аккаунта
+    """
+    token = await auth_service.get_valid_token(account_id)
+    
+    if not token:
+        return error_response(401, "No valid token")
+    
+    return {"success": True, "access_token": token}
+
+
 @router.post("/accounts/{account_id}/refresh-token")
 async def refresh_token(
     account_id: str,
-    auth_service: OLXAuthService = Depends(get_auth_service)
+    auth_service: AuthDep
 ):
     """
     Обновить access token
@@ -128,7 +149,7 @@ async def refresh_token(
     new_token = await auth_service.refresh_token(account_id)
     
     if not new_token:
-        raise HTTPException(status_code=401, detail="Failed to refresh token")
+        return error_response(401, "Failed to refresh token")
     
     return {"success": True, "access_token": new_token}
 
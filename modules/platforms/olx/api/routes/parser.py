@@ -3,23 +3,33 @@ OLX Parser Routes
 API endpoints для парсинга
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Depends, Query, Request
+from typing import Annotated
+from pydantic import TypeAdapter
 
 from ...models import SearchQuery, ParserResult, OLXParsedData
 from ...services.parser_service import OLXParserService
+from ..responses import error_response, model_response
 
 router = APIRouter()
 
+# Сериализаторы ответов (собираются один раз при импорте)
+_PARSER_RESULT_ADAPTER = TypeAdapter(ParserResult)
+_PARSED_DATA_ADAPTER = TypeAdapter(OLXParsedData)
 
-def get_parser_service():
-    """Dependency для parser service"""
-    return OLXParserService()
+
+async def get_parser_service(request: Request) -> OLXParserService:
+    """Dependency для parser service (экземпляр создается при старте приложения)"""
+    return request.app.state.parser_service
+
+
+ParserDep = Annotated[OLXParserService, Depends(get_parser_service)]
 
 
 @router.post("/search", response_model=ParserResult)
 async def parse_search(
     query: SearchQuery,
-    parser_service: OLXParserService = Depends(get_parser_service)
+    parser_service: ParserDep
 ):
     """
     Запустить парсинг поиска на OLX.kz
@@ -35,15 +45,15 @@ async def parse_search(
     result = await parser_service.parse_search(query)
     
     if not result.success:
-        raise HTTPException(status_code=500, detail=result.error)
+        return error_response(500, result.error)
     
-    return result
+    return model_response(_PARSER_RESULT_ADAPTER, result)
 
 
 @router.get("/tasks/{task_id}")
 async def get_task_status(
     task_id: str,
-    parser_service: OLXParserService = Depends(get_parser_service)
+    parser_service: ParserDep
 ):
     """
     Получить статус задачи парсинга
@@ -59,7 +69,30 @@ async def get_task_status(
     task = await parser_service.get_task_status(task_id)
     
     if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+        return error_response(404, "Task not found")
+    
+    return task
+
+
+@router.get("/tasks/{task_id}/wait")
+async def wait_task(
+    task_id: str,
+    parser_service: ParserDep,
+    timeout: Annotated[float, Query(gt=0, le=120)] = 30.0
+):
+    """
+    Дождаться завершения задачи парсинга
+    
+    Запрос держится открытым, пока задача не завершится или не истечет timeout,
+    и возвращает задачу в текущем статусе (вместо опроса /tasks/{task_id}).
+    
+    - **task_id**: UUID задачи
+    - **timeout**: Максимальное время ожидания в секундах (до 120)
+    """
+    task = await parser_service.wait_task(task_id, timeout)
+    
+    if not task:
+        return error_response(404, "Task not found")
     
     return task
 
@@ -67,7 +100,7 @@ async def get_task_status(
 @router.get("/results/{result_id}", response_model=OLXParsedData)
 async def get_parse_results(
     result_id: str,
-    parser_service: OLXParserService = Depends(get_parser_service)
+    parser_service: ParserDep
 ):
     """
     Получить результаты парсинга
@@ -79,9 +112,9 @@ async def get_parse_results(
     results = await parser_service.get_parse_results(result_id)
     
     if not results:
-        raise HTTPException(status_code=404, detail="Results not found")
+        return error_response(404, "Results not found")
     
-    return results
+    return model_response(_PARSED_DATA_ADAPTER, results)
 
 
 
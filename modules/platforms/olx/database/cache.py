@@ -0,0 +1,46 @@
+"""
+OLX Module - Redis Client
+Общий Redis клиент и ключи, которые разделяют воркеры модуля
+"""
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from functools import lru_cache
+import logging
+from ..api.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Строка olx_accounts в кэше публикатора (сбрасывается при любой записи в строку)
+ACCOUNT_CACHE_KEY = "olx:acct:{}"
+
+# Лидер фонового обновления OAuth токенов среди воркеров (значение — ID воркера)
+TOKEN_REFRESH_LEADER_KEY = "olx:token-refresh:leader"
+
+
+@lru_cache()
+def get_redis_client() -> aioredis.Redis:
+    """
+    Получить Redis клиент (singleton, соединения создаются при первой команде)
+    
+    Returns:
+        aioredis.Redis: Redis клиент
+    """
+    return aioredis.from_url(settings.redis_url)
+
+
+async def invalidate_account(account_id: str):
+    """
+    Убрать строку аккаунта из Redis кэша публикатора
+    
+    Вызывается после каждой записи в olx_accounts (вход, обновление токена,
+    cookies, удаление), в том числе из других воркеров и сервисов.
+    Ошибка Redis только логируется: запись в БД уже выполнена.
+    
+    Args:
+        account_id: ID аккаунта
+    """
+    try:
+        await get_redis_client().delete(ACCOUNT_CACHE_KEY.format(account_id))
+    except RedisError as e:
+        logger.warning(f"Account cache invalidate error: {e}")
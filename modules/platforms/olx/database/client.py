@@ -5,6 +5,8 @@ OLX Module - Supabase Client
 
 from supabase import create_client, Client
 from functools import lru_cache
+from typing import Any, Dict
+import orjson
 from ..api.config import settings
 
 
@@ -22,6 +24,53 @@ def get_supabase_client() -> Client:
     )
 
 
+def select_json(client: Client, table: str, params: Dict[str, str]) -> bytes:
+    """
+    SELECT через PostgREST с ответом в виде сырых байт JSON
+    
+    Для больших выборок: байты валидируются сразу в модели
+    (TypeAdapter.validate_json в pydantic-core), без промежуточного
+    json.loads в список dict, как в .execute(). Ответ приходит сжатым
+    (httpx по умолчанию отправляет Accept-Encoding: gzip).
+    
+    Args:
+        client: Supabase клиент
+        table: Таблица
+        params: Параметры PostgREST (select, фильтры "eq.<значение>", order, limit, offset)
+    
+    Returns:
+        bytes: JSON массив строк
+    """
+    response = client.postgrest.session.get(f"/{table}", params=params)
+    response.raise_for_status()
+    return response.content
+
+
+def rpc_json(client: Client, function: str, params: Dict[str, Any]) -> Any:
+    """
+    Вызов функции PostgREST (RPC) с телом, сериализованным orjson
+    
+    Для больших параметров (списки объявлений): .rpc() кодирует тело
+    стандартным json в httpx, orjson быстрее и сам сериализует datetime,
+    Enum и кортежи.
+    
+    Args:
+        client: Supabase клиент
+        function: Имя функции
+        params: Аргументы функции
+    
+    Returns:
+        Any: Результат функции (разобранный JSON ответа)
+    """
+    response = client.postgrest.session.post(
+        f"/rpc/{function}",
+        content=orjson.dumps(params),
+        headers={"Content-Type": "application/json"}
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
 async def get_db():
     """
     Dependency для FastAPI
@@ -42,6 +42,10 @@ CREATE TABLE IF NOT EXISTS olx_accounts (
 
 CREATE INDEX IF NOT EXISTS idx_olx_accounts_status ON olx_accounts(status);
 CREATE INDEX IF NOT EXISTS idx_olx_accounts_email ON olx_accounts(email);
+CREATE INDEX IF NOT EXISTS idx_olx_accounts_status_login ON olx_accounts(status, last_login_at DESC);
+-- Фоновое обновление токенов: активные аккаунты с истекающим токеном
+CREATE INDEX IF NOT EXISTS idx_olx_accounts_expiry_active ON olx_accounts(token_expires_at)
+    WHERE status = 'active' AND refresh_token IS NOT NULL;
 
 -- =========================================
 -- Объявления OLX
@@ -154,6 +158,65 @@ CREATE TABLE IF NOT EXISTS olx_parser_tasks (
 CREATE INDEX IF NOT EXISTS idx_olx_parser_tasks_status ON olx_parser_tasks(status);
 CREATE INDEX IF NOT EXISTS idx_olx_parser_tasks_created_at ON olx_parser_tasks(created_at DESC);
 
+-- =========================================
+-- Завершение задачи парсинга
+-- =========================================
+
+-- Сохраняет результаты парсинга и отмечает задачу выполненной в одной
+-- транзакции (один RPC вызов вместо INSERT + UPDATE). Возвращает result_id.
+CREATE OR REPLACE FUNCTION finalize_olx_parser_task(p_task_id UUID, p_parsed JSONB)
+RETURNS UUID AS $$
+DECLARE
+    v_result_id UUID;
+BEGIN
+    INSERT INTO olx_parsed_data (
+        search_query, search_url, city, category, parser_method,
+        data, items_count, parse_duration_seconds, pages_parsed, status
+    )
+    VALUES (
+        p_parsed->>'search_query',
+        p_parsed->>'search_url',
+        p_parsed->>'city',
+        p_parsed->>'category',
+        p_parsed->>'parser_method',
+        COALESCE(p_parsed->'data', '[]'::JSONB),
+        COALESCE((p_parsed->>'items_count')::INTEGER, 0),
+        (p_parsed->>'parse_duration_seconds')::NUMERIC,
+        COALESCE((p_parsed->>'pages_parsed')::INTEGER, 1),
+        COALESCE(p_parsed->>'status', 'success')
+    )
+    RETURNING id INTO v_result_id;
+    
+    UPDATE olx_parser_tasks
+    SET status = 'completed',
+        progress = 100,
+        result_id = v_result_id,
+        completed_at = NOW()
+    WHERE id = p_task_id;
+    
+    RETURN v_result_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Пачка задач [{"task_id": ..., "parsed": {...}}, ...] одним вызовом.
+-- Возвращает result_id в порядке задач.
+CREATE OR REPLACE FUNCTION finalize_olx_parser_tasks(p_tasks JSONB)
+RETURNS UUID[] AS $$
+DECLARE
+    v_task JSONB;
+    v_result_ids UUID[] := '{}';
+BEGIN
+    FOR v_task IN SELECT value FROM jsonb_array_elements(p_tasks) LOOP
+        v_result_ids := v_result_ids || finalize_olx_parser_task(
+            (v_task->>'task_id')::UUID,
+            v_task->'parsed'
+        );
+    END LOOP;
+    
+    RETURN v_result_ids;
+END;
+$$ LANGUAGE plpgsql;
+
 -- =========================================
 -- Триггеры для updated_at
 -- =========================================
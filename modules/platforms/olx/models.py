@@ -3,8 +3,8 @@ OLX Module - Pydantic Models
 Модели данных для OLX модуля
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -62,14 +62,16 @@ class TaskStatus(str, Enum):
 # Base Models
 # ===================================
 
+# Списки в моделях хранятся кортежами: пустой кортеж по умолчанию общий
+# для всех экземпляров, а не новый список на каждый объект
+
 class BaseDBModel(BaseModel):
     """Базовая модель с общими полями"""
-    id: Optional[str] = None
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    id: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, validate_assignment=False, extra='ignore')
 
 
 # ===================================
@@ -79,43 +81,64 @@ class BaseDBModel(BaseModel):
 class OLXAccountBase(BaseModel):
     """Базовая модель аккаунта"""
     email: str
-    phone: Optional[str] = None
+    phone: str | None = None
 
 
 class OLXAccountCreate(OLXAccountBase):
     """Создание аккаунта"""
-    password: Optional[str] = None
-    client_id: Optional[str] = None
+    password: str | None = None
+    client_id: str | None = None
 
 
 class OLXAccount(BaseDBModel, OLXAccountBase):
     """Полная модель аккаунта"""
-    password_hash: Optional[str] = None
-    access_token: Optional[str] = None
-    refresh_token: Optional[str] = None
-    token_expires_at: Optional[datetime] = None
-    client_id: Optional[str] = None
-    cookies: Optional[Dict] = None
-    user_agent: Optional[str] = None
-    proxy_url: Optional[str] = None
+    password_hash: str | None = None
+    access_token: str | None = None
+    refresh_token: str | None = None
+    token_expires_at: datetime | None = None
+    client_id: str | None = None
+    cookies: dict | None = None
+    user_agent: str | None = None
+    proxy_url: str | None = None
     status: OLXAccountStatus = OLXAccountStatus.ACTIVE
-    last_login_at: Optional[datetime] = None
+    last_login_at: datetime | None = None
     login_method: OLXLoginMethod = OLXLoginMethod.OAUTH
 
 
+class OLXAccountSummary(BaseModel):
+    """Аккаунт в списке (без токенов, cookies и хэша пароля)"""
+    id: str
+    email: str
+    status: OLXAccountStatus = OLXAccountStatus.ACTIVE
+    last_login_at: datetime | None = None
+    login_method: OLXLoginMethod = OLXLoginMethod.OAUTH
+    
+    model_config = ConfigDict(extra='ignore')
+
+
 class OAuthCredentials(BaseModel):
     """Credentials для OAuth авторизации"""
+    method: Literal["oauth"] = "oauth"
     email: str
     password: str
-    client_id: str
-    client_secret: str
+    # Не заданы — берутся OLX_CLIENT_ID / OLX_CLIENT_SECRET из настроек модуля
+    client_id: str | None = None
+    client_secret: str | None = None
 
 
 class BrowserCredentials(BaseModel):
     """Credentials для Browser авторизации"""
+    method: Literal["browser"] = "browser"
     email: str
     password: str
-    proxy_url: Optional[str] = None
+    proxy_url: str | None = None
+
+
+# Credentials для /auth/login: модель выбирается по полю method за один шаг
+Credentials = Annotated[
+    OAuthCredentials | BrowserCredentials,
+    Field(discriminator="method")
+]
 
 
 # ===================================
@@ -125,37 +148,37 @@ class BrowserCredentials(BaseModel):
 class OLXAdBase(BaseModel):
     """Базовая модель объявления"""
     title: str = Field(..., min_length=10, max_length=70)
-    description: Optional[str] = Field(None, max_length=9000)
-    price: Optional[float] = Field(None, gt=0)
+    description: str | None = Field(None, max_length=9000)
+    price: float | None = Field(None, gt=0)
     currency: str = "KZT"
-    category: Optional[str] = None
-    city: Optional[str] = None
-    region: Optional[str] = None
+    category: str | None = None
+    city: str | None = None
+    region: str | None = None
 
 
 class OLXAdCreate(OLXAdBase):
     """Создание объявления"""
     account_id: str
-    images: List[str] = Field(default_factory=list, max_items=8)
+    images: tuple[str, ...] = Field(default=(), max_length=8)
     publish_method: OLXPublishMethod = OLXPublishMethod.API
-    metadata: Dict = Field(default_factory=dict)
+    metadata: dict = Field(default_factory=dict)
 
 
 class OLXAd(BaseDBModel, OLXAdBase):
     """Полная модель объявления"""
     account_id: str
-    external_id: Optional[str] = None
-    url: Optional[str] = None
-    category_id: Optional[str] = None
-    images: List[str] = Field(default_factory=list)
+    external_id: str | None = None
+    url: str | None = None
+    category_id: str | None = None
+    images: tuple[str, ...] = ()
     status: OLXAdStatus = OLXAdStatus.DRAFT
-    publish_method: Optional[OLXPublishMethod] = None
+    publish_method: OLXPublishMethod | None = None
     views_count: int = 0
     favorites_count: int = 0
     messages_count: int = 0
-    published_at: Optional[datetime] = None
-    expires_at: Optional[datetime] = None
-    metadata: Dict = Field(default_factory=dict)
+    published_at: datetime | None = None
+    expires_at: datetime | None = None
+    metadata: dict = Field(default_factory=dict)
 
 
 # ===================================
@@ -165,8 +188,8 @@ class OLXAd(BaseDBModel, OLXAdBase):
 class SearchQuery(BaseModel):
     """Запрос на парсинг"""
     search_query: str = Field(..., min_length=1)
-    city: Optional[str] = "almaty"
-    category: Optional[str] = None
+    city: str | None = "almaty"
+    category: str | None = None
     parser_method: OLXParserMethod = OLXParserMethod.PLAYWRIGHT
     max_pages: int = Field(default=1, ge=1, le=10)
 
@@ -174,44 +197,44 @@ class SearchQuery(BaseModel):
 class OLXListing(BaseModel):
     """Одно объявление из парсинга"""
     title: str
-    price: Optional[float] = None
+    price: float | None = None
     url: str
-    external_id: Optional[str] = None
-    description: Optional[str] = None
-    images: List[str] = Field(default_factory=list)
-    city: Optional[str] = None
-    published_date: Optional[str] = None
-    seller_name: Optional[str] = None
+    external_id: str | None = None
+    description: str | None = None
+    images: tuple[str, ...] = ()
+    city: str | None = None
+    published_date: str | None = None
+    seller_name: str | None = None
 
 
 class OLXParsedData(BaseDBModel):
     """Результаты парсинга"""
     search_query: str
-    search_url: Optional[str] = None
-    city: Optional[str] = None
-    category: Optional[str] = None
+    search_url: str | None = None
+    city: str | None = None
+    category: str | None = None
     parser_method: OLXParserMethod
-    data: List[OLXListing] = Field(default_factory=list)
+    data: tuple[OLXListing, ...] = ()
     items_count: int = 0
-    parse_duration_seconds: Optional[float] = None
+    parse_duration_seconds: float | None = None
     pages_parsed: int = 1
     parsed_at: datetime = Field(default_factory=datetime.now)
-    errors: List[str] = Field(default_factory=list)
+    errors: tuple[str, ...] = ()
     status: str = "success"
 
 
 class OLXParserTask(BaseDBModel):
     """Задача парсинга"""
     search_query: str
-    city: Optional[str] = None
-    category: Optional[str] = None
+    city: str | None = None
+    category: str | None = None
     parser_method: OLXParserMethod
     status: TaskStatus = TaskStatus.PENDING
     progress: int = Field(default=0, ge=0, le=100)
-    result_id: Optional[str] = None
-    error_message: Optional[str] = None
-    started_at: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
+    result_id: str | None = None
+    error_message: str | None = None
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
 
 
 # ===================================
@@ -220,27 +243,60 @@ class OLXParserTask(BaseDBModel):
 
 class AuthResult(BaseModel):
     """Результат авторизации"""
+    model_config = ConfigDict(frozen=True)
+    
     success: bool
-    account: Optional[OLXAccount] = None
-    error: Optional[str] = None
+    account: OLXAccount | None = None
+    error: str | None = None
     method: OLXLoginMethod
 
 
 class PublishResult(BaseModel):
     """Результат публикации"""
+    model_config = ConfigDict(frozen=True)
+    
     success: bool
-    ad: Optional[OLXAd] = None
-    error: Optional[str] = None
+    ad: OLXAd | None = None
+    ad_id: str | None = None
+    ad_url: str | None = None
+    external_id: str | None = None
+    error: str | None = None
     method: OLXPublishMethod
 
 
 class ParserResult(BaseModel):
     """Результат парсинга"""
+    model_config = ConfigDict(frozen=True)
+    
     success: bool
     task_id: str
     status: TaskStatus
     items_found: int = 0
-    error: Optional[str] = None
+    error: str | None = None
+
+
+# ===================================
+# Warmup
+# ===================================
+
+# Достраиваем схемы при импорте: если сборка какой-то модели была
+# отложена (forward reference), она завершится здесь, а не на первом запросе.
+# Для уже собранных моделей model_rebuild() ничего не делает.
+for _model in (
+    OLXAccount,
+    OLXAccountSummary,
+    OLXAdCreate,
+    OLXAd,
+    SearchQuery,
+    OLXListing,
+    OLXParsedData,
+    OLXParserTask,
+    AuthResult,
+    PublishResult,
+    ParserResult,
+):
+    _model.model_rebuild()
+del _model
 
 
 # ===================================
@@ -259,8 +315,10 @@ __all__ = [
     "OLXAccountBase",
     "OLXAccountCreate",
     "OLXAccount",
+    "OLXAccountSummary",
     "OAuthCredentials",
     "BrowserCredentials",
+    "Credentials",
     # Ad Models
     "OLXAdBase",
     "OLXAdCreate",
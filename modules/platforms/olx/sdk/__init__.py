@@ -3,15 +3,90 @@ OLX Module SDK
 Python клиент для интеграции с OLX модулем
 """
 
+import asyncio
 import httpx
-from typing import List, Optional, Dict, Any
+from functools import lru_cache, partial
+from typing import Awaitable, Callable, Iterable, List, Optional, Dict, Any
 from pydantic import BaseModel
 
+try:
+    import h2  # noqa: F401 — нужен httpx для HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Пул соединений общего httpx клиента
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=30.0
+)
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+# Одновременных запросов в батч-методах (create_many, get_tasks) по умолчанию
+DEFAULT_MAX_CONCURRENCY = 10
+
+# Префиксы ресурсов API модуля
+ACCOUNTS_PATH = "/auth/accounts/"
+PARSER_TASKS_PATH = "/parser/tasks/"
+PARSER_RESULTS_PATH = "/parser/results/"
+ADS_PATH = "/ads/"
+
+
+@lru_cache(maxsize=1024)
+def _resource_url(prefix: str, resource_id: str, suffix: str = "") -> httpx.URL:
+    """
+    URL ресурса по ID (кэшируется: при опросе задачи URL не собирается
+    и не парсится заново на каждый запрос)
+    """
+    return httpx.URL(prefix + resource_id + suffix)
+
+
+async def _gather_limited(
+    calls: Iterable[Callable[[], Awaitable[Any]]],
+    max_concurrency: int,
+    return_exceptions: bool = False
+) -> List[Any]:
+    """
+    asyncio.gather с ограничением числа одновременных вызовов
+    
+    Корутина создается только после захвата семафора, так что большой
+    батч не открывает сотни запросов разом и не упирается в пул соединений.
+    
+    Args:
+        calls: Фабрики корутин (вызываются без аргументов)
+        max_concurrency: Максимум одновременных вызовов
+        return_exceptions: Как в asyncio.gather
+    
+    Returns:
+        list: Результаты в порядке calls
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+    
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def run(call: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            return await call()
+    
+    return list(await asyncio.gather(
+        *(run(call) for call in calls),
+        return_exceptions=return_exceptions
+    ))
+
+
 
 class OLXClient:
     """
     Python SDK для OLX модуля
     
+    Все подмодули (auth, parser, ads) работают через один httpx клиент
+    с пулом keep-alive соединений (HTTP/2, если установлен h2). Создавайте
+    один OLXClient на процесс и переиспользуйте его, а не клиент на вызов.
+    Для нескольких объявлений/задач используйте батч-методы
+    (ads.create_many, parser.get_tasks), а не await в цикле.
+    
     Example:
         ```python
         from modules.platforms.olx.sdk import OLXClient
@@ -43,7 +118,16 @@ class OLXClient:
             base_url: URL OLX модуля API
         """
         self.base_url = base_url.rstrip("/")
-        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=30.0)
+        # http2/limits задаются на транспорте (он нужен для retries на connect)
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=DEFAULT_TIMEOUT,
+            transport=httpx.AsyncHTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                limits=DEFAULT_LIMITS,
+                retries=2
+            )
+        )
         
         # Подмодули
         self.auth = AuthAPI(self.client)
@@ -70,7 +154,9 @@ class AuthAPI:
     async def oauth_login(
         self,
         email: str,
-        password: str
+        password: str,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         OAuth авторизация
@@ -78,32 +164,48 @@ class AuthAPI:
         Args:
             email: Email OLX аккаунта
             password: Пароль
+            client_id: OLX API Client ID (по умолчанию OLX_CLIENT_ID модуля)
+            client_secret: OLX API Client Secret (по умолчанию OLX_CLIENT_SECRET модуля)
         
         Returns:
             dict: Данные аккаунта с токенами
         """
-        response = await self.client.post("/auth/oauth/login", json={
-            "email": email,
-            "password": password
-        })
+        payload = {"method": "oauth", "email": email, "password": password}
+        if client_id is not None:
+            payload["client_id"] = client_id
+        if client_secret is not None:
+            payload["client_secret"] = client_secret
+        
+        response = await self.client.post("/auth/login", json=payload)
         response.raise_for_status()
         return response.json()
     
-    async def get_accounts(self) -> List[Dict[str, Any]]:
-        """Получить список аккаунтов"""
-        response = await self.client.get("/auth/accounts")
+    async def get_accounts(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Получить список аккаунтов (без токенов)"""
+        response = await self.client.get("/auth/accounts", params={"limit": limit, "offset": offset})
         response.raise_for_status()
         return response.json()
     
     async def get_account(self, account_id: str) -> Dict[str, Any]:
         """Получить аккаунт по ID"""
-        response = await self.client.get(f"/auth/accounts/{account_id}")
+        response = await self.client.get(_resource_url(ACCOUNTS_PATH, account_id))
         response.raise_for_status()
         return response.json()
     
+    async def get_token(self, account_id: str) -> str:
+        """
+        Действующий access token аккаунта
+        
+        Сервер обновляет токен, только если он скоро истекает, поэтому
+        вызывать можно перед каждым запросом к OLX API.
+        """
+        response = await self.client.get(_resource_url(ACCOUNTS_PATH, account_id, "/token"))
+        response.raise_for_status()
+        return response.json()["access_token"]
+    
     async def delete_account(self, account_id: str) -> Dict[str, Any]:
         """Удалить аккаунт"""
-        response = await self.client.delete(f"/auth/accounts/{account_id}")
+        response = await self.client.delete(_resource_url(ACCOUNTS_PATH, account_id))
         response.raise_for_status()
         return response.json()
 
@@ -147,13 +249,36 @@ class ParserAPI:
     
     async def get_task(self, task_id: str) -> Dict[str, Any]:
         """Получить статус задачи парсинга"""
-        response = await self.client.get(f"/parser/tasks/{task_id}")
+        response = await self.client.get(_resource_url(PARSER_TASKS_PATH, task_id))
         response.raise_for_status()
         return response.json()
     
+    async def get_tasks(
+        self,
+        task_ids: List[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """
+        Получить статусы нескольких задач параллельно
+        
+        Запросы идут одновременно через общий клиент (одно HTTP/2 соединение
+        или пул keep-alive), а не последовательными await в цикле.
+        
+        Args:
+            task_ids: ID задач
+            max_concurrency: Максимум одновременных запросов
+        
+        Returns:
+            list: Задачи в порядке task_ids
+        """
+        return await _gather_limited(
+            (partial(self.get_task, task_id) for task_id in task_ids),
+            max_concurrency
+        )
+    
     async def get_results(self, result_id: str) -> Dict[str, Any]:
         """Получить результаты парсинга"""
-        response = await self.client.get(f"/parser/results/{result_id}")
+        response = await self.client.get(_resource_url(PARSER_RESULTS_PATH, result_id))
         response.raise_for_status()
         return response.json()
     
@@ -161,34 +286,88 @@ class ParserAPI:
         self,
         task_id: str,
         timeout: int = 60,
-        poll_interval: int = 2
+        poll_interval: float = 0.2,
+        max_poll_interval: float = 5.0
     ) -> Dict[str, Any]:
         """
         Дождаться завершения парсинга и получить результаты
         
+        Опрашивает статус задачи с экспоненциально растущим интервалом
+        (poll_interval * 1.5 на каждой итерации, не больше max_poll_interval).
+        
         Args:
             task_id: ID задачи
             timeout: Максимальное время ожидания (секунды)
-            poll_interval: Интервал проверки (секунды)
+            poll_interval: Начальный интервал проверки (секунды)
+            max_poll_interval: Максимальный интервал проверки (секунды)
         
         Returns:
             dict: Результаты парсинга
         """
-        import asyncio
-        
-        elapsed = 0
+        delay = poll_interval
+        elapsed = 0.0
         while elapsed < timeout:
             task = await self.get_task(task_id)
+            result = await self._task_results(task)
+            if result is not None:
+                return result
             
-            if task["status"] == "completed":
-                return await self.get_results(task["result_id"])
-            elif task["status"] == "failed":
-                raise Exception(f"Parsing failed: {task.get('error_message')}")
-            
-            await asyncio.sleep(poll_interval)
-            elapsed += poll_interval
+            await asyncio.sleep(delay)
+            elapsed += delay
+            delay = min(delay * 1.5, max_poll_interval)
         
         raise TimeoutError(f"Parsing timeout after {timeout} seconds")
+    
+    async def wait_for_results_push(
+        self,
+        task_id: str,
+        timeout: int = 60
+    ) -> Dict[str, Any]:
+        """
+        Дождаться завершения парсинга через /parser/tasks/{task_id}/wait
+        
+        Сервер держит запрос открытым до завершения задачи, поэтому в обычном
+        случае нужен один запрос вместо серии опросов.
+        
+        Args:
+            task_id: ID задачи
+            timeout: Максимальное время ожидания (секунды)
+        
+        Returns:
+            dict: Результаты парсинга
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"Parsing timeout after {timeout} seconds")
+            
+            # Сервер ограничивает ожидание одного запроса 120 секундами
+            wait = min(remaining, 120.0)
+            response = await self.client.get(
+                _resource_url(PARSER_TASKS_PATH, task_id, "/wait"),
+                params={"timeout": wait},
+                timeout=httpx.Timeout(wait + 10.0, connect=5.0)
+            )
+            response.raise_for_status()
+            
+            result = await self._task_results(response.json())
+            if result is not None:
+                return result
+            
+            # Задача выполняется в другом процессе сервера: сервер ответил
+            # сразу, поэтому не повторяем запрос без паузы
+            await asyncio.sleep(min(1.0, max(deadline - loop.time(), 0)))
+    
+    async def _task_results(self, task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Результаты завершенной задачи, None если задача еще выполняется"""
+        if task["status"] == "completed":
+            return await self.get_results(task["result_id"])
+        elif task["status"] == "failed":
+            raise Exception(f"Parsing failed: {task.get('error_message')}")
+        return None
 
 
 class AdsAPI:
@@ -224,7 +403,9 @@ class AdsAPI:
         Returns:
             dict: Результат публикации
         """
-        response = await self.client.post(f"/ads?account_id={account_id}", json={
+        # Путь со слэшем, как у роутера: без редиректа 307 на каждый вызов
+        response = await self.client.post(ADS_PATH, json={
+            "account_id": account_id,
             "title": title,
             "description": description,
             "price": price,
@@ -236,9 +417,36 @@ class AdsAPI:
         response.raise_for_status()
         return response.json()
     
+    async def create_many(
+        self,
+        items: List[Dict[str, Any]],
+        return_exceptions: bool = False,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ) -> List[Any]:
+        """
+        Создать несколько объявлений параллельно
+        
+        Запросы идут одновременно через общий клиент (одно HTTP/2 соединение
+        или пул keep-alive), а не последовательными await в цикле.
+        
+        Args:
+            items: Аргументы create() для каждого объявления
+            return_exceptions: Вернуть ошибки отдельных объявлений в списке
+                вместо выброса первой из них
+            max_concurrency: Максимум одновременных запросов
+        
+        Returns:
+            list: Результаты публикации в порядке items
+        """
+        return await _gather_limited(
+            (partial(self.create, **item) for item in items),
+            max_concurrency,
+            return_exceptions=return_exceptions
+        )
+    
     async def get(self, ad_id: str) -> Dict[str, Any]:
         """Получить объявление по ID"""
-        response = await self.client.get(f"/ads/{ad_id}")
+        response = await self.client.get(_resource_url(ADS_PATH, ad_id))
         response.raise_for_status()
         return response.json()
     
@@ -254,7 +462,7 @@ class AdsAPI:
             ad_id: ID объявления
             status: Новый статус (draft, published, paused, expired, deleted)
         """
-        response = await self.client.patch(f"/ads/{ad_id}/status", json={"status": status})
+        response = await self.client.patch(_resource_url(ADS_PATH, ad_id, "/status"), json={"status": status})
         response.raise_for_status()
         return response.json()
 
@@ -7,23 +7,102 @@ import httpx
 import json
 import bcrypt
 from typing import Optional, Dict
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
+import asyncio
+import time
+import hmac
+import hashlib
+import secrets
+from collections import OrderedDict
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
 
 from ..models import (
     OLXAccount,
     OLXAccountCreate,
+    OLXAccountSummary,
     OAuthCredentials,
     BrowserCredentials,
     AuthResult,
     OLXAccountStatus,
     OLXLoginMethod
 )
-from ..database.client import get_supabase_client
+from ..database.client import get_supabase_client, select_json
+from ..database.cache import get_redis_client, invalidate_account, TOKEN_REFRESH_LEADER_KEY
 from ..api.config import settings
 
+try:
+    import h2  # noqa: F401 — нужен httpx для HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Максимум аккаунтов, для которых хранятся блокировки обновления токена
+REFRESH_LOCKS_MAX = 1024
+
+# Пауза перед повторным фоновым обновлением токена после неудач (растет вдвое
+# с каждой неудачей от token_refresh_interval), не больше (секунд)
+REFRESH_BACKOFF_MAX = 3600.0
+
+# Продление аренды лидера: только если ключ все еще принадлежит этому воркеру
+_RENEW_LEADER_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Снятие аренды лидера при остановке (чужой ключ не трогаем)
+_RELEASE_LEADER_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Максимум записей в кэше строк olx_accounts
+ACCOUNT_CACHE_MAX = 1024
+
+# Максимум email в кэше bcrypt хэшей паролей (повторный вход без rehash)
+PASSWORD_HASH_CACHE_MAX = 1024
+
+# Ключ HMAC отпечатков паролей в кэше (только в памяти процесса)
+_PASSWORD_DIGEST_KEY = secrets.token_bytes(32)
+
+# Колонки olx_accounts для списка аккаунтов (OLXAccountSummary)
+ACCOUNT_SUMMARY_FIELDS = "id,email,status,last_login_at,login_method"
+
+# Валидация списка строк одним вызовом pydantic-core (а не модель на строку)
+_ACCOUNT_SUMMARY_LIST_ADAPTER = TypeAdapter(list[OLXAccountSummary])
+
+
+def _hash_password(password: str) -> str:
+    """bcrypt хэш пароля (CPU-bound, вызывается в потоке)"""
+    return bcrypt.hashpw(
+        password.encode('utf-8'),
+        bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    ).decode('utf-8')
+
+
+def _password_digest(password: str) -> bytes:
+    """Быстрый отпечаток пароля (HMAC-SHA256) для сравнения с кэшем"""
+    return hmac.digest(_PASSWORD_DIGEST_KEY, password.encode('utf-8'), hashlib.sha256)
+
+
+def _parse_expires_at(value) -> Optional[datetime]:
+    """token_expires_at из строки Supabase (ISO 8601), None если не задан"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
 
 class OLXAuthService:
     """Сервис авторизации OLX"""
@@ -32,6 +111,115 @@ class OLXAuthService:
         self.db = get_supabase_client()
         self.oauth_url = settings.olx_oauth_url
         
+        # Общий HTTP клиент OAuth запросов (keep-alive вместо handshake на каждый вызов)
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Одно обновление токена на аккаунт: остальные ждут и берут его результат
+        self._refresh_locks: "OrderedDict[str, asyncio.Lock]" = OrderedDict()
+        # Последнее обновление по аккаунту: (monotonic время завершения, токен)
+        self._last_refresh: Dict[str, tuple] = {}
+        
+        # TTL кэш строк olx_accounts по "id:<id>" и "email:<email>": (monotonic время, строка)
+        self._account_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        
+        # Последний bcrypt хэш пароля по email: (HMAC отпечаток пароля, хэш)
+        self._password_hashes: "OrderedDict[str, tuple]" = OrderedDict()
+        
+        # Фоновое обновление токенов до истечения
+        self._refresh_task: Optional[asyncio.Task] = None
+        # ID воркера в аренде лидера (цикл обновления работает в одном воркере)
+        self._worker_id = secrets.token_hex(8)
+        # Неудачные фоновые обновления: account_id -> (число неудач подряд, monotonic время следующей попытки)
+        self._refresh_failures: Dict[str, tuple] = {}
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Получить общий HTTP клиент (создается при первом вызове)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
+            )
+        return self._client
+    
+    def start_token_refresh(self):
+        """Запустить фоновое обновление токенов (вызывается при старте приложения)"""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._token_refresh_loop())
+    
+    async def close(self):
+        """Остановить фоновое обновление токенов и закрыть HTTP клиент"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+            
+            # Отдаем аренду сразу, не дожидаясь истечения TTL
+            try:
+                await get_redis_client().eval(
+                    _RELEASE_LEADER_SCRIPT, 1, TOKEN_REFRESH_LEADER_KEY, self._worker_id
+                )
+            except RedisError as e:
+                logger.warning(f"Token refresh leadership release error: {e}")
+        
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    # ===================================
+    # Account Cache
+    # ===================================
+    
+    def _select_account(self, field: str, value: str) -> Optional[dict]:
+        """
+        Строка olx_accounts по id/email (с TTL кэшем, без запроса к Supabase при попадании)
+        
+        Args:
+            field: "id" или "email"
+            value: Значение поля
+        
+        Returns:
+            Optional[dict]: Строка аккаунта или None
+        """
+        key = f"{field}:{value}"
+        cached = self._account_cache.get(key)
+        
+        if cached is not None:
+            if time.monotonic() - cached[0] < settings.account_cache_ttl:
+                self._account_cache.move_to_end(key)
+                return cached[1]
+            del self._account_cache[key]
+        
+        result = self.db.table("olx_accounts").select("*").eq(field, value).execute()
+        
+        if not result.data:
+            return None
+        
+        row = result.data[0]
+        self._cache_account(row)
+        return row
+    
+    def _cache_account(self, row: dict):
+        """Положить строку аккаунта в кэш (по id и email)"""
+        now = time.monotonic()
+        
+        for key in (f"id:{row.get('id')}", f"email:{row.get('email')}"):
+            self._account_cache[key] = (now, row)
+            self._account_cache.move_to_end(key)
+        
+        while len(self._account_cache) > ACCOUNT_CACHE_MAX:
+            self._account_cache.popitem(last=False)
+    
+    def _invalidate_account(self, account_id: str):
+        """Убрать аккаунт из кэша"""
+        cached = self._account_cache.pop(f"id:{account_id}", None)
+        if cached is not None:
+            self._account_cache.pop(f"email:{cached[1].get('email')}", None)
+    
     # ===================================
     # OAuth 2.0 Authentication
     # ===================================
@@ -44,7 +232,8 @@ class OLXAuthService:
         Авторизация через OAuth 2.0 (Official OLX Partner API)
         
         Args:
-            credentials: OAuth credentials (email, password, client_id, client_secret)
+            credentials: OAuth credentials (email, password, client_id, client_secret;
+                без client_id/client_secret используются OLX_CLIENT_ID/OLX_CLIENT_SECRET)
         
         Returns:
             AuthResult: Результат авторизации
@@ -52,68 +241,61 @@ class OLXAuthService:
         try:
             logger.info(f"Attempting OAuth login for {credentials.email}")
             
+            client_id = credentials.client_id or settings.olx_client_id
+            client_secret = credentials.client_secret or settings.olx_client_secret
+            
+            if not client_id or not client_secret:
+                return AuthResult(
+                    success=False,
+                    error="OAuth client_id/client_secret not provided and not configured",
+                    method=OLXLoginMethod.OAUTH
+                )
+            
             # Подготовка данных для OAuth запроса
             oauth_data = {
                 "grant_type": "password",
-                "client_id": credentials.client_id,
-                "client_secret": credentials.client_secret,
+                "client_id": client_id,
+                "client_secret": client_secret,
                 "username": credentials.email,
                 "password": credentials.password
             }
             
             # Запрос токена
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.oauth_url,
-                    data=oauth_data,
-                    headers={
-                        "Content-Type": "application/x-www-form-urlencoded"
-                    }
+            client = await self._get_client()
+            response = await client.post(self.oauth_url, data=oauth_data)
+            
+            if response.status_code != 200:
+                error_msg = f"OAuth failed: {response.status_code} - {response.text}"
+                logger.error(error_msg)
+                return AuthResult(
+                    success=False,
+                    error=error_msg,
+                    method=OLXLoginMethod.OAUTH
                 )
-                
-                if response.status_code != 200:
-                    error_msg = f"OAuth failed: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    return AuthResult(
-                        success=False,
-                        error=error_msg,
-                        method=OLXLoginMethod.OAUTH
-                    )
-                
-                token_data = response.json()
-                
+            
+            token_data = response.json()
+            
             # Хэшируем пароль для безопасного хранения
-            password_hash = bcrypt.hashpw(
-                credentials.password.encode('utf-8'),
-                bcrypt.gensalt()
-            ).decode('utf-8')
+            password_hash = await self._get_password_hash(credentials.email, credentials.password)
             
-            # Создаем/обновляем аккаунт в БД
+            # Данные аккаунта для БД
             account_data = {
                 "email": credentials.email,
                 "password_hash": password_hash,
                 "access_token": token_data.get("access_token"),
                 "refresh_token": token_data.get("refresh_token"),
                 "token_expires_at": (
-                    datetime.now() + timedelta(seconds=token_data.get("expires_in", 3600))
+                    datetime.now(timezone.utc) + timedelta(seconds=token_data.get("expires_in", 3600))
                 ).isoformat(),
-                "client_id": credentials.client_id,
+                "client_id": client_id,
                 "status": OLXAccountStatus.ACTIVE.value,
-                "last_login_at": datetime.now().isoformat(),
+                "last_login_at": datetime.now(timezone.utc).isoformat(),
                 "login_method": OLXLoginMethod.OAUTH.value
             }
             
-            # Проверяем существует ли аккаунт
-            existing = self.db.table("olx_accounts").select("*").eq("email", credentials.email).execute()
-            
-            if existing.data:
-                # Обновляем существующий
-                result = self.db.table("olx_accounts").update(account_data).eq("email", credentials.email).execute()
-                account_dict = result.data[0] if result.data else None
-            else:
-                # Создаем новый
-                result = self.db.table("olx_accounts").insert(account_data).execute()
-                account_dict = result.data[0] if result.data else None
+            # Создаем или обновляем аккаунт одним запросом (UNIQUE по email)
+            result = self.db.table("olx_accounts").upsert(account_data, on_conflict="email").execute()
+            account_dict = result.data[0] if result.data else None
             
             if not account_dict:
                 return AuthResult(
@@ -122,6 +304,9 @@ class OLXAuthService:
                     method=OLXLoginMethod.OAUTH
                 )
             
+            self._cache_account(account_dict)
+            await invalidate_account(account_dict["id"])
+            
             account = OLXAccount(**account_dict)
             logger.info(f"OAuth login successful for {credentials.email}")
             
@@ -139,29 +324,127 @@ class OLXAuthService:
                 method=OLXLoginMethod.OAUTH
             )
     
+    async def _get_password_hash(self, email: str, password: str) -> str:
+        """
+        bcrypt хэш пароля для сохранения в olx_accounts
+        
+        При повторном входе с тем же паролем возвращается хэш из прошлого
+        входа: пароль сравнивается по HMAC отпечатку, без bcrypt. Новый хэш
+        считается в потоке (bcrypt занимает CPU на сотни мс и блокировал бы
+        event loop).
+        """
+        digest = _password_digest(password)
+        cached = self._password_hashes.get(email)
+        
+        if cached is not None and hmac.compare_digest(cached[0], digest):
+            self._password_hashes.move_to_end(email)
+            return cached[1]
+        
+        password_hash = await asyncio.to_thread(_hash_password, password)
+        
+        self._password_hashes[email] = (digest, password_hash)
+        self._password_hashes.move_to_end(email)
+        while len(self._password_hashes) > PASSWORD_HASH_CACHE_MAX:
+            self._password_hashes.popitem(last=False)
+        
+        return password_hash
+    
     # ===================================
     # Token Refresh
     # ===================================
     
+    async def get_valid_token(self, account_id: str) -> Optional[str]:
+        """
+        Действующий access token аккаунта
+        
+        Если до истечения токена больше token_refresh_margin секунд, он
+        возвращается из кэша строки аккаунта без OAuth запроса; иначе
+        токен обновляется через refresh_token.
+        
+        Args:
+            account_id: ID аккаунта
+        
+        Returns:
+            Optional[str]: Access token или None
+        """
+        try:
+            account_data = self._select_account("id", account_id)
+        except Exception as e:
+            logger.error(f"Get account error: {e}", exc_info=True)
+            return None
+        
+        if not account_data:
+            return None
+        
+        access_token = account_data.get("access_token")
+        expires_at = _parse_expires_at(account_data.get("token_expires_at"))
+        
+        if access_token and expires_at is not None:
+            now = datetime.now(expires_at.tzinfo)
+            if expires_at > now + timedelta(seconds=settings.token_refresh_margin):
+                return access_token
+        
+        return await self.refresh_token(account_id)
+    
     async def refresh_token(self, account_id: str) -> Optional[str]:
         """
         Обновить access token используя refresh token
         
+        Одновременные вызовы для одного аккаунта не обновляют токен
+        параллельно: первый делает OAuth запрос, остальные дожидаются его
+        и получают тот же новый токен.
+        
         Args:
             account_id: ID аккаунта
         
         Returns:
             Optional[str]: Новый access token или None
         """
+        started = time.monotonic()
+        
+        async with self._get_refresh_lock(account_id):
+            # Пока ждали блокировку, токен уже обновил другой вызов
+            last = self._last_refresh.get(account_id)
+            if last is not None and last[0] >= started:
+                return last[1]
+            
+            new_token = await self._refresh_token_unlocked(account_id)
+            
+            if new_token:
+                self._last_refresh[account_id] = (time.monotonic(), new_token)
+            return new_token
+    
+    def _get_refresh_lock(self, account_id: str) -> asyncio.Lock:
+        """Блокировка обновления токена аккаунта (LRU, не больше REFRESH_LOCKS_MAX)"""
+        lock = self._refresh_locks.get(account_id)
+        
+        if lock is not None:
+            self._refresh_locks.move_to_end(account_id)
+            return lock
+        
+        lock = self._refresh_locks[account_id] = asyncio.Lock()
+        
+        # Вытесняем самые старые свободные блокировки
+        if len(self._refresh_locks) > REFRESH_LOCKS_MAX:
+            for old_id, old_lock in list(self._refresh_locks.items()):
+                if len(self._refresh_locks) <= REFRESH_LOCKS_MAX:
+                    break
+                if not old_lock.locked():
+                    del self._refresh_locks[old_id]
+                    self._last_refresh.pop(old_id, None)
+        
+        return lock
+    
+    async def _refresh_token_unlocked(self, account_id: str) -> Optional[str]:
+        """Обновить access token (вызывается под блокировкой аккаунта)"""
         try:
-            # Получаем аккаунт из БД
-            result = self.db.table("olx_accounts").select("*").eq("id", account_id).execute()
+            # Получаем аккаунт (из кэша или БД)
+            account_data = self._select_account("id", account_id)
             
-            if not result.data:
+            if not account_data:
                 logger.error(f"Account {account_id} not found")
                 return None
             
-            account_data = result.data[0]
             refresh_token = account_data.get("refresh_token")
             client_id = account_data.get("client_id")
             
@@ -176,22 +459,19 @@ class OLXAuthService:
                 "refresh_token": refresh_token
             }
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.oauth_url,
-                    data=oauth_data
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"Token refresh failed: {response.status_code}")
-                    return None
-                
-                token_data = response.json()
+            client = await self._get_client()
+            response = await client.post(self.oauth_url, data=oauth_data)
+            
+            if response.status_code != 200:
+                logger.error(f"Token refresh failed: {response.status_code}")
+                return None
+            
+            token_data = response.json()
             
             # Обновляем токен в БД
             new_token = token_data.get("access_token")
             expires_at = (
-                datetime.now() + timedelta(seconds=token_data.get("expires_in", 3600))
+                datetime.now(timezone.utc) + timedelta(seconds=token_data.get("expires_in", 3600))
             ).isoformat()
             
             self.db.table("olx_accounts").update({
@@ -199,6 +479,13 @@ class OLXAuthService:
                 "token_expires_at": expires_at
             }).eq("id", account_id).execute()
             
+            self._cache_account({
+                **account_data,
+                "access_token": new_token,
+                "token_expires_at": expires_at
+            })
+            await invalidate_account(account_id)
+            
             logger.info(f"Token refreshed for account {account_id}")
             return new_token
             
@@ -206,6 +493,101 @@ class OLXAuthService:
             logger.error(f"Token refresh error: {e}", exc_info=True)
             return None
     
+    async def _token_refresh_loop(self):
+        """
+        Периодически обновлять токены, которые скоро истекут
+        
+        Токен обновляется за token_refresh_margin секунд до истечения, так что
+        запросы пользователей не ждут OAuth запрос на обновление.
+        
+        Цикл запущен в каждом воркере, но обновляет токены только лидер
+        (аренда в Redis): иначе воркеры обновляли бы один refresh token
+        одновременно. Аккаунт, который не удалось обновить, повторяется
+        с растущей паузой.
+        """
+        semaphore = asyncio.Semaphore(10)
+        
+        async def refresh(account_id: str):
+            async with semaphore:
+                token = await self.refresh_token(account_id)
+            
+            if token:
+                self._refresh_failures.pop(account_id, None)
+            else:
+                failures = self._refresh_failures.get(account_id, (0, 0.0))[0] + 1
+                delay = min(settings.token_refresh_interval * 2 ** failures, REFRESH_BACKOFF_MAX)
+                self._refresh_failures[account_id] = (failures, time.monotonic() + delay)
+                logger.warning(f"Token refresh for {account_id} failed {failures} times, next try in {delay:.0f}s")
+        
+        while True:
+            await asyncio.sleep(settings.token_refresh_interval)
+            
+            if not await self._acquire_refresh_leadership():
+                continue
+            
+            try:
+                # Сравнение timestamptz с моментом в UTC (частичный индекс
+                # idx_olx_accounts_expiry_active по активным аккаунтам)
+                soon = (datetime.now(timezone.utc) + timedelta(seconds=settings.token_refresh_margin)).isoformat()
+                result = (
+                    self.db.table("olx_accounts")
+                    .select("id")
+                    .eq("status", OLXAccountStatus.ACTIVE.value)
+                    .not_.is_("refresh_token", "null")
+                    .lt("token_expires_at", soon)
+                    .execute()
+                )
+                
+                expiring = {row["id"] for row in result.data or []}
+                
+                # Аккаунты, которые больше не истекают (обновлены, удалены), забываем
+                self._refresh_failures = {
+                    account_id: failure
+                    for account_id, failure in self._refresh_failures.items()
+                    if account_id in expiring
+                }
+                
+                now = time.monotonic()
+                due = [
+                    account_id for account_id in expiring
+                    if self._refresh_failures.get(account_id, (0, 0.0))[1] <= now
+                ]
+                
+                if due:
+                    logger.info(f"Refreshing {len(due)} expiring tokens")
+                    await asyncio.gather(*(refresh(account_id) for account_id in due))
+                    
+            except Exception as e:
+                logger.error(f"Token refresh loop error: {e}", exc_info=True)
+    
+    async def _acquire_refresh_leadership(self) -> bool:
+        """
+        Занять или продлить аренду лидера фонового обновления токенов
+        
+        Ключ ставится через SET NX с TTL в три интервала цикла и продлевается
+        владельцем на каждой итерации; если лидер остановился или упал,
+        аренду после истечения берет другой воркер. Без Redis итерация
+        пропускается (токены обновит get_valid_token при запросе).
+        
+        Returns:
+            bool: True, если этот воркер — лидер
+        """
+        ttl = max(int(settings.token_refresh_interval * 3), 1)
+        redis = get_redis_client()
+        
+        try:
+            if await redis.set(TOKEN_REFRESH_LEADER_KEY, self._worker_id, nx=True, ex=ttl):
+                logger.info("Token refresh leadership acquired")
+                return True
+            
+            return bool(await redis.eval(
+                _RENEW_LEADER_SCRIPT, 1, TOKEN_REFRESH_LEADER_KEY, self._worker_id, ttl
+            ))
+            
+        except RedisError as e:
+            logger.warning(f"Token refresh leadership check failed, skipping round: {e}")
+            return False
+    
     # ===================================
     # Account Management
     # ===================================
@@ -221,31 +603,52 @@ class OLXAuthService:
             Optional[OLXAccount]: Аккаунт или None
         """
         try:
-            result = self.db.table("olx_accounts").select("*").eq("id", account_id).execute()
+            account_data = self._select_account("id", account_id)
             
-            if not result.data:
+            if not account_data:
                 return None
             
-            return OLXAccount(**result.data[0])
+            return OLXAccount(**account_data)
             
         except Exception as e:
             logger.error(f"Get account error: {e}", exc_info=True)
             return None
     
-    async def list_accounts(self, limit: int = 100) -> list[OLXAccount]:
+    async def list_accounts(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        status: Optional[OLXAccountStatus] = None
+    ) -> list[OLXAccountSummary]:
         """
-        Получить список всех аккаунтов
+        Получить список аккаунтов
+        
+        Выбираются только колонки OLXAccountSummary (без токенов и cookies),
+        новые входы первыми.
         
         Args:
             limit: Лимит записей
+            offset: Смещение (для постраничной выдачи)
+            status: Только аккаунты с этим статусом
         
         Returns:
-            list[OLXAccount]: Список аккаунтов
+            list[OLXAccountSummary]: Список аккаунтов
         """
         try:
-            result = self.db.table("olx_accounts").select("*").limit(limit).execute()
+            params = {
+                "select": ACCOUNT_SUMMARY_FIELDS,
+                "order": "last_login_at.desc",
+                "limit": str(limit),
+                "offset": str(offset)
+            }
+            
+            if status is not None:
+                params["status"] = f"eq.{status.value}"
+            
+            # Байты ответа сразу в модели (без json.loads в список dict)
+            raw = select_json(self.db, "olx_accounts", params)
             
-            return [OLXAccount(**item) for item in result.data]
+            return _ACCOUNT_SUMMARY_LIST_ADAPTER.validate_json(raw)
             
         except Exception as e:
             logger.error(f"List accounts error: {e}", exc_info=True)
@@ -263,6 +666,8 @@ class OLXAuthService:
         """
         try:
             self.db.table("olx_accounts").delete().eq("id", account_id).execute()
+            self._invalidate_account(account_id)
+            await invalidate_account(account_id)
             logger.info(f"Account {account_id} deleted")
             return True
             
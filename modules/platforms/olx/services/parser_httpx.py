@@ -0,0 +1,158 @@
+"""
+OLX HTTP Parser
+Парсинг выдачи OLX.kz без браузера: httpx + selectolax (страницы выдачи рендерятся на сервере)
+"""
+
+from selectolax.parser import HTMLParser
+from typing import List, Optional
+import logging
+import asyncio
+import httpx
+
+from ..models import OLXListing
+from ..api.config import settings
+from .parser_playwright import OLXPlaywrightParser, CARD_SELECTOR, LEGACY_CARD_SELECTOR
+
+try:
+    import h2  # noqa: F401 — нужен httpx для HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class OLXHttpxParser(OLXPlaywrightParser):
+    """
+    Парсер OLX через httpx + selectolax
+    
+    Тот же API, что у OLXPlaywrightParser. Браузер запускается только
+    как запасной вариант, если OLX вместо выдачи отдал JS-проверку.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        
+        # Общий HTTP клиент (keep-alive вместо handshake на каждую страницу)
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Получить общий HTTP клиент (создается при первом вызове)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=settings.parser_timeout,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                headers={
+                    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+                },
+                follow_redirects=True
+            )
+        return self._client
+    
+    async def close(self):
+        """Закрыть HTTP клиент и браузер (если запускался)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        
+        await super().close()
+    
+    async def parse_search(
+        self,
+        search_query: str,
+        city: str = "almaty",
+        max_pages: int = 1
+    ) -> List[OLXListing]:
+        """
+        Парсинг поиска через httpx
+        
+        Args:
+            search_query: Поисковый запрос
+            city: Город
+            max_pages: Максимальное количество страниц
+        
+        Returns:
+            List[OLXListing]: Список объявлений
+        """
+        try:
+            first_page = await self._fetch_page(search_query, 1)
+            
+            if first_page is None:
+                # JS-проверка или блокировка: парсим через браузер
+                logger.warning("OLX returned no listing markup, falling back to Playwright")
+                return await super().parse_search(search_query, city, max_pages)
+            
+            listings = list(first_page)
+            
+            if max_pages > 1:
+                pages = await asyncio.gather(
+                    *(self._fetch_page(search_query, n) for n in range(2, max_pages + 1))
+                )
+                for page_listings in pages:
+                    if page_listings:
+                        listings.extend(page_listings)
+            
+            return listings
+        
+        except Exception as e:
+            logger.error(f"HTTP parsing error: {e}", exc_info=True)
+            return []
+    
+    async def _fetch_page(self, search_query: str, page: int) -> Optional[List[OLXListing]]:
+        """
+        Загрузить и разобрать одну страницу выдачи
+        
+        Returns:
+            Optional[List[OLXListing]]: Объявления страницы; None, если
+            страница не похожа на выдачу (не 200 или нет разметки карточек)
+        """
+        params = {"q": search_query}
+        if page > 1:
+            params["page"] = page
+        
+        response = await self._get_client().get("/list", params=params)
+        
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch page {page}: {response.status_code}")
+            return None
+        
+        # Байты напрямую: selectolax сам определяет кодировку, без str в Python
+        tree = HTMLParser(response.content)
+        
+        cards = tree.css(CARD_SELECTOR)
+        if not cards:
+            # Старый дизайн
+            cards = tree.css(LEGACY_CARD_SELECTOR)
+        
+        if not cards:
+            if tree.css_first('div[class*="emptynew"]') is not None:
+                logger.info("Empty search results")
+                return []
+            return None
+        
+        logger.info(f"Found {len(cards)} cards on page {page}")
+        
+        return self._build_listings([self._card_fields(card) for card in cards])
+    
+    @staticmethod
+    def _card_fields(card) -> dict:
+        """Поля карточки в формате CARD_FIELDS_JS (title, price, href, loc)"""
+        title = card.css_first('h6')
+        if title is None:
+            title = card.css_first('strong')
+        
+        price = card.css_first('[data-testid="ad-price"]')
+        if price is None:
+            price = card.css_first('.price strong')
+        
+        link = card.css_first('a')
+        loc = card.css_first('[data-testid="location-date"]')
+        
+        return {
+            "title": title.text(strip=True) if title is not None else None,
+            "price": price.text() if price is not None else None,
+            "href": link.attributes.get('href') if link is not None else None,
+            "loc": loc.text() if loc is not None else None
+        }
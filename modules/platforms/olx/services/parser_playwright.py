@@ -3,23 +3,138 @@ OLX Playwright Parser
 Парсинг через браузерную автоматизацию (более надежный метод)
 """
 
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    Route,
+    TimeoutError as PlaywrightTimeoutError
+)
+from pydantic import TypeAdapter
 from typing import List, Optional
+from urllib.parse import urlencode
 import logging
 import asyncio
+import re
+import time
 
 from ..models import OLXListing
 from ..api.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Валидация объявлений страницы одним вызовом pydantic-core
+_LISTING_LIST_ADAPTER = TypeAdapter(List[OLXListing])
+
+# Цена: все, кроме цифр ("450 000 ₸" -> "450000")
+NON_DIGITS_RE = re.compile(r"\D+")
+# ID объявления из URL: ...-ID123456.html
+EXTERNAL_ID_RE = re.compile(r"-ID([^.]+)")
+
+# Флаги Chromium для парсинга: картинки не декодируются, GPU/звук/фоновые
+# сервисы выключены (меньше памяти на вкладку, больше параллельных страниц)
+BROWSER_ARGS = (
+    "--blink-settings=imagesEnabled=false",
+    "--disable-gpu",
+    "--mute-audio",
+    "--disable-extensions",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-background-networking",
+    "--disable-features=Translate,BackForwardCache,AcceptCHFrame",
+    "--disable-sync",
+)
+
+# Сколько секунд переиспользовать cookies/localStorage прошлого поиска
+STORAGE_STATE_TTL = 3600
+
+# Парсеру нужен только DOM: картинки, шрифты, стили и аналитику не грузим
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+BLOCKED_URL_PARTS = ("googletagmanager", "google-analytics", "doubleclick", "hotjar")
+
+# Карточки объявлений: новый и старый дизайн выдачи
+CARD_SELECTOR = '[data-cy="l-card"]'
+LEGACY_CARD_SELECTOR = '.offer-wrapper'
+
+# Извлечение полей карточек на стороне браузера (locator.evaluate_all)
+CARD_FIELDS_JS = """cards => cards.map(c => {
+  const t = c.querySelector('h6') || c.querySelector('strong');
+  const p = c.querySelector('[data-testid="ad-price"]') || c.querySelector('.price strong');
+  const a = c.querySelector('a');
+  const loc = c.querySelector('[data-testid="location-date"]');
+  return {
+    title: t ? t.innerText.trim() : null,
+    price: p ? p.innerText : null,
+    href: a ? a.getAttribute('href') : null,
+    loc: loc ? loc.innerText : null
+  };
+})"""
+
+
+async def _block_heavy_requests(route: Route):
+    """Обработчик запросов контекста: отменяет тяжелые и сторонние запросы"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        part in request.url for part in BLOCKED_URL_PARTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
 
 class OLXPlaywrightParser:
     """Парсер OLX через Playwright"""
     
     def __init__(self):
         self.base_url = "https://www.olx.kz"
-        self.browser: Optional[Browser] = None
+        # Браузер запускается один раз и переиспользуется всеми поисками,
+        # на каждый поиск создается только легкий BrowserContext
+        self._pw: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._lock = asyncio.Lock()
+        self._page_semaphore = asyncio.Semaphore(settings.browser_concurrency)
+        
+        # Cookies/localStorage удачного поиска (согласие на cookies, антибот
+        # cookies): новые контексты стартуют с ними, а не с чистого профиля
+        self._storage_state: Optional[dict] = None
+        self._storage_state_at = 0.0
+    
+    async def _ensure_browser(self) -> Browser:
+        """Запустить браузер, если он еще не запущен (или упал)"""
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._pw is None:
+                    self._pw = await async_playwright().start()
+                
+                args = list(BROWSER_ARGS)
+                if settings.browser_headless:
+                    # Новый headless режим (общий код с обычным Chrome)
+                    args.append("--headless=new")
+                
+                self._browser = await self._pw.chromium.launch(
+                    headless=settings.browser_headless,
+                    slow_mo=settings.browser_slow_mo,
+                    args=args
+                )
+                logger.info("Playwright browser started")
+            
+            return self._browser
+    
+    async def close(self):
+        """Закрыть браузер и Playwright (при остановке приложения)"""
+        async with self._lock:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception as e:
+                    logger.warning(f"Browser close error: {e}")
+                self._browser = None
+            
+            if self._pw is not None:
+                await self._pw.stop()
+                self._pw = None
     
     async def parse_search(
         self,
@@ -38,229 +153,188 @@ class OLXPlaywrightParser:
         Returns:
             List[OLXListing]: Список объявлений
         """
-        listings = []
+        # Страницы выдачи адресуются через &page=N, поэтому открываются
+        # параллельно (каждая в своем контексте), а не кликом "Далее"
+        search_url = f"{self.base_url}/list?{urlencode({'q': search_query})}"
+        urls = [search_url] + [f"{search_url}&page={n}" for n in range(2, max_pages + 1)]
         
         try:
-            async with async_playwright() as p:
-                # Запускаем браузер
-                browser = await p.chromium.launch(
-                    headless=settings.browser_headless,
-                    slow_mo=settings.browser_slow_mo
-                )
-                
+            browser = await self._ensure_browser()
+            
+            pages = await asyncio.gather(*(self._parse_url(browser, url) for url in urls))
+            
+        except Exception as e:
+            logger.error(f"Playwright parsing error: {e}", exc_info=True)
+            return []
+        
+        return [listing for page_listings in pages for listing in page_listings]
+    
+    async def _parse_url(self, browser: Browser, url: str) -> List[OLXListing]:
+        """
+        Парсинг одной страницы выдачи в отдельном контексте
+        
+        Одновременно открыто не больше settings.browser_concurrency страниц.
+        
+        Args:
+            browser: Запущенный браузер
+            url: URL страницы выдачи
+        
+        Returns:
+            List[OLXListing]: Объявления страницы (пустой список при ошибке)
+        """
+        async with self._page_semaphore:
+            context: Optional[BrowserContext] = None
+            
+            try:
                 context = await browser.new_context(
                     viewport={"width": 1920, "height": 1080},
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+                    storage_state=self._get_storage_state()
                 )
                 
-                page = await context.new_page()
+                await context.route("**/*", _block_heavy_requests)
                 
-                # Строим URL поиска
-                search_url = f"{self.base_url}/list?q={search_query}"
+                page = await context.new_page()
                 
-                logger.info(f"Navigating to: {search_url}")
+                logger.info(f"Navigating to: {url}")
                 
-                # Переходим на страницу
-                await page.goto(search_url, wait_until="networkidle")
+                # Переходим на страницу: достаточно начала ответа, готовность
+                # выдачи определяет ожидание карточек (а не networkidle/load)
+                await page.goto(url, wait_until="commit")
                 
-                # Ждем загрузки объявлений
+                # Ждем первую карточку любого дизайна
                 try:
-                    await page.wait_for_selector('[data-cy="l-card"]', timeout=10000)
-                except:
-                    logger.warning("No listings found with data-cy selector")
-                    # Пробуем альтернативный селектор
-                    try:
-                        await page.wait_for_selector('.offer-wrapper', timeout=5000)
-                    except:
-                        logger.error("No listings found")
-                        await browser.close()
-                        return listings
+                    await page.wait_for_selector(
+                        f"{CARD_SELECTOR}, {LEGACY_CARD_SELECTOR}",
+                        timeout=10000
+                    )
+                except PlaywrightTimeoutError:
+                    logger.error(f"No listings found: {url}")
+                    return []
                 
                 # Парсим объявления
-                page_listings = await self._parse_page(page)
-                listings.extend(page_listings)
+                listings = await self._parse_page(page)
+                
+                logger.info(f"Found {len(listings)} listings on {url}")
                 
-                logger.info(f"Found {len(page_listings)} listings on page 1")
+                if listings and self._get_storage_state() is None:
+                    await self._save_storage_state(context)
                 
-                # TODO: Pagination - переход на следующие страницы
-                # for page_num in range(2, max_pages + 1):
-                #     has_next = await self._go_to_next_page(page)
-                #     if not has_next:
-                #         break
-                #     page_listings = await self._parse_page(page)
-                #     listings.extend(page_listings)
+                return listings
                 
-                await browser.close()
+            except Exception as e:
+                logger.error(f"Playwright page error ({url}): {e}", exc_info=True)
+                return []
             
+            finally:
+                # Закрываем только контекст, браузер остается для следующих поисков
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"Context close error: {e}")
+    
+    def _get_storage_state(self) -> Optional[dict]:
+        """Сохраненное состояние контекста, если оно не старше STORAGE_STATE_TTL"""
+        if time.monotonic() - self._storage_state_at < STORAGE_STATE_TTL:
+            return self._storage_state
+        return None
+    
+    async def _save_storage_state(self, context: BrowserContext):
+        """Запомнить cookies/localStorage контекста для следующих поисков"""
+        try:
+            self._storage_state = await context.storage_state()
+            self._storage_state_at = time.monotonic()
         except Exception as e:
-            logger.error(f"Playwright parsing error: {e}", exc_info=True)
-        
-        return listings
+            logger.warning(f"Storage state save error: {e}")
     
     async def _parse_page(self, page: Page) -> List[OLXListing]:
         """
         Парсинг одной страницы результатов
         
+        Все поля карточек извлекаются одним locator.evaluate_all() в браузере
+        (один CDP round-trip на страницу вместо нескольких на карточку).
+        
         Args:
             page: Playwright Page
         
         Returns:
             List[OLXListing]: Список объявлений
         """
-        listings = []
-        
         try:
-            # Получаем все карточки объявлений
-            cards = await page.query_selector_all('[data-cy="l-card"]')
+            cards = await page.locator(CARD_SELECTOR).evaluate_all(CARD_FIELDS_JS)
             
             if not cards:
                 # Пробуем старый дизайн
-                cards = await page.query_selector_all('.offer-wrapper')
+                cards = await page.locator(LEGACY_CARD_SELECTOR).evaluate_all(CARD_FIELDS_JS)
             
             logger.info(f"Found {len(cards)} cards")
             
-            for card in cards:
-                try:
-                    listing = await self._parse_card(card)
-                    if listing:
-                        listings.append(listing)
-                except Exception as e:
-                    logger.warning(f"Failed to parse card: {e}")
-                    continue
+            return self._build_listings(cards)
             
         except Exception as e:
             logger.error(f"Parse page error: {e}")
+            return []
+    
+    def _build_listings(self, cards: List[dict]) -> List[OLXListing]:
+        """
+        Построить объявления из полей карточек
+        
+        Строки собираются в Python, а валидируются одним вызовом
+        TypeAdapter (а не конструктором модели на каждую карточку).
+        
+        Args:
+            cards: Поля карточек из CARD_FIELDS_JS (title, price, href, loc)
         
-        return listings
+        Returns:
+            List[OLXListing]: Объявления (карточки без заголовка/ссылки пропускаются)
+        """
+        rows = [row for row in map(self._card_row, cards) if row is not None]
+        return _LISTING_LIST_ADAPTER.validate_python(rows)
     
-    async def _parse_card(self, card) -> Optional[OLXListing]:
+    def _card_row(self, card: dict) -> Optional[dict]:
         """
-        Парсинг одной карточки объявления
+        Поля объявления OLXListing из полей карточки
         
         Args:
-            card: Playwright ElementHandle
+            card: Поля карточки из CARD_FIELDS_JS (title, price, href, loc)
         
         Returns:
-            Optional[OLXListing]: Объявление или None
+            Optional[dict]: Поля объявления или None
         """
-        try:
-            # Заголовок
-            title_elem = await card.query_selector('h6')
-            if not title_elem:
-                title_elem = await card.query_selector('strong')
-            
-            if not title_elem:
-                return None
-            
-            title = await title_elem.inner_text()
-            title = title.strip()
-            
-            # Цена
-            price = None
-            price_elem = await card.query_selector('[data-testid="ad-price"]')
-            if not price_elem:
-                price_elem = await card.query_selector('.price strong')
-            
-            if price_elem:
-                price_text = await price_elem.inner_text()
-                price = self._parse_price(price_text)
-            
-            # Ссылка
-            link_elem = await card.query_selector('a')
-            if not link_elem:
-                return None
-            
-            link = await link_elem.get_attribute('href')
-            if not link:
-                return None
-            
-            if not link.startswith('http'):
-                link = self.base_url + link
-            
-            # External ID
-            external_id = self._extract_external_id(link)
-            
-            # Город (опционально)
-            city = None
-            city_elem = await card.query_selector('[data-testid="location-date"]')
-            if city_elem:
-                city_text = await city_elem.inner_text()
-                city = city_text.split('-')[0].strip() if '-' in city_text else None
-            
-            # Создаем объявление
-            listing = OLXListing(
-                title=title,
-                price=price,
-                url=link,
-                external_id=external_id,
-                city=city
-            )
-            
-            return listing
-            
-        except Exception as e:
-            logger.error(f"Parse card error: {e}")
+        title = card.get("title")
+        link = card.get("href")
+        if not title or not link:
             return None
+        
+        if not link.startswith('http'):
+            link = self.base_url + link
+        
+        # Город (опционально)
+        city = None
+        city_text = card.get("loc")
+        if city_text and '-' in city_text:
+            city = city_text.split('-')[0].strip()
+        
+        return {
+            "title": title,
+            "price": self._parse_price(card.get("price")),
+            "url": link,
+            "external_id": self._extract_external_id(link),
+            "city": city
+        }
     
-    def _parse_price(self, price_str: str) -> Optional[float]:
+    def _parse_price(self, price_str: Optional[str]) -> Optional[float]:
         """Парсинг цены из строки"""
         if not price_str:
             return None
         
-        try:
-            # Убираем все кроме цифр
-            price_digits = ''.join(filter(str.isdigit, price_str))
-            if price_digits:
-                return float(price_digits)
-        except:
-            pass
-        
-        return None
+        # Убираем все кроме цифр
+        price_digits = NON_DIGITS_RE.sub('', price_str)
+        return float(price_digits) if price_digits else None
     
     def _extract_external_id(self, url: str) -> Optional[str]:
         """Извлечь ID объявления из URL"""
-        try:
-            # URL обычно вида: https://www.olx.kz/d/obyavlenie/...-ID123456.html
-            if "-ID" in url:
-                parts = url.split("-ID")
-                if len(parts) > 1:
-                    id_part = parts[1].split(".")[0]
-                    return id_part
-        except:
-            pass
-        
-        return None
-    
-    async def _go_to_next_page(self, page: Page) -> bool:
-        """
-        Переход на следующую страницу
-        
-        Args:
-            page: Playwright Page
-        
-        Returns:
-            bool: True если успешно перешли
-        """
-        try:
-            # Ищем кнопку "Следующая страница"
-            next_button = await page.query_selector('a[data-cy="pagination-forward"]')
-            
-            if not next_button:
-                logger.info("No next page button found")
-                return False
-            
-            # Кликаем
-            await next_button.click()
-            
-            # Ждем загрузки
-            await page.wait_for_load_state("networkidle")
-            await asyncio.sleep(2)  # Дополнительная задержка
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Go to next page error: {e}")
-            return False
-
-
-
+        # URL обычно вида: https://www.olx.kz/d/obyavlenie/...-ID123456.html
+        match = EXTERNAL_ID_RE.search(url)
+        return match.group(1) if match else None
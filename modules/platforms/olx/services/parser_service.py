@@ -5,11 +5,16 @@ OLX Parser Service
 
 import httpx
 from lxml import etree
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from urllib.parse import urlencode
+from pydantic import TypeAdapter
+from datetime import datetime, timezone
 import logging
 import uuid
 import asyncio
+import re
+import time
 
 from ..models import (
     SearchQuery,
@@ -20,11 +25,137 @@ from ..models import (
     OLXParserMethod,
     ParserResult
 )
-from ..database.client import get_supabase_client
+from ..database.client import get_supabase_client, select_json, rpc_json
 from ..api.config import settings
 
+try:
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 — нужен httpx для HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# XPath выражения выдачи компилируются один раз, а не на каждый вызов xpath()
+# Поля карточки (новый / старый дизайн). string(): libxml2 сразу возвращает
+# первое совпадение строкой ('' если нет) — без списка совпадений и
+# _ElementUnicodeResult на каждое
+XP_TITLE = etree.XPath('string(.//h6/text())', smart_strings=False)
+XP_TITLE_OLD = etree.XPath('string(.//strong/text())', smart_strings=False)
+XP_PRICE = etree.XPath('string(.//p[@data-testid="ad-price"]/text())', smart_strings=False)
+XP_PRICE_OLD = etree.XPath('string(.//p[@class="price"]/strong/text())', smart_strings=False)
+XP_LINK = etree.XPath('string(.//a/@href)', smart_strings=False)
+
+# Селекторы для selectolax (в lxml пути: _card_kind и XP_* выше)
+CSS_CARDS = 'div[data-cy*="l-card"]'
+CSS_CARDS_OLD = 'div[class="offer-wrapper"]'
+CSS_EMPTY = 'div[class*="emptynew"]'
+CSS_TITLE = 'h6'
+CSS_TITLE_OLD = 'strong'
+CSS_PRICE = 'p[data-testid="ad-price"]'
+CSS_PRICE_OLD = 'p[class="price"] > strong'
+CSS_LINK = 'a[href]'
+
+# Размер части HTML, подаваемой lxml HTMLPullParser за раз (байт)
+PULL_PARSE_CHUNK = 64 * 1024
+
+# Цена: все, кроме цифр ("450 000 ₸" -> "450000")
+NON_DIGITS_RE = re.compile(r"\D+")
+# ID объявления из URL: ...-ID123456.html
+EXTERNAL_ID_RE = re.compile(r"-ID([^.]+)")
+
+
+def _card_kind(elem) -> Optional[str]:
+    """
+    Вид карточки lxml элемента: "new" (data-cy содержит l-card),
+    "old" (class="offer-wrapper") или None
+    """
+    if "l-card" in (elem.get("data-cy") or ""):
+        return "new"
+    if elem.get("class") == "offer-wrapper":
+        return "old"
+    return None
+
+
+def _first_text(node, selector: str) -> Optional[str]:
+    """
+    Собственный текст первого элемента с непустым текстом
+    (как [0] у XPath './/tag/text()'), None если такого нет
+    """
+    for match in node.css(selector):
+        text = match.text(deep=False).strip()
+        if text:
+            return text
+    return None
+
+
+# Сортировка выдачи по дате (новые первыми)
+SEARCH_ORDER_PARAMS = (("search[order]", "created_at:desc"),)
+
+
+@lru_cache(maxsize=1024)
+def _search_url(
+    base_url: str,
+    search_query: str,
+    city: Optional[str],
+    category: Optional[str]
+) -> str:
+    """
+    URL поиска OLX (кэшируется: одни и те же поиски запускаются повторно)
+    
+    Запрос кодируется (пробелы, кириллица, &, #), скобки и двоеточие
+    параметра сортировки остаются как есть.
+    """
+    params = [("q", search_query)] if search_query else []
+    
+    if city and city != "almaty":
+        # TODO: mapping городов на пути OLX
+        pass
+    
+    if category:
+        # TODO: категории
+        pass
+    
+    params.extend(SEARCH_ORDER_PARAMS)
+    
+    return f"{base_url}/list?{urlencode(params, safe='[]:')}"
+
+
+def _unique_listings(pages: List[List[OLXListing]]) -> List[OLXListing]:
+    """
+    Объявления всех страниц без повторов (по external_id, без него — по url)
+    
+    Продвигаемые объявления OLX показывает на каждой странице выдачи;
+    остается первое вхождение, порядок страниц сохраняется.
+    """
+    seen = set()
+    listings = []
+    
+    for page_listings in pages:
+        for listing in page_listings:
+            key = listing.external_id or listing.url
+            if key not in seen:
+                seen.add(key)
+                listings.append(listing)
+    
+    return listings
+
+
+# Запись завершенных задач пачками: не больше задач в пачке / ожидание пачки (сек)
+FINALIZE_BATCH_MAX = 100
+FINALIZE_BATCH_WAIT = 0.2
+
+# Валидация ответа PostgREST (JSON массив строк) сразу в модели
+_PARSED_DATA_LIST_ADAPTER = TypeAdapter(List[OLXParsedData])
+# Объявления задачи в dict одним вызовом pydantic-core (вместо .dict() на каждое)
+_LISTING_LIST_ADAPTER = TypeAdapter(List[OLXListing])
+
 
 class OLXParserService:
     """Сервис парсинга OLX.kz"""
@@ -32,6 +163,17 @@ class OLXParserService:
     def __init__(self):
         self.db = get_supabase_client()
         self.base_url = "https://www.olx.kz"
+        
+        # События завершения задач, запущенных этим процессом (для wait_task)
+        self._task_events: Dict[str, asyncio.Event] = {}
+        
+        # Общий HTTP клиент к olx.kz для всех задач (keep-alive, HTTP/2 если
+        # установлен h2) вместо нового клиента и TLS handshake на каждый поиск
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Очередь завершенных задач на запись в БД пачками
+        self._finalize_queue: asyncio.Queue = asyncio.Queue()
+        self._finalize_flusher: Optional[asyncio.Task] = None
     
     # ===================================
     # Public Methods
@@ -59,19 +201,23 @@ class OLXParserService:
                 "city": query.city,
                 "category": query.category,
                 "parser_method": query.parser_method.value,
-                "status": TaskStatus.PENDING.value,
-                "progress": 0
+                # Задача запускается сразу: создаем ее уже в статусе RUNNING
+                # (без отдельного UPDATE из _run_parsing_task)
+                "status": TaskStatus.RUNNING.value,
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "progress": 10
             }
             
             self.db.table("olx_parser_tasks").insert(task_data).execute()
             
             # Запускаем парсинг асинхронно (в фоне)
+            self._task_events[task_id] = asyncio.Event()
             asyncio.create_task(self._run_parsing_task(task_id, query))
             
             return ParserResult(
                 success=True,
                 task_id=task_id,
-                status=TaskStatus.PENDING,
+                status=TaskStatus.RUNNING,
                 items_found=0
             )
             
@@ -98,20 +244,41 @@ class OLXParserService:
             logger.error(f"Get task status error: {e}")
             return None
     
+    async def wait_task(self, task_id: str, timeout: float) -> Optional[dict]:
+        """
+        Дождаться завершения задачи парсинга (без опроса со стороны клиента)
+        
+        Args:
+            task_id: ID задачи
+            timeout: Максимальное время ожидания (секунды)
+        
+        Returns:
+            dict: Задача (в статусе на момент завершения или таймаута) или None
+        """
+        event = self._task_events.get(task_id)
+        
+        # Задача запущена в этом процессе и еще выполняется
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        
+        return await self.get_task_status(task_id)
+    
     async def get_parse_results(self, result_id: str) -> Optional[OLXParsedData]:
         """Получить результаты парсинга"""
         try:
-            result = self.db.table("olx_parsed_data").select("*").eq("id", result_id).execute()
-            
-            if not result.data:
-                return None
-            
-            data = result.data[0]
-            # Преобразуем JSONB data в список OLXListing
-            listings = [OLXListing(**item) for item in data.get("data", [])]
-            data["data"] = listings
+            # Результат со всеми объявлениями (JSONB data) может быть большим:
+            # байты ответа валидируются сразу в модели, без json.loads в dict
+            raw = select_json(self.db, "olx_parsed_data", {
+                "select": "*",
+                "id": f"eq.{result_id}",
+                "limit": "1"
+            })
             
-            return OLXParsedData(**data)
+            results = _PARSED_DATA_LIST_ADAPTER.validate_json(raw)
+            return results[0] if results else None
             
         except Exception as e:
             logger.error(f"Get parse results error: {e}")
@@ -123,25 +290,19 @@ class OLXParserService:
     
     async def _run_parsing_task(self, task_id: str, query: SearchQuery):
         """Выполнить задачу парсинга"""
-        start_time = datetime.now()
+        # Длительность по монотонным часам (не зависит от перевода системного времени)
+        start_time = time.perf_counter()
         
         try:
-            # Обновляем статус на RUNNING
-            self.db.table("olx_parser_tasks").update({
-                "status": TaskStatus.RUNNING.value,
-                "started_at": start_time.isoformat(),
-                "progress": 10
-            }).eq("id", task_id).execute()
-            
             # Строим URL для поиска
             search_url = self._build_search_url(query)
             logger.info(f"Parsing URL: {search_url}")
             
             # Парсим
-            listings = await self._parse_olx_search(search_url, query.max_pages)
+            listings, pages_parsed = await self._parse_olx_search(search_url, query.max_pages)
             
             # Сохраняем результаты
-            parse_duration = (datetime.now() - start_time).total_seconds()
+            parse_duration = time.perf_counter() - start_time
             
             parsed_data = {
                 "search_query": query.search_query,
@@ -149,23 +310,16 @@ class OLXParserService:
                 "city": query.city,
                 "category": query.category,
                 "parser_method": query.parser_method.value,
-                "data": [listing.dict() for listing in listings],
+                "data": _LISTING_LIST_ADAPTER.dump_python(listings),
                 "items_count": len(listings),
                 "parse_duration_seconds": parse_duration,
-                "pages_parsed": min(query.max_pages, 1),  # TODO: реальное количество
-                "status": "success"
+                "pages_parsed": pages_parsed,
+                # partial: часть страниц не загрузилась
+                "status": "success" if pages_parsed == query.max_pages else "partial"
             }
             
-            result = self.db.table("olx_parsed_data").insert(parsed_data).execute()
-            result_id = result.data[0]["id"] if result.data else None
-            
-            # Обновляем задачу
-            self.db.table("olx_parser_tasks").update({
-                "status": TaskStatus.COMPLETED.value,
-                "progress": 100,
-                "result_id": result_id,
-                "completed_at": datetime.now().isoformat()
-            }).eq("id", task_id).execute()
+            # Результаты + статус COMPLETED (пачкой с другими задачами)
+            await self._finalize_task(task_id, parsed_data)
             
             logger.info(f"Parsing completed: {len(listings)} items found")
             
@@ -176,41 +330,143 @@ class OLXParserService:
             self.db.table("olx_parser_tasks").update({
                 "status": TaskStatus.FAILED.value,
                 "error_message": str(e),
-                "completed_at": datetime.now().isoformat()
+                "completed_at": datetime.now(timezone.utc).isoformat()
             }).eq("id", task_id).execute()
+        
+        finally:
+            # Будим ожидающих wait_task
+            event = self._task_events.pop(task_id, None)
+            if event is not None:
+                event.set()
     
-    def _build_search_url(self, query: SearchQuery) -> str:
-        """Построить URL для поиска"""
-        # Базовый URL
-        url = f"{self.base_url}/list"
+    async def _finalize_task(self, task_id: str, parsed_data: dict) -> Optional[str]:
+        """
+        Сохранить результаты задачи и отметить ее выполненной
         
-        # Добавляем параметры
-        params = []
+        Задачи, завершившиеся почти одновременно, сохраняются одним RPC
+        (до FINALIZE_BATCH_MAX задач за FINALIZE_BATCH_WAIT секунд).
+        Возвращает управление после записи в БД.
         
-        if query.search_query:
-            params.append(f"q={query.search_query}")
+        Returns:
+            Optional[str]: ID результата (olx_parsed_data)
+        """
+        if self._finalize_flusher is None:
+            self._finalize_flusher = asyncio.create_task(self._finalize_loop())
         
-        if query.city and query.city != "almaty":
-            # TODO: mapping городов на пути OLX
-            pass
+        future = asyncio.get_running_loop().create_future()
+        await self._finalize_queue.put((task_id, parsed_data, future))
+        return await future
+    
+    async def _finalize_loop(self):
+        """Фоновая запись завершенных задач пачками"""
+        loop = asyncio.get_running_loop()
         
-        if query.category:
-            # TODO: категории
-            pass
+        while True:
+            batch = [await self._finalize_queue.get()]
+            deadline = loop.time() + FINALIZE_BATCH_WAIT
+            
+            try:
+                while len(batch) < FINALIZE_BATCH_MAX:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._finalize_queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            finally:
+                # Собранная пачка пишется и при остановке (close). Отмена не
+                # прерывает запись, иначе ожидающие _finalize_task зависнут
+                flush = asyncio.ensure_future(self._flush_finalize(batch))
+                try:
+                    await asyncio.shield(flush)
+                except asyncio.CancelledError:
+                    await flush
+                    raise
+    
+    async def _flush_finalize(self, batch: list):
+        """
+        Записать пачку (task_id, parsed_data, future) и разбудить ожидающих
         
-        # Сортировка по дате (новые первыми)
-        params.append("search[order]=created_at:desc")
+        RPC синхронный (httpx клиент Supabase), поэтому выполняется в потоке
+        и не блокирует event loop на время записи пачки.
+        """
+        try:
+            result_ids = await asyncio.to_thread(rpc_json, self.db, "finalize_olx_parser_tasks", {
+                "p_tasks": [
+                    {"task_id": task_id, "parsed": parsed_data}
+                    for task_id, parsed_data, _ in batch
+                ]
+            }) or []
+            
+            for (_, _, future), result_id in zip(batch, result_ids):
+                if not future.done():
+                    future.set_result(result_id)
+            
+        except Exception as e:
+            # Пачка откатилась целиком: пишем задачи по одной,
+            # чтобы ошибка одной не отменила результаты остальных
+            logger.warning(f"Batch finalize failed ({e}), finalizing {len(batch)} tasks one by one")
+            
+            for task_id, parsed_data, future in batch:
+                if future.done():
+                    continue
+                try:
+                    result_id = await asyncio.to_thread(rpc_json, self.db, "finalize_olx_parser_task", {
+                        "p_task_id": task_id,
+                        "p_parsed": parsed_data
+                    })
+                except Exception as task_error:
+                    if not future.done():
+                        future.set_exception(task_error)
+                else:
+                    if not future.done():
+                        future.set_result(result_id)
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Получить общий HTTP клиент (создается при первом вызове)"""
+        if self._client is None:
+            # Сжатие ответа httpx согласует сам: gzip/deflate всегда, br —
+            # если установлен brotli (HTML выдачи сжимается в разы)
+            self._client = httpx.AsyncClient(
+                timeout=settings.parser_timeout,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                headers={
+                    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+                }
+            )
+        return self._client
+    
+    async def close(self):
+        """Дописать ожидающие задачи, остановить фоновую запись и закрыть HTTP клиент"""
+        if self._finalize_flusher is not None:
+            self._finalize_flusher.cancel()
+            try:
+                await self._finalize_flusher
+            except asyncio.CancelledError:
+                pass
+            self._finalize_flusher = None
         
-        if params:
-            url += "?" + "&".join(params)
+        pending = []
+        while not self._finalize_queue.empty():
+            pending.append(self._finalize_queue.get_nowait())
+        if pending:
+            await self._flush_finalize(pending)
         
-        return url
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _build_search_url(self, query: SearchQuery) -> str:
+        """Построить URL для поиска"""
+        return _search_url(self.base_url, query.search_query, query.city, query.category)
     
     async def _parse_olx_search(
         self,
         search_url: str,
         max_pages: int = 1
-    ) -> List[OLXListing]:
+    ) -> Tuple[List[OLXListing], int]:
         """
         Парсинг поиска OLX.kz (адаптировано из lerdem/olx-parser)
         
@@ -219,56 +475,146 @@ class OLXParserService:
             max_pages: Максимальное количество страниц
         
         Returns:
-            List[OLXListing]: Список объявлений
+            Tuple[List[OLXListing], int]: Объявления и число успешно
+            загруженных страниц
         """
-        listings = []
+        # Страницы независимы: загружаются параллельно, не больше
+        # parser_concurrent_pages одновременно
+        urls = [search_url] + [f"{search_url}&page={n}" for n in range(2, max_pages + 1)]
+        semaphore = asyncio.Semaphore(settings.parser_concurrent_pages)
         
-        try:
-            async with httpx.AsyncClient(timeout=settings.parser_timeout) as client:
-                # Получаем HTML
-                response = await client.get(
-                    search_url,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-                    }
-                )
+        pages = await asyncio.gather(*(self._parse_olx_page(url, semaphore) for url in urls))
+        parsed = [page_listings for page_listings in pages if page_listings is not None]
+        
+        return _unique_listings(parsed), len(parsed)
+    
+    async def _parse_olx_page(self, url: str, semaphore: asyncio.Semaphore) -> Optional[List[OLXListing]]:
+        """
+        Парсинг одной страницы выдачи
+        
+        Args:
+            url: URL страницы
+            semaphore: Ограничение одновременно загружаемых страниц поиска
+        
+        Returns:
+            Optional[List[OLXListing]]: Объявления страницы, None при ошибке
+        """
+        async with semaphore:
+            try:
+                # Страница нужна целиком: разбирается одним вызовом в потоке
+                response = await self._get_client().get(url)
                 
                 if response.status_code != 200:
-                    logger.error(f"Failed to fetch: {response.status_code}")
-                    return listings
-                
-                html = response.text
-                dom = etree.HTML(html)
-                
-                # Проверяем пустой поиск
-                is_empty = len(dom.xpath('//div[contains(@class, "emptynew")]')) == 1
-                if is_empty:
-                    logger.info("Empty search results")
-                    return listings
-                
-                # Парсим объявления (используем несколько вариантов селекторов)
-                # Вариант 1: новый дизайн OLX
-                items = dom.xpath('.//div[contains(@data-cy, "l-card")]')
+                    logger.error(f"Failed to fetch {url}: {response.status_code}")
+                    return None
                 
-                if not items:
-                    # Вариант 2: старый дизайн
-                    items = dom.xpath('.//div[@class="offer-wrapper"]')
+                return await self._read_listings(response.content)
                 
-                logger.info(f"Found {len(items)} items")
-                
-                for item in items:
-                    try:
-                        listing = self._parse_listing_item(item)
-                        if listing:
-                            listings.append(listing)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse item: {e}")
-                        continue
-                
-                # TODO: Pagination - парсинг следующих страниц
-                
-        except Exception as e:
-            logger.error(f"Parse OLX search error: {e}", exc_info=True)
+            except Exception as e:
+                logger.error(f"Parse OLX search error ({url}): {e}", exc_info=True)
+                return None
+    
+    async def _read_listings(self, html: bytes) -> List[OLXListing]:
+        """
+        Объявления из HTML страницы выдачи
+        
+        Страница разбирается одним вызовом в потоке: парсер и его дерево
+        создаются и используются в одном потоке (lxml не поддерживает перенос
+        парсера между потоками посреди разбора), а event loop в это время
+        загружает остальные страницы. lxml и selectolax отпускают GIL, так
+        что страницы разбираются параллельно.
+        
+        Через selectolax (CSS селекторы, парсер на C без дерева lxml), если он
+        установлен и включен parser_use_selectolax; иначе через lxml.
+        """
+        if SELECTOLAX_AVAILABLE and settings.parser_use_selectolax:
+            return await asyncio.to_thread(self._extract_listings_selectolax, html)
+        
+        return await asyncio.to_thread(self._extract_listings_lxml, html)
+    
+    def _extract_listings_lxml(self, html: bytes) -> List[OLXListing]:
+        """
+        Объявления из HTML через lxml (HTMLPullParser)
+        
+        HTML подается парсеру частями по PULL_PARSE_CHUNK байт, разобранные
+        карточки после каждой части удаляются из дерева, так что дерево
+        всей страницы не строится.
+        """
+        parser = etree.HTMLPullParser(events=("end",), tag="div")
+        # Карточки нового и старого дизайна, число блоков "пустой поиск"
+        cards, cards_old, empty_blocks = [], [], [0]
+        
+        for offset in range(0, len(html), PULL_PARSE_CHUNK):
+            parser.feed(html[offset:offset + PULL_PARSE_CHUNK])
+            self._consume_card_events(parser, cards, cards_old, empty_blocks)
+        
+        parser.close()
+        self._consume_card_events(parser, cards, cards_old, empty_blocks)
+        
+        # Проверяем пустой поиск
+        if empty_blocks[0] == 1:
+            logger.info("Empty search results")
+            return []
+        
+        # Вариант 1: новый дизайн OLX, вариант 2: старый дизайн
+        items = cards or cards_old
+        logger.info(f"Found {len(items)} items")
+        
+        return [listing for listing in items if listing]
+    
+    def _consume_card_events(
+        self,
+        parser: etree.HTMLPullParser,
+        cards: list,
+        cards_old: list,
+        empty_blocks: list
+    ):
+        """
+        Разобрать карточки из закрытых на данный момент <div> и освободить их
+        
+        Вызывается только из _extract_listings_lxml, в потоке, где создан parser.
+        """
+        for _, elem in parser.read_events():
+            if "emptynew" in (elem.get("class") or ""):
+                empty_blocks[0] += 1
+                continue
+            
+            kind = _card_kind(elem)
+            if kind is None:
+                continue
+            
+            (cards if kind == "new" else cards_old).append(self._parse_listing_item(elem))
+            
+            # Карточка разобрана: удаляем ее и предыдущие (уже разобранные)
+            # элементы, если она не вложена в другую карточку
+            if not any(_card_kind(parent) for parent in elem.iterancestors("div")):
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+    
+    def _extract_listings_selectolax(self, html: bytes) -> List[OLXListing]:
+        """Объявления из HTML через selectolax (те же селекторы, что и XPath)"""
+        listings = []
+        tree = HTMLParser(html)
+        
+        # Проверяем пустой поиск
+        if len(tree.css(CSS_EMPTY)) == 1:
+            logger.info("Empty search results")
+            return listings
+        
+        # Вариант 1: новый дизайн OLX, вариант 2: старый дизайн
+        nodes = tree.css(CSS_CARDS) or tree.css(CSS_CARDS_OLD)
+        
+        logger.info(f"Found {len(nodes)} items")
+        
+        for node in nodes:
+            try:
+                listing = self._parse_listing_node(node)
+                if listing:
+                    listings.append(listing)
+            except Exception as e:
+                logger.warning(f"Failed to parse item: {e}")
+                continue
         
         return listings
     
@@ -284,82 +630,98 @@ class OLXParserService:
         """
         try:
             # Вариант 1: новый дизайн
-            title_xpath = './/h6/text()'
-            price_xpath = './/p[@data-testid="ad-price"]/text()'
-            link_xpath = './/a/@href'
+            xp_price = XP_PRICE
+            title = XP_TITLE(item).strip()
             
-            title_candidates = item.xpath(title_xpath)
-            
-            if not title_candidates:
+            if not title:
                 # Вариант 2: старый дизайн
-                title_xpath = './/strong/text()'
-                price_xpath = './/p[@class="price"]/strong/text()'
-                title_candidates = item.xpath(title_xpath)
+                xp_price = XP_PRICE_OLD
+                title = XP_TITLE_OLD(item).strip()
             
-            if not title_candidates:
+            if not title:
                 return None
             
-            title = title_candidates[0].strip()
-            
             # Цена
-            price_candidates = item.xpath(price_xpath)
-            price_str = price_candidates[0].strip() if price_candidates else None
-            price = self._parse_price(price_str)
+            price_str = xp_price(item).strip() or None
             
             # Ссылка
-            link_candidates = item.xpath(link_xpath)
-            if not link_candidates:
+            link = XP_LINK(item)
+            if not link:
                 return None
             
-            link = link_candidates[0]
-            if not link.startswith("http"):
-                link = self.base_url + link
+            return self._make_listing(title, price_str, link)
             
-            # External ID из URL
-            external_id = self._extract_external_id(link)
-            
-            # Создаем объявление
-            listing = OLXListing(
-                title=title,
-                price=price,
-                url=link,
-                external_id=external_id
-            )
+        except Exception as e:
+            logger.error(f"Parse listing item error: {e}")
+            return None
+    
+    def _parse_listing_node(self, node) -> Optional[OLXListing]:
+        """
+        Парсинг одного объявления
+        
+        Args:
+            node: selectolax Node
+        
+        Returns:
+            Optional[OLXListing]: Объявление или None
+        """
+        try:
+            # Вариант 1: новый дизайн
+            css_price = CSS_PRICE
+            title = _first_text(node, CSS_TITLE)
+            
+            if not title:
+                # Вариант 2: старый дизайн
+                css_price = CSS_PRICE_OLD
+                title = _first_text(node, CSS_TITLE_OLD)
+            
+            if not title:
+                return None
+            
+            # Ссылка
+            link_node = node.css_first(CSS_LINK)
+            link = link_node.attributes.get("href") if link_node is not None else None
+            if not link:
+                return None
             
-            return listing
+            return self._make_listing(title, _first_text(node, css_price), link)
             
         except Exception as e:
             logger.error(f"Parse listing item error: {e}")
             return None
     
+    def _make_listing(self, title: str, price_str: Optional[str], link: str) -> OLXListing:
+        """
+        Объявление из заголовка, строки цены и ссылки карточки
+        
+        Без валидации (model_construct): все поля уже нужных типов —
+        str из парсера, float/None из _parse_price.
+        """
+        if not link.startswith("http"):
+            link = self.base_url + link
+        
+        return OLXListing.model_construct(
+            title=title,
+            price=self._parse_price(price_str),
+            url=link,
+            # External ID из URL
+            external_id=self._extract_external_id(link)
+        )
+    
     def _parse_price(self, price_str: Optional[str]) -> Optional[float]:
         """Парсинг цены из строки"""
         if not price_str:
             return None
         
-        try:
-            # Убираем все кроме цифр
-            price_digits = ''.join(filter(str.isdigit, price_str))
-            if price_digits:
-                return float(price_digits)
-        except:
-            pass
-        
-        return None
+        # Убираем все кроме цифр
+        price_digits = NON_DIGITS_RE.sub('', price_str)
+        return float(price_digits) if price_digits else None
     
     def _extract_external_id(self, url: str) -> Optional[str]:
         """Извлечь ID объявления из URL"""
-        try:
-            # URL обычно вида: https://www.olx.kz/d/obyavlenie/...-ID123456.html
-            if "-ID" in url:
-                parts = url.split("-ID")
-                if len(parts) > 1:
-                    id_part = parts[1].split(".")[0]
-                    return id_part
-        except:
-            pass
-        
-        return None
+        # URL обычно вида: https://www.olx.kz/d/obyavlenie/...-ID123456.html
+        match = EXTERNAL_ID_RE.search(url)
+        return match.group(1) if match else None
 
 
 
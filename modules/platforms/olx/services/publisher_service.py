@@ -3,24 +3,32 @@ OLX Publisher Service
 Публикация объявлений на OLX.kz
 """
 
-from playwright.async_api import async_playwright, Browser, Page
-from typing import Optional
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+from redis.exceptions import RedisError
+from typing import Dict, List, Optional
 import logging
 import uuid
 from datetime import datetime
 import asyncio
+import orjson
+from collections import OrderedDict
 
 from ..models import (
     OLXAd,
     OLXAdCreate,
     OLXAdStatus,
+    OLXPublishMethod,
     PublishResult
 )
 from ..database.client import get_supabase_client
+from ..database.cache import get_redis_client, invalidate_account, ACCOUNT_CACHE_KEY
 from ..api.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Максимум открытых BrowserContext (по одному на аккаунт, LRU)
+BROWSER_CONTEXTS_MAX = 32
+
 
 class OLXPublisherService:
     """Сервис публикации объявлений на OLX.kz"""
@@ -28,6 +36,33 @@ class OLXPublisherService:
     def __init__(self):
         self.db = get_supabase_client()
         self.base_url = "https://www.olx.kz"
+        
+        # Браузер запускается один раз и переиспользуется всеми публикациями;
+        # на аккаунт — один BrowserContext (cookies, User-Agent), на объявление — страница
+        self._pw: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._browser_lock = asyncio.Lock()
+        # account_id -> (last_login_at при создании, контекст), LRU
+        self._contexts: "OrderedDict[str, tuple]" = OrderedDict()
+        # Публикации одного аккаунта идут по очереди (общая сессия и вход)
+        self._account_locks: Dict[str, asyncio.Lock] = {}
+    
+    async def close(self):
+        """Закрыть контексты и браузер (при остановке приложения)"""
+        async with self._browser_lock:
+            for account_id in list(self._contexts):
+                await self._drop_context(account_id)
+            
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception as e:
+                    logger.warning(f"Browser close error: {e}")
+                self._browser = None
+            
+            if self._pw is not None:
+                await self._pw.stop()
+                self._pw = None
     
     # ===================================
     # Public Methods
@@ -48,58 +83,66 @@ class OLXPublisherService:
         Returns:
             PublishResult: Результат публикации
         """
+        return (await self.create_ads_bulk([ad_data], account_id))[0]
+    
+    async def create_ads_bulk(
+        self,
+        ads: List[OLXAdCreate],
+        account_id: str
+    ) -> List[PublishResult]:
+        """
+        Создать несколько объявлений одного аккаунта
+        
+        Аккаунт читается один раз, объявления публикуются через общий
+        контекст аккаунта, а успешные сохраняются в olx_ads одним insert.
+        
+        Args:
+            ads: Данные объявлений
+            account_id: ID аккаунта OLX
+        
+        Returns:
+            List[PublishResult]: Результаты в порядке ads
+        """
         try:
             # Получаем аккаунт
-            account_result = self.db.table("olx_accounts").select("*").eq("id", account_id).execute()
-            
-            if not account_result.data:
-                return PublishResult(
-                    success=False,
-                    error="Account not found"
-                )
-            
-            account = account_result.data[0]
-            
-            # Проверяем статус аккаунта
-            if account.get("status") != "active":
-                return PublishResult(
-                    success=False,
-                    error=f"Account is {account.get('status')}, must be active"
-                )
-            
-            # Публикуем через Playwright
-            result = await self._publish_via_playwright(ad_data, account)
-            
-            if result.success:
-                # Сохраняем объявление в БД
-                ad_id = str(uuid.uuid4())
-                ad_db_data = {
-                    "id": ad_id,
-                    "account_id": account_id,
-                    "title": ad_data.title,
-                    "description": ad_data.description,
-                    "price": ad_data.price,
-                    "category": ad_data.category,
-                    "city": ad_data.city,
-                    "status": OLXAdStatus.PUBLISHED.value,
-                    "external_id": result.external_id,
-                    "external_url": result.ad_url,
-                    "images": ad_data.images,
-                    "metadata": ad_data.metadata
-                }
-                
-                self.db.table("olx_ads").insert(ad_db_data).execute()
-                
-                result.ad_id = ad_id
-            
-            return result
-            
+            account = await self._get_account(account_id)
         except Exception as e:
             logger.error(f"Create ad error: {e}", exc_info=True)
-            return PublishResult(
-                success=False,
-                error=str(e)
-            )
+            return [self._failed_result(str(e))] * len(ads)
+        
+        if account is None:
+            # Аккаунт удален: его сессия в браузере больше не нужна
+            async with self._get_account_lock(account_id):
+                await self._drop_context(account_id)
+            self._account_locks.pop(account_id, None)
+            return [self._failed_result("Account not found")] * len(ads)
+        
+        # Проверяем статус аккаунта
+        if account.get("status") != "active":
+            return [
+                self._failed_result(f"Account is {account.get('status')}, must be active")
+            ] * len(ads)
+        
+        # Публикуем через Playwright (ошибки каждой публикации — в ее результате)
+        results = list(await asyncio.gather(
+            *(self._publish_via_playwright(ad_data, account) for ad_data in ads)
+        ))
+        
+        # Строки olx_ads успешных публикаций: индекс результата -> строка
+        rows = {
+            i: self._ad_row(ad_data, account_id, result)
+            for i, (ad_data, result) in enumerate(zip(ads, results))
+            if result.success
+        }
+        
+        if rows:
+            for i, error in self._save_ads(rows).items():
+                if error is None:
+                    results[i] = results[i].model_copy(update={"ad_id": rows[i]["id"]})
+                else:
+                    results[i] = results[i].model_copy(update={"success": False, "error": error})
+        
+        return results
     
     async def get_ad(self, ad_id: str) -> Optional[OLXAd]:
         """Получить объявление по ID"""
@@ -136,6 +179,188 @@ class OLXPublisherService:
     # Internal Methods
     # ===================================
     
+    async def _get_account(self, account_id: str) -> Optional[dict]:
+        """
+        Строка аккаунта из Redis, при промахе — из Supabase (с записью в кэш)
+        
+        Ключ сбрасывается при каждой записи в строку аккаунта (auth_service:
+        вход, обновление токена, удаление; публикатор: cookies), так что кэш
+        не отдает удаленный аккаунт или старые токены. Ошибки Redis не мешают
+        публикации: аккаунт читается из БД.
+        """
+        key = ACCOUNT_CACHE_KEY.format(account_id)
+        
+        try:
+            cached = await get_redis_client().get(key)
+            if cached is not None:
+                return orjson.loads(cached)
+        except RedisError as e:
+            logger.warning(f"Account cache read error: {e}")
+        
+        result = self.db.table("olx_accounts").select("*").eq("id", account_id).execute()
+        
+        if not result.data:
+            return None
+        
+        account = result.data[0]
+        
+        try:
+            await get_redis_client().setex(key, settings.redis_cache_ttl, orjson.dumps(account))
+        except RedisError as e:
+            logger.warning(f"Account cache write error: {e}")
+        
+        return account
+    
+    def _ad_row(self, ad_data: OLXAdCreate, account_id: str, result: PublishResult) -> dict:
+        """Строка olx_ads опубликованного объявления"""
+        return {
+            "id": str(uuid.uuid4()),
+            "account_id": account_id,
+            "title": ad_data.title,
+            "description": ad_data.description,
+            "price": ad_data.price,
+            "category": ad_data.category,
+            "city": ad_data.city,
+            "status": OLXAdStatus.PUBLISHED.value,
+            "external_id": result.external_id,
+            "external_url": result.ad_url,
+            "images": ad_data.images,
+            "metadata": ad_data.metadata
+        }
+    
+    def _save_ads(self, rows: Dict[int, dict]) -> Dict[int, Optional[str]]:
+        """
+        Сохранить объявления в БД одним insert
+        
+        Если пачка не записалась, строки пишутся по одной, чтобы ошибка
+        одной строки не отменяла сохранение остальных.
+        
+        Returns:
+            Dict[int, Optional[str]]: Ключ из rows -> текст ошибки (None, если сохранено)
+        """
+        try:
+            self.db.table("olx_ads").insert(list(rows.values())).execute()
+            return dict.fromkeys(rows)
+        except Exception as e:
+            logger.warning(f"Batch save ads error, saving one by one: {e}")
+        
+        errors: Dict[int, Optional[str]] = {}
+        for i, row in rows.items():
+            try:
+                self.db.table("olx_ads").insert(row).execute()
+                errors[i] = None
+            except Exception as e:
+                logger.error(f"Save ad error: {e}", exc_info=True)
+                errors[i] = str(e)
+        
+        return errors
+    
+    @staticmethod
+    def _failed_result(error: str) -> PublishResult:
+        """Неуспешный результат публикации"""
+        return PublishResult(
+            success=False,
+            error=error,
+            method=OLXPublishMethod.BROWSER
+        )
+    
+    async def _ensure_browser(self) -> Browser:
+        """Запустить браузер, если он еще не запущен (или упал)"""
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._pw is None:
+                    self._pw = await async_playwright().start()
+                
+                # Контексты упавшего браузера больше не работают
+                self._contexts.clear()
+                
+                self._browser = await self._pw.chromium.launch(
+                    headless=settings.browser_headless,
+                    slow_mo=settings.browser_slow_mo
+                )
+                logger.info("Playwright browser started")
+            
+            return self._browser
+    
+    async def _get_context(self, account: dict) -> BrowserContext:
+        """
+        Контекст браузера аккаунта
+        
+        Создается при первой публикации с cookies и User-Agent аккаунта и
+        дальше переиспользуется (сессия OLX сохраняется между объявлениями).
+        Если аккаунт с тех пор вошел заново (изменился last_login_at),
+        старый контекст закрывается и создается новый. Открыто не больше
+        BROWSER_CONTEXTS_MAX контекстов: давно не использованные закрываются.
+        Вызывается под блокировкой аккаунта.
+        """
+        browser = await self._ensure_browser()
+        
+        account_id = account["id"]
+        login_marker = account.get("last_login_at")
+        
+        entry = self._contexts.get(account_id)
+        if entry is not None:
+            if entry[0] == login_marker:
+                self._contexts.move_to_end(account_id)
+                return entry[1]
+            
+            # Новый вход: cookies старой сессии больше не нужны
+            await self._drop_context(account_id)
+        
+        context = await browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            user_agent=account.get("user_agent") or "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+        )
+        
+        # Загружаем cookies если есть
+        if account.get("cookies"):
+            await context.add_cookies(account["cookies"])
+        
+        self._contexts[account_id] = (login_marker, context)
+        await self._evict_contexts()
+        
+        return context
+    
+    async def _evict_contexts(self):
+        """Закрыть самые старые контексты сверх BROWSER_CONTEXTS_MAX (кроме занятых публикацией)"""
+        for account_id in list(self._contexts):
+            if len(self._contexts) <= BROWSER_CONTEXTS_MAX:
+                break
+            
+            lock = self._account_locks.get(account_id)
+            if lock is not None and lock.locked():
+                continue
+            
+            await self._drop_context(account_id)
+            self._account_locks.pop(account_id, None)
+    
+    async def _drop_context(self, account_id: str):
+        """Закрыть контекст аккаунта, если он открыт"""
+        entry = self._contexts.pop(account_id, None)
+        if entry is None:
+            return
+        
+        try:
+            await entry[1].close()
+        except Exception as e:
+            logger.warning(f"Browser context close error: {e}")
+    
+    def _get_account_lock(self, account_id: str) -> asyncio.Lock:
+        """Блокировка публикаций аккаунта (свободные вытесняются вместе с контекстами)"""
+        lock = self._account_locks.get(account_id)
+        if lock is not None:
+            return lock
+        
+        # Свободные блокировки аккаунтов без контекста (публикация не дошла
+        # до браузера) не копим
+        if len(self._account_locks) >= BROWSER_CONTEXTS_MAX * 2:
+            for old_id, old_lock in list(self._account_locks.items()):
+                if old_id not in self._contexts and not old_lock.locked():
+                    del self._account_locks[old_id]
+        
+        lock = self._account_locks[account_id] = asyncio.Lock()
+        return lock
+    
     async def _publish_via_playwright(
         self,
         ad_data: OLXAdCreate,
@@ -151,23 +376,11 @@ class OLXPublisherService:
         Returns:
             PublishResult: Результат публикации
         """
+        page: Optional[Page] = None
+        
         try:
-            async with async_playwright() as p:
-                # Запускаем браузер
-                browser = await p.chromium.launch(
-                    headless=settings.browser_headless,
-                    slow_mo=settings.browser_slow_mo
-                )
-                
-                context = await browser.new_context(
-                    viewport={"width": 1920, "height": 1080},
-                    user_agent=account.get("user_agent") or "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-                )
-                
-                # Загружаем cookies если есть
-                if account.get("cookies"):
-                    await context.add_cookies(account["cookies"])
-                
+            async with self._get_account_lock(account["id"]):
+                context = await self._get_context(account)
                 page = await context.new_page()
                 
                 # Переходим на страницу добавления объявления
@@ -180,10 +393,10 @@ class OLXPublisherService:
                     # Нужна авторизация
                     login_success = await self._login(page, account)
                     if not login_success:
-                        await browser.close()
                         return PublishResult(
                             success=False,
-                            error="Login failed"
+                            error="Login failed",
+                            method=OLXPublishMethod.BROWSER
                         )
                 
                 # Заполняем форму объявления
@@ -209,23 +422,32 @@ class OLXPublisherService:
                 self.db.table("olx_accounts").update({
                     "cookies": cookies
                 }).eq("id", account["id"]).execute()
-                
-                await browser.close()
-                
-                logger.info(f"Ad published successfully: {ad_url}")
-                
-                return PublishResult(
-                    success=True,
-                    ad_url=ad_url,
-                    external_id=external_id
-                )
+                await invalidate_account(account["id"])
+            
+            logger.info(f"Ad published successfully: {ad_url}")
+            
+            return PublishResult(
+                success=True,
+                ad_url=ad_url,
+                external_id=external_id,
+                method=OLXPublishMethod.BROWSER
+            )
             
         except Exception as e:
             logger.error(f"Publish via Playwright error: {e}", exc_info=True)
             return PublishResult(
                 success=False,
-                error=str(e)
+                error=str(e),
+                method=OLXPublishMethod.BROWSER
             )
+        
+        finally:
+            # Контекст аккаунта остается открытым, закрывается только страница
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception as e:
+                    logger.warning(f"Page close error: {e}")
     
     async def _check_login(self, page: Page) -> bool:
         """Проверить авторизован ли пользователь"""
@@ -0,0 +1,10 @@
+"""
+Общие настройки тестов OLX модуля
+"""
+
+import os
+
+# Настройки модуля читаются при импорте: обязательные поля Supabase
+# задаются заглушками (клиент БД в тестах подменяется)
+os.environ.setdefault("OLX_SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("OLX_SUPABASE_KEY", "test-key")
@@ -0,0 +1,100 @@
+"""
+Тесты пакетной записи завершенных задач парсинга (_finalize_task)
+"""
+
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+
+from modules.platforms.olx.services import parser_service
+from modules.platforms.olx.services.parser_service import OLXParserService
+
+
+class FakeRPC:
+    """Fake rpc_json: запоминает вызовы и поток, в котором они выполнены"""
+
+    def __init__(self, fail_batch=False, fail_tasks=()):
+        self.calls = []
+        self.threads = set()
+        self.fail_batch = fail_batch
+        self.fail_tasks = set(fail_tasks)
+
+    def __call__(self, client, function, params):
+        self.calls.append((function, params))
+        self.threads.add(threading.get_ident())
+
+        if function == "finalize_olx_parser_tasks":
+            if self.fail_batch:
+                raise RuntimeError("batch failed")
+            return [f"result-{task['task_id']}" for task in params["p_tasks"]]
+
+        if params["p_task_id"] in self.fail_tasks:
+            raise RuntimeError(params["p_task_id"])
+        return f"result-{params['p_task_id']}"
+
+
+@pytest.fixture
+def service():
+    with mock.patch.object(parser_service, "get_supabase_client"):
+        return OLXParserService()
+
+
+@pytest.mark.asyncio
+async def test_tasks_finished_together_are_written_in_one_rpc(service):
+    rpc = FakeRPC()
+
+    with mock.patch.object(parser_service, "rpc_json", rpc):
+        results = await asyncio.wait_for(
+            asyncio.gather(*(service._finalize_task(task_id, {}) for task_id in ("a", "b", "c"))),
+            timeout=2
+        )
+        await service.close()
+
+    assert results == ["result-a", "result-b", "result-c"]
+    assert [function for function, _ in rpc.calls] == ["finalize_olx_parser_tasks"]
+    assert [task["task_id"] for task in rpc.calls[0][1]["p_tasks"]] == ["a", "b", "c"]
+    # RPC синхронный: выполняется в потоке, а не в event loop
+    assert threading.get_ident() not in rpc.threads
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_to_one_rpc_per_task(service):
+    rpc = FakeRPC(fail_batch=True, fail_tasks={"b"})
+
+    with mock.patch.object(parser_service, "rpc_json", rpc):
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(service._finalize_task(task_id, {}) for task_id in ("a", "b", "c")),
+                return_exceptions=True
+            ),
+            timeout=2
+        )
+        await service.close()
+
+    assert results[0] == "result-a"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == "result-c"
+    assert [function for function, _ in rpc.calls] == [
+        "finalize_olx_parser_tasks",
+        "finalize_olx_parser_task",
+        "finalize_olx_parser_task",
+        "finalize_olx_parser_task",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_close_writes_the_collected_batch(service):
+    rpc = FakeRPC()
+
+    with mock.patch.object(parser_service, "rpc_json", rpc):
+        waiter = asyncio.create_task(service._finalize_task("a", {}))
+        # Пачка собрана, но окно FINALIZE_BATCH_WAIT еще не истекло
+        await asyncio.sleep(0.01)
+        assert rpc.calls == []
+
+        await service.close()
+
+        assert await asyncio.wait_for(waiter, timeout=2) == "result-a"
+    assert len(rpc.calls) == 1
@@ -0,0 +1,70 @@
+"""
+Тесты кэша bcrypt хэшей паролей (_get_password_hash)
+"""
+
+from unittest import mock
+
+import bcrypt
+import pytest
+
+from modules.platforms.olx.services import auth_service
+from modules.platforms.olx.services.auth_service import OLXAuthService
+
+
+def _verifies(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+@pytest.fixture
+def service():
+    # Минимальная стоимость bcrypt: тестам важна корректность, не стойкость
+    fast_settings = auth_service.settings.model_copy(update={"bcrypt_rounds": 4})
+
+    with mock.patch.object(auth_service, "settings", fast_settings), \
+            mock.patch.object(auth_service, "get_supabase_client"):
+        yield OLXAuthService()
+
+
+@pytest.mark.asyncio
+async def test_same_password_reuses_the_hash(service):
+    with mock.patch.object(auth_service, "_hash_password", wraps=auth_service._hash_password) as hash_password:
+        first = await service._get_password_hash("a@example.com", "secret")
+        second = await service._get_password_hash("a@example.com", "secret")
+
+    assert first == second
+    assert hash_password.call_count == 1
+    assert _verifies("secret", first)
+
+
+@pytest.mark.asyncio
+async def test_changed_password_gets_a_new_hash(service):
+    old_hash = await service._get_password_hash("a@example.com", "secret")
+    new_hash = await service._get_password_hash("a@example.com", "changed")
+
+    assert new_hash != old_hash
+    assert _verifies("changed", new_hash)
+    assert not _verifies("secret", new_hash)
+
+    # Кэш хранит только последний пароль: старый снова хэшируется заново
+    again = await service._get_password_hash("a@example.com", "secret")
+    assert again != old_hash
+    assert _verifies("secret", again)
+
+
+@pytest.mark.asyncio
+async def test_hash_is_not_shared_between_accounts(service):
+    first = await service._get_password_hash("a@example.com", "secret")
+    second = await service._get_password_hash("b@example.com", "secret")
+
+    assert first != second
+    assert _verifies("secret", first)
+    assert _verifies("secret", second)
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded(service):
+    with mock.patch.object(auth_service, "PASSWORD_HASH_CACHE_MAX", 2):
+        for email in ("a@example.com", "b@example.com", "c@example.com"):
+            await service._get_password_hash(email, "secret")
+
+    assert list(service._password_hashes) == ["b@example.com", "c@example.com"]